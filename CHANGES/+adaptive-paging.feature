@@ -0,0 +1 @@
+Added `--page-latency`, `--min-page-size` and `--max-page-size` to adapt the page sizes of complete listings toward a target latency. `--limit 0` now lists all entities.
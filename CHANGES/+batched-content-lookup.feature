@@ -0,0 +1 @@
+Content units passed to `repository content modify` with `--add-content` or `--remove-content` are now looked up in batches instead of one call per unit.
@@ -0,0 +1 @@
+Resource options given multiple times now load all referenced entities with one list call per type.
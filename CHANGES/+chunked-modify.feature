@@ -0,0 +1,2 @@
+Added `--add-content-from` and `--remove-content-from` to `repository content modify` to read content hrefs or PRNs from a file or stdin.
+Large modifications are split into batches (see `--batch-size`) applied on consecutive repository versions.
@@ -0,0 +1 @@
+Shell completion and help pages are now served from a cached command index without importing the plugins.
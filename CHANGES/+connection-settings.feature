@@ -0,0 +1 @@
+Added the `pool_size`, `keep_alive`, `connect_timeout`, `read_timeout` and `http2` settings to tune the connections to the server.
@@ -0,0 +1 @@
+Added `repository version index` and `repository version query` to search the content of repository versions in a local SQLite index.
@@ -0,0 +1 @@
+Options referencing entities now complete their names in the shell from a local cache that is refreshed in the background.
@@ -0,0 +1 @@
+Added the `max_in_flight`, `read_rate`, `write_rate` and `upload_rate` settings to limit the load put on the server.
@@ -0,0 +1 @@
+Added `pulp file repository pipeline` and `pulp rpm repository pipeline` to sync, publish and distribute many repositories, skipping stages with nothing to do and reporting the latency of each stage.
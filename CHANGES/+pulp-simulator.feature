@@ -0,0 +1 @@
+Added the `pulp_simulator`, `pulp_simulator_ctx` and `pulp_simulator_cli` fixtures to `pytest_pulp_cli` to run tests against an in-memory simulation of the Pulp API.
@@ -0,0 +1 @@
+Added `--record` and `--replay` to capture a session to a cassette file and to serve it back without a server.
@@ -0,0 +1 @@
+Added `--response-cache-size` to keep responses of repository versions, content units and artifacts in an on-disk cache.
@@ -0,0 +1 @@
+Added the `retries` and `retry_deadline` settings to retry idempotent requests on transient server failures.
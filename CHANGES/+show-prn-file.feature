@@ -0,0 +1 @@
+Added `--prn-file` to `pulp show` to show many resources given by their PRNs at once.
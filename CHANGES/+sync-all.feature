@@ -0,0 +1 @@
+Added `pulp repository sync-all` to sync many repositories with a bounded number of tasks in flight, optionally publishing and distributing each of them.
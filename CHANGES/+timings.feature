@@ -0,0 +1 @@
+Added the `--timings` option to print a breakdown of the time spent in the various steps of a command.
@@ -0,0 +1 @@
+Added `--trace-file` to record every request as HAR or NDJSON and `pulp debug trace summarize` to aggregate such traces.
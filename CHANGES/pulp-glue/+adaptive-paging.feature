@@ -0,0 +1 @@
+Added `AdaptivePaging` and the `paging` parameter of `PulpContext`, `list_iterator` and `alist_iterator` to adapt page sizes toward a target latency. `StreamedPage.size` reports the bytes received.
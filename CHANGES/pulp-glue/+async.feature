@@ -0,0 +1 @@
+Added `AsyncOpenAPI` and `AsyncPulpContext` with coroutine counterparts of the calls, task waits and entity operations.
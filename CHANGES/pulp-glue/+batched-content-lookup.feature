@@ -0,0 +1 @@
+Added `PulpEntityContext.find_many`, `PulpEntityContext.lookup_batches` and `PulpContext.resolve_hrefs` to look up many entities with few list calls.
@@ -0,0 +1,2 @@
+Added `PulpContext.load_entities` to load the entities of many contexts with few list calls.
+`PulpEntityContext.find_many` can now fetch complete entities and batches lookups by a single PRN.
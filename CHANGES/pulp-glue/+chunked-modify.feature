@@ -0,0 +1,2 @@
+Added `batch_size` to `PulpRepositoryContext.modify` to split large changes into calls chained through `base_version`.
+Added `PulpContext.prn_to_href`.
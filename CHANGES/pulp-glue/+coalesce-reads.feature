@@ -0,0 +1,2 @@
+Added `PulpContext.coalesce` to batch reading many entities by href into one list call per type.
+Failed tasks of a task group are now fetched with a single list call.
@@ -0,0 +1 @@
+Added `ConnectionSettings` to configure the connection pool and timeouts of the transports, and `HttpxTransport` to talk HTTP/2.
@@ -0,0 +1 @@
+Added `ContentIndex`, a local SQLite index of the content in repository versions that is updated incrementally from the content added and removed by each version.
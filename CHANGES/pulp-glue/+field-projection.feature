@@ -0,0 +1,2 @@
+Added `PulpContext.projection` and `PulpEntityContext.partial_entity` to request only the fields needed for internal lookups.
+Resolving the latest repository version and failed tasks of a task group now use field projections where the server supports them.
@@ -0,0 +1,2 @@
+Added `Governor` to apply adaptive concurrency and rate limits to all requests of an `OpenAPI` object.
+Added `request_settings` to turn the settings about retries, limits, connections, the response cache and paging into the objects implementing them.
@@ -0,0 +1 @@
+Reduced the memory held by the loaded api spec by validating path items and components only when they are used, and sharing repeated strings. Invalid entries found on use raise an `OpenAPIError`.
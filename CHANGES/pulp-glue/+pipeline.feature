@@ -0,0 +1 @@
+Added stage tracking to `SyncOrchestrator`, skipping publications and distributions that are up to date, `StageResult` and `stage_statistics` in `pulp_glue.common.orchestration` and the `names` parameter of `select_repositories`.
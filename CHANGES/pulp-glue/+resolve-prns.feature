@@ -0,0 +1 @@
+Added `PulpContext.resolve_prns` to resolve many PRNs with paginated `prn__in` list calls per resource type.
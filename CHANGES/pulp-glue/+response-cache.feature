@@ -0,0 +1 @@
+Added `ResponseCache`, a size bounded on-disk cache for responses of immutable resources, scoped to the credentials given by `cache_identity`, and the `response_cache` parameter of `OpenAPI`. Entity contexts declare cacheable reads with `IMMUTABLE`.
@@ -0,0 +1 @@
+Added `RetryPolicy` to retry idempotent requests on 429, 502, 503, 504 and connection errors honouring `Retry-After`. Connection failures are now raised as `OpenAPIConnectionError`.
@@ -0,0 +1 @@
+Pages of list operations are now parsed while they are received, so `list_iterator` holds a single entity in memory at a time instead of the whole page. Added the `stream` parameter to `OpenAPI.call` and `PulpContext.call`, `StreamedPage`, and `Transport.send_stream`.
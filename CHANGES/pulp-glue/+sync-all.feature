@@ -0,0 +1 @@
+Added `SyncOrchestrator` and `select_repositories` in `pulp_glue.common.orchestration`, `PulpContext.read_tasks` and the `non_blocking` parameter of `PulpRepositoryContext.sync`.
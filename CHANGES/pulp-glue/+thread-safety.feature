@@ -0,0 +1 @@
+Made `OpenAPI` and `PulpContext` safe to share between threads, with per thread sessions and a locked OAuth2 token refresh.
@@ -0,0 +1 @@
+Added span hooks in `pulp_glue.common.tracing` to instrument loading the api spec, rendering, sending and parsing requests, waiting for tasks and uploads.
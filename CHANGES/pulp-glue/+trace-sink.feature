@@ -0,0 +1 @@
+Added a `trace_sink` parameter to `OpenAPI` to receive a structured record of every request, with HAR and NDJSON sinks in `pulp_glue.common.tracing`.
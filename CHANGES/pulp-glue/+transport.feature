@@ -0,0 +1 @@
+Added pluggable transports to `OpenAPI` with `RecordingTransport` and `ReplayTransport` in `pulp_glue.common.transport`.
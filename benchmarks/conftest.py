@@ -0,0 +1,46 @@
+import os
+import typing as t
+from pathlib import Path
+
+import pytest
+
+from pulp_glue.common.context import PulpContext
+
+if t.TYPE_CHECKING:
+    from pytest_pulp_cli.simulator import PulpSimulator
+
+pytest_plugins = ("pytest_pulp_cli",)
+
+
+@pytest.fixture(scope="session")
+def pulp_simulator_api_spec() -> Path:
+    return Path(__file__).parent.parent / "tests" / "assets" / "api.json"
+
+
+@pytest.fixture
+def cache_home(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """An empty XDG cache directory, so the api spec needs to be downloaded once."""
+    cache_home = tmp_path / "cache"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home))
+    return cache_home
+
+
+@pytest.fixture
+def cli_env(pulp_simulator: "PulpSimulator", tmp_path: Path, cache_home: Path) -> dict[str, str]:
+    """Environment to run the pulp cli against the simulator without any user config."""
+    config_home = tmp_path / "config"
+    (config_home / "pulp").mkdir(parents=True)
+    (config_home / "pulp" / "cli.toml").write_text(
+        f'[cli]\nbase_url = "{pulp_simulator.base_url}"\n'
+        'username = "admin"\npassword = "password"\nformat = "json"\n'
+    )
+    env = os.environ.copy()
+    env.update({"XDG_CONFIG_HOME": str(config_home), "XDG_CACHE_HOME": str(cache_home)})
+    return env
+
+
+@pytest.fixture
+def pulp_ctx(pulp_simulator_ctx: PulpContext) -> PulpContext:
+    # Load the api spec ahead of the measurements.
+    pulp_simulator_ctx.api
+    return pulp_simulator_ctx
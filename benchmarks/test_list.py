@@ -0,0 +1,24 @@
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from pulp_glue.common.context import PulpContext
+from pulp_glue.file.context import PulpFileRepositoryContext
+
+from pytest_pulp_cli.simulator import PulpSimulator
+
+
+@pytest.mark.parametrize("batch_size", [100, 1000])
+def test_list_iterator(
+    benchmark: BenchmarkFixture,
+    pulp_simulator: PulpSimulator,
+    pulp_ctx: PulpContext,
+    batch_size: int,
+) -> None:
+    pulp_simulator.populate("repositories_file_file_create", 5000, name="repository_{index}")
+    repository_ctx = PulpFileRepositoryContext(pulp_ctx)
+
+    def _iterate() -> int:
+        return sum(1 for _ in repository_ctx.list_iterator(batch_size=batch_size))
+
+    assert benchmark(_iterate) == 5000
+    benchmark.extra_info["entities_per_round"] = 5000
@@ -0,0 +1,86 @@
+import json
+import subprocess
+import sys
+import tracemalloc
+from pathlib import Path
+
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from pulp_glue.common.context import PulpContext
+from pulp_glue.common.jsonstream import StreamedPage
+
+# Reports the peak resident set size of the command in KiB on stderr.
+PROBE = """
+import resource, sys
+from pulp_cli import main
+try:
+    main()
+except SystemExit:
+    pass
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, file=sys.stderr)
+"""
+
+
+def test_spec_memory(
+    benchmark: BenchmarkFixture,
+    pulp_simulator_api_spec: Path,
+    pulp_ctx: PulpContext,
+) -> None:
+    api = pulp_ctx.api
+    data = pulp_simulator_api_spec.read_bytes()
+
+    def _parse() -> tuple[int, int]:
+        tracemalloc.start()
+        try:
+            api._parse_api(data)
+            # Resolve one operation like a typical command does.
+            api.param_spec("repositories_file_file_list", "query")
+            return tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    steady, peak = benchmark.pedantic(_parse, rounds=5)
+    benchmark.extra_info["steady_bytes"] = steady
+    benchmark.extra_info["peak_bytes"] = peak
+
+
+def test_list_page_memory(benchmark: BenchmarkFixture) -> None:
+    # A page of content units with long changelogs.
+    page = {
+        "count": 100,
+        "next": None,
+        "previous": None,
+        "results": [
+            {"pulp_href": f"/content/{index}/", "changelog": ["x" * 1000] * 100}
+            for index in range(100)
+        ],
+    }
+    body = json.dumps(page).encode()
+    chunks = [body[start : start + 65536] for start in range(0, len(body), 65536)]
+
+    def _parse() -> int:
+        tracemalloc.start()
+        try:
+            for _entity in StreamedPage(iter(chunks))["results"]:
+                pass
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    benchmark.extra_info["peak_bytes"] = benchmark.pedantic(_parse, rounds=5)
+    benchmark.extra_info["body_bytes"] = len(body)
+
+
+def test_cli_peak_rss(benchmark: BenchmarkFixture, cli_env: dict[str, str]) -> None:
+    def _run() -> int:
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE, "file", "repository", "list", "--limit", "1"],
+            env=cli_env,
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        return int(result.stderr.split()[-1])
+
+    benchmark.extra_info["peak_rss_kib"] = benchmark.pedantic(_run, rounds=3, warmup_rounds=1)
@@ -0,0 +1,24 @@
+import typing as t
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from pulp_cli.generic import REGISTERED_OUTPUT_FORMATTERS
+from pytest_pulp_cli.simulator import PulpSimulator
+
+
+@pytest.fixture
+def entities(pulp_simulator: PulpSimulator) -> list[dict[str, t.Any]]:
+    return [
+        pulp_simulator.get(href)
+        for href in pulp_simulator.populate(
+            "content_file_files_create", 1000, relative_path="file_{index}", sha256="{index:064}"
+        )
+    ]
+
+
+@pytest.mark.parametrize("format", sorted(REGISTERED_OUTPUT_FORMATTERS))
+def test_output_format(
+    benchmark: BenchmarkFixture, entities: list[dict[str, t.Any]], format: str
+) -> None:
+    benchmark(REGISTERED_OUTPUT_FORMATTERS[format], entities)
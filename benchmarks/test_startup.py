@@ -0,0 +1,41 @@
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+PULP = [sys.executable, "-c", "from pulp_cli import main; main()"]
+
+
+def _run(args: list[str], env: dict[str, str]) -> None:
+    subprocess.run(PULP + args, env=env, check=True, stdout=subprocess.DEVNULL)
+
+
+@pytest.mark.parametrize("args", [["--help"], ["file", "repository", "list", "--help"]])
+def test_help(benchmark: BenchmarkFixture, cli_env: dict[str, str], args: list[str]) -> None:
+    benchmark.pedantic(_run, args=(args, cli_env), rounds=5, warmup_rounds=1)
+
+
+def test_cold_startup(
+    benchmark: BenchmarkFixture, cli_env: dict[str, str], cache_home: Path
+) -> None:
+    def _setup() -> None:
+        shutil.rmtree(cache_home, ignore_errors=True)
+
+    benchmark.pedantic(
+        _run,
+        args=(["file", "repository", "list", "--limit", "1"], cli_env),
+        setup=_setup,
+        rounds=5,
+    )
+
+
+def test_warm_startup(benchmark: BenchmarkFixture, cli_env: dict[str, str]) -> None:
+    benchmark.pedantic(
+        _run,
+        args=(["file", "repository", "list", "--limit", "1"], cli_env),
+        rounds=5,
+        warmup_rounds=1,
+    )
@@ -0,0 +1,27 @@
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from pulp_glue.common.context import PulpContext
+from pulp_glue.file.context import PulpFileRepositoryContext
+
+from pytest_pulp_cli.simulator import PulpSimulator
+
+
+@pytest.mark.parametrize("task_duration", [0.0, 0.2])
+def test_task_wait_latency(
+    benchmark: BenchmarkFixture,
+    pulp_simulator: PulpSimulator,
+    pulp_ctx: PulpContext,
+    task_duration: float,
+) -> None:
+    pulp_simulator.task_duration = task_duration
+    (repository_href,) = pulp_simulator.populate("repositories_file_file_create", 1, name="repo")
+    content_hrefs = pulp_simulator.populate(
+        "content_file_files_create", 1, relative_path="file_{index}"
+    )
+    repository_ctx = PulpFileRepositoryContext(pulp_ctx, pulp_href=repository_href)
+
+    def _modify() -> None:
+        repository_ctx.modify(add_content=content_hrefs)
+
+    benchmark.pedantic(_modify, rounds=3)
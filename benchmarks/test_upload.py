@@ -0,0 +1,28 @@
+from pathlib import Path
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from pulp_glue.common.context import PulpContext
+from pulp_glue.core.context import PulpUploadContext
+
+FILE_SIZE = 16 * 1024 * 1024
+
+
+@pytest.fixture(scope="module")
+def upload_file(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    path = tmp_path_factory.mktemp("upload") / "payload.bin"
+    path.write_bytes(bytes(range(256)) * (FILE_SIZE // 256))
+    return path
+
+
+@pytest.mark.parametrize("chunk_size", [256 * 1024, 1024 * 1024, 8 * 1024 * 1024])
+def test_upload_throughput(
+    benchmark: BenchmarkFixture, pulp_ctx: PulpContext, upload_file: Path, chunk_size: int
+) -> None:
+    def _upload() -> str:
+        with upload_file.open("rb") as fp:
+            return str(PulpUploadContext(pulp_ctx).upload_file(fp, chunk_size=chunk_size))
+
+    benchmark.pedantic(_upload, rounds=3, warmup_rounds=1)
+    benchmark.extra_info["bytes_per_round"] = FILE_SIZE
@@ -40,7 +40,7 @@ class AuthProviderBase:
     def can_complete(
         self,
         proposal: dict[str, list[str]],
-        security_schemes: dict[str, oas.SecurityScheme | oas.Reference],
+        security_schemes: t.Mapping[str, oas.SecurityScheme | oas.Reference],
     ) -> t.Literal[False] | int:
         cost: int = 0
         for name, scopes in proposal.items():
@@ -0,0 +1,223 @@
+"""
+On-disk cache for responses of immutable resources.
+
+Some resources, like repository versions, content units and artifacts, never change once they
+are created, apart from the labels of content units.
+A `ResponseCache` keeps their responses in a size bounded SQLite database, so reading them again,
+even from a later process, does not need a round trip to the server.
+Least recently used responses are evicted first.
+
+Only successful `GET` responses of requests selected by the `cacheable` predicate are stored.
+Modifying requests discard the cached responses they may affect, see `ResponseCache.discard`.
+Responses are only served to the identity that fetched them, because the server decides per user
+whether a resource may be read.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import typing as t
+from pathlib import Path
+from urllib.parse import quote_plus, urlencode, urlsplit
+
+from multidict import CIMultiDict
+
+from pulp_glue.common.transport import Request, Response
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    content_type TEXT,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_used ON responses (used);
+CREATE INDEX IF NOT EXISTS responses_url ON responses (url);
+"""
+
+
+def default_path() -> Path:
+    """
+    Location of the response cache in the cache directory of the user.
+    """
+    cache_home = Path(os.environ.get("XDG_CACHE_HOME") or "~/.cache").expanduser()
+    return cache_home / "pulp" / "responses.sqlite3"
+
+
+def cache_identity(**credentials: t.Any) -> str:
+    """
+    A digest of the credentials responses are fetched with, to be used as the identity of a
+    `ResponseCache`.
+
+    Pass everything that selects the user on the server, like the username, the OAuth2 client id,
+    the client certificate and extra headers.
+    """
+    data = json.dumps(credentials, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def _key(identity: str, request: Request) -> str:
+    # The url contains the server and the href, the query the projection and filters.
+    return (
+        identity
+        + " "
+        + request.url
+        + "?"
+        + urlencode(sorted((request.params or {}).items()), doseq=True)
+    )
+
+
+class ResponseCache:
+    """
+    Size bounded, least recently used cache for responses of immutable resources.
+
+    It can be shared by multiple `OpenAPI` objects, threads and processes.
+
+    Parameters:
+        path: Location of the cache database.
+        max_size: Maximum total size of the cached response bodies in bytes.
+        cacheable: Predicate selecting the requests whose responses never change.
+        identity: The user the responses are fetched for, see `cache_identity`.
+            Responses are not shared between caches with different identities.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_size: int,
+        cacheable: t.Callable[[Request], bool],
+        identity: str = "",
+    ) -> None:
+        self.path = Path(path)
+        self.max_size = max_size
+        self.cacheable = cacheable
+        # Keys of older versions of the cache had no identity and never match.
+        self.identity = identity or cache_identity()
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+
+    def _db(self) -> sqlite3.Connection:
+        # Opened on first use, so an unused cache does not touch the disk.
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            self._connection.executescript(_SCHEMA)
+        return self._connection
+
+    def get(self, request: Request) -> Response | None:
+        """
+        Look up the cached response to a request.
+
+        Returns:
+            The response or `None` if the request is not cacheable or not cached.
+        """
+        if request.method.lower() != "get" or not self.cacheable(request):
+            return None
+        key = _key(self.identity, request)
+        try:
+            with self._lock, self._db() as db:
+                row = db.execute(
+                    "SELECT content_type, body FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                db.execute("UPDATE responses SET used = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error:
+            # The cache is an optimization only.
+            return None
+        headers: CIMultiDict[str] = CIMultiDict()
+        if row[0] is not None:
+            headers["Content-Type"] = row[0]
+        return Response(status_code=200, headers=headers, body=row[1])
+
+    def put(self, request: Request, response: Response) -> None:
+        """
+        Store the response to a request if it is cacheable.
+
+        Modifying requests discard the cached responses they may affect instead.
+        """
+        method = request.method.lower()
+        if method not in {"get", "head", "options"}:
+            self.discard(request.url)
+            return
+        if method != "get" or response.status_code != 200 or not self.cacheable(request):
+            return
+        size = len(response.body)
+        if size > self.max_size:
+            return
+        try:
+            with self._lock, self._db() as db:
+                db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        _key(self.identity, request),
+                        request.url,
+                        response.headers.get("Content-Type"),
+                        response.body,
+                        size,
+                        time.time(),
+                    ),
+                )
+                self._evict(db)
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        total: int = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_size:
+            return
+        # Delete the least recently used entries until the rest fits.
+        freed = 0
+        keys: list[str] = []
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY used"):
+            keys.append(key)
+            freed += size
+            if total - freed <= self.max_size:
+                break
+        db.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key in keys])
+
+    def discard(self, url: str) -> None:
+        """
+        Remove all cached responses a modification of a url may affect.
+
+        These are the responses of the url itself, of the urls it is nested in, like the entity
+        an action like `set_label/` belongs to and the lists of such entities, and of requests
+        filtering by its href, like the content of a deleted repository version.
+        """
+        if self._connection is None and not self.path.exists():
+            return
+        # Hrefs in the query are encoded like in the keys.
+        reference = quote_plus(urlsplit(url).path)
+        try:
+            with self._lock, self._db() as db:
+                db.execute(
+                    "DELETE FROM responses"
+                    " WHERE url = substr(?, 1, length(url)) OR instr(key, ?) > 0",
+                    (url, reference),
+                )
+        except sqlite3.Error:
+            pass
+
+    def clear(self) -> None:
+        """
+        Remove all cached responses.
+        """
+        try:
+            with self._lock, self._db() as db:
+                db.execute("DELETE FROM responses")
+        except sqlite3.Error:
+            pass
+
+    def close(self) -> None:
+        """
+        Close the cache database.
+        """
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,379 @@
+"""
+Local index of the content of repository versions.
+
+A `ContentIndex` materializes the content units of repository versions into a SQLite database,
+so they can be searched with filters or SQL without listing them from the server again.
+A repository version is indexed incrementally from the closest earlier version of the same
+repository already in the index, downloading only the content added and removed in between.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import typing as t
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+from pulp_glue.common.context import (
+    PulpContentContext,
+    PulpContext,
+    PulpRepositoryVersionContext,
+)
+from pulp_glue.common.exceptions import PulpException
+from pulp_glue.common.i18n import get_translation
+
+translation = get_translation(__package__)
+_ = translation.gettext
+
+_SCHEMA_VERSION = 1
+"""Bumped whenever the layout of the tables changes. Indexes of other versions are rebuilt."""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    id INTEGER PRIMARY KEY,
+    server TEXT NOT NULL,
+    pulp_href TEXT NOT NULL,
+    repository TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    UNIQUE (server, pulp_href)
+);
+CREATE INDEX IF NOT EXISTS versions_repository ON versions (server, repository, number);
+CREATE TABLE IF NOT EXISTS content_units (
+    id INTEGER PRIMARY KEY,
+    server TEXT NOT NULL,
+    content_type TEXT NOT NULL,
+    pulp_href TEXT NOT NULL,
+    data TEXT NOT NULL,
+    UNIQUE (server, pulp_href)
+);
+CREATE TABLE IF NOT EXISTS version_content (
+    version_id INTEGER NOT NULL,
+    unit_id INTEGER NOT NULL,
+    PRIMARY KEY (version_id, unit_id)
+) WITHOUT ROWID;
+PRAGMA user_version = 1;
+"""
+
+_DROP_SCHEMA = """
+DROP TABLE IF EXISTS version_content;
+DROP TABLE IF EXISTS content_units;
+DROP TABLE IF EXISTS versions;
+"""
+
+_VERSION_UNITS = (
+    "SELECT version_id, content_type, pulp_href, data FROM version_content"
+    " JOIN content_units ON content_units.id = version_content.unit_id"
+)
+
+FILTER_OPERATORS = {"=": "=", "~": "GLOB"}
+"""Operators of filter expressions and the SQL operators they translate to."""
+
+
+def default_path() -> Path:
+    """
+    Location of the content index in the cache directory of the user.
+    """
+    cache_home = Path(os.environ.get("XDG_CACHE_HOME") or "~/.cache").expanduser()
+    return cache_home / "pulp" / "content_index.sqlite3"
+
+
+class ContentIndex:
+    """
+    SQLite index of the content units in repository versions.
+
+    Content units never change, so each one is stored once as a row of the `content_units` table
+    with the columns `id`, `server`, `content_type`, `pulp_href` and `data`, the latter holding
+    the JSON representation of the unit.
+    The `versions` table maps the `id` of an indexed version to its `server`, `pulp_href`,
+    `repository` and `number`, and the `version_content` table lists the `unit_id` of each unit
+    in a version by its `version_id`.
+
+    Parameters:
+        path: Location of the index database.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._connection: sqlite3.Connection | None = None
+
+    def __enter__(self) -> "ContentIndex":
+        return self
+
+    def __exit__(self, *exc_info: t.Any) -> None:
+        self.close()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, timeout=10)
+            if self._connection.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+                # The index only holds copies of server data, so it is simply rebuilt.
+                self._connection.executescript(_DROP_SCHEMA)
+            self._connection.executescript(_SCHEMA)
+        return self._connection
+
+    def close(self) -> None:
+        """
+        Close the index database.
+        """
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _version_id(self, repository_version_ctx: PulpRepositoryVersionContext) -> int | None:
+        row = (
+            self._db()
+            .execute(
+                "SELECT id FROM versions WHERE server = ? AND pulp_href = ?",
+                (repository_version_ctx.pulp_ctx.api.base_url, repository_version_ctx.pulp_href),
+            )
+            .fetchone()
+        )
+        return None if row is None else t.cast(int, row[0])
+
+    def _indexed_version_id(self, repository_version_ctx: PulpRepositoryVersionContext) -> int:
+        version_id = self._version_id(repository_version_ctx)
+        if version_id is None:
+            raise PulpException(
+                _("Repository version {href} is not indexed.").format(
+                    href=repository_version_ctx.pulp_href
+                )
+            )
+        return version_id
+
+    def update(self, repository_version_ctx: PulpRepositoryVersionContext) -> dict[str, t.Any]:
+        """
+        Add a repository version to the index.
+
+        If an earlier version of the same repository is indexed, only the content added and
+        removed by the versions in between is fetched from the server.
+
+        Returns:
+            A summary with the `version` and the `base_version` it was derived from,
+            the numbers of `added` and `removed` content units and the `count` of content units.
+        """
+        pulp_ctx = repository_version_ctx.pulp_ctx
+        server = pulp_ctx.api.base_url
+        version = repository_version_ctx.entity
+        result: dict[str, t.Any] = {
+            "version": version["pulp_href"],
+            "base_version": None,
+            "added": 0,
+            "removed": 0,
+        }
+        db = self._db()
+        version_id = self._version_id(repository_version_ctx)
+        if version_id is None:
+            base = db.execute(
+                "SELECT id, pulp_href, number FROM versions"
+                " WHERE server = ? AND repository = ? AND number < ?"
+                " ORDER BY number DESC LIMIT 1",
+                (server, version["repository"], version["number"]),
+            ).fetchone()
+            # Nothing is written unless the whole version could be indexed.
+            with db:
+                version_id = t.cast(
+                    int,
+                    db.execute(
+                        "INSERT INTO versions (server, pulp_href, repository, number)"
+                        " VALUES (?, ?, ?, ?)",
+                        (server, version["pulp_href"], version["repository"], version["number"]),
+                    ).lastrowid,
+                )
+                if base is None:
+                    result["added"] = self._add(
+                        db, pulp_ctx, version_id, version["content_summary"]["present"]
+                    )
+                else:
+                    result["base_version"] = base[1]
+                    db.execute(
+                        "INSERT INTO version_content"
+                        " SELECT ?, unit_id FROM version_content WHERE version_id = ?",
+                        (version_id, base[0]),
+                    )
+                    for step in self._versions_between(
+                        repository_version_ctx, base[2], version["number"]
+                    ):
+                        summary = step["content_summary"]
+                        result["removed"] += self._remove(
+                            db, pulp_ctx, version_id, summary["removed"]
+                        )
+                        result["added"] += self._add(db, pulp_ctx, version_id, summary["added"])
+        result["count"] = db.execute(
+            "SELECT COUNT(*) FROM version_content WHERE version_id = ?", (version_id,)
+        ).fetchone()[0]
+        return result
+
+    def _versions_between(
+        self,
+        repository_version_ctx: PulpRepositoryVersionContext,
+        start: int,
+        stop: int,
+    ) -> list[t.Any]:
+        # Versions in (start, stop] in order.
+        # Deleted versions are squashed into their successor by the server, so the changes of
+        # the remaining ones still add up.
+        versions_ctx = repository_version_ctx.repository_ctx.get_version_context()
+        parameters: dict[str, t.Any] = {}
+        list_id = getattr(versions_ctx, "LIST_ID", None) or versions_ctx.ID_PREFIX + "_list"
+        if {"number__gt", "number__lte"} <= set(
+            versions_ctx.pulp_ctx.api.param_spec(list_id, "query")
+        ):
+            parameters.update(number__gt=start, number__lte=stop)
+        return sorted(
+            (
+                version
+                for version in versions_ctx.list_iterator(parameters=parameters)
+                if start < version["number"] <= stop
+            ),
+            key=lambda version: version["number"],
+        )
+
+    def _listings(
+        self, pulp_ctx: PulpContext, summary: dict[str, t.Any]
+    ) -> t.Iterator[tuple[str, PulpContentContext, dict[str, t.Any]]]:
+        # The content summary links each content type to a filtered list endpoint.
+        list_paths = [
+            (
+                re.compile(
+                    "[^/]+".join(re.escape(part) for part in re.split(r"\{[^}]*\}", path)) + "$"
+                ),
+                ctx_class,
+            )
+            for ctx_class in PulpContentContext.TYPE_REGISTRY.values()
+            if (list_id := getattr(ctx_class, "LIST_ID", None) or ctx_class.ID_PREFIX + "_list")
+            in pulp_ctx.api.operations
+            for path in [pulp_ctx.api.operations[list_id][1]]
+        ]
+        for content_type, entry in summary.items():
+            url = urlsplit(entry["href"])
+            for pattern, ctx_class in list_paths:
+                if pattern.match(url.path):
+                    yield content_type, ctx_class(pulp_ctx), dict(parse_qsl(url.query))
+                    break
+            else:
+                raise PulpException(
+                    _("Content of type {content_type} cannot be indexed.").format(
+                        content_type=content_type
+                    )
+                )
+
+    def _add(
+        self,
+        db: sqlite3.Connection,
+        pulp_ctx: PulpContext,
+        version_id: int,
+        summary: dict[str, t.Any],
+    ) -> int:
+        server = pulp_ctx.api.base_url
+        count = 0
+        for content_type, content_ctx, parameters in self._listings(pulp_ctx, summary):
+            for unit in content_ctx.list_iterator(parameters=parameters):
+                db.execute(
+                    "INSERT OR IGNORE INTO content_units (server, content_type, pulp_href, data)"
+                    " VALUES (?, ?, ?, ?)",
+                    (server, content_type, unit["pulp_href"], json.dumps(unit)),
+                )
+                db.execute(
+                    "INSERT OR IGNORE INTO version_content"
+                    " SELECT ?, id FROM content_units WHERE server = ? AND pulp_href = ?",
+                    (version_id, server, unit["pulp_href"]),
+                )
+                count += 1
+        return count
+
+    def _remove(
+        self,
+        db: sqlite3.Connection,
+        pulp_ctx: PulpContext,
+        version_id: int,
+        summary: dict[str, t.Any],
+    ) -> int:
+        server = pulp_ctx.api.base_url
+        count = 0
+        for _content_type, content_ctx, parameters in self._listings(pulp_ctx, summary):
+            list_id = getattr(content_ctx, "LIST_ID", None) or content_ctx.ID_PREFIX + "_list"
+            if "fields" in pulp_ctx.api.param_spec(list_id, "query"):
+                parameters["fields"] = ["pulp_href"]
+            for unit in content_ctx.list_iterator(parameters=parameters):
+                db.execute(
+                    "DELETE FROM version_content WHERE version_id = ? AND unit_id IN"
+                    " (SELECT id FROM content_units WHERE server = ? AND pulp_href = ?)",
+                    (version_id, server, unit["pulp_href"]),
+                )
+                count += 1
+        return count
+
+    def find(
+        self,
+        repository_version_ctx: PulpRepositoryVersionContext,
+        filters: t.Iterable[tuple[str, str, str]] = (),
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[t.Any]:
+        """
+        Search the indexed content of a repository version.
+
+        Parameters:
+            repository_version_ctx: The indexed repository version.
+            filters: Triples of field name, operator and value, that all need to match.
+                The operator `=` compares for equality, `~` matches a glob pattern.
+            limit: Maximum number of content units to return.
+            offset: Number of content units to skip.
+
+        Returns:
+            The matching content units.
+        """
+        version_id = self._indexed_version_id(repository_version_ctx)
+        where = ["version_id = ?"]
+        parameters: list[t.Any] = [version_id]
+        for field, operator, value in filters:
+            if operator not in FILTER_OPERATORS:
+                raise PulpException(
+                    _("Unknown filter operator '{operator}'.").format(operator=operator)
+                )
+            # Compare as text, so numbers and strings can be matched alike.
+            where.append(f"CAST(json_extract(data, ?) AS TEXT) {FILTER_OPERATORS[operator]} ?")
+            parameters.extend([f'$."{field}"', value])
+        parameters.extend([-1 if limit is None else limit, offset])
+        rows = self._db().execute(
+            f"SELECT data FROM ({_VERSION_UNITS}) WHERE "
+            + " AND ".join(where)
+            + " ORDER BY content_type, pulp_href LIMIT ? OFFSET ?",
+            parameters,
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def query(
+        self,
+        repository_version_ctx: PulpRepositoryVersionContext,
+        sql: str,
+        parameters: t.Sequence[t.Any] = (),
+    ) -> list[dict[str, t.Any]]:
+        """
+        Run a read only SQL query on the index.
+
+        The temporary view `units` holds the `content_type`, `pulp_href` and `data` of the
+        content units of the repository version.
+        Fields of the content units can be extracted with `json_extract(data, '$.field')`.
+
+        Returns:
+            The resulting rows as dictionaries keyed by column name.
+        """
+        version_id = self._indexed_version_id(repository_version_ctx)
+        db = self._db()
+        db.executescript(
+            "DROP VIEW IF EXISTS temp.units;"
+            " CREATE TEMP VIEW units AS SELECT content_type, pulp_href, data"
+            f" FROM ({_VERSION_UNITS}) WHERE version_id = {version_id};"
+        )
+        db.execute("PRAGMA query_only = ON")
+        try:
+            cursor = db.execute(sql, parameters)
+            columns = [column[0] for column in cursor.description or []]
+            return [dict(zip(columns, row)) for row in cursor]
+        except sqlite3.Error as e:
+            raise PulpException(_("Query failed: {error}").format(error=e))
+        finally:
+            db.execute("PRAGMA query_only = OFF")
@@ -1,18 +1,24 @@
+import asyncio
 import datetime
+import json
 import os
 import re
 import sys
+import threading
 import time
 import typing as t
 import warnings
-from contextlib import ExitStack
+from contextlib import ExitStack, contextmanager, suppress
 from pathlib import Path
+from urllib.parse import quote
 
 from packaging.specifiers import SpecifierSet
 
 from pulp_glue.common.authentication import GlueAuthProvider
+from pulp_glue.common.cache import ResponseCache, cache_identity, default_path
 from pulp_glue.common.exceptions import (
     NotImplementedFake,
+    OpenAPIConnectionError,
     OpenAPIError,
     PulpEntityNotFound,
     PulpException,
@@ -21,8 +27,13 @@ from pulp_glue.common.exceptions import (
     UnsafeCallError,
     ValidationError,
 )
+from pulp_glue.common.governor import Governor
 from pulp_glue.common.i18n import get_translation
-from pulp_glue.common.openapi import METHODS, OpenAPI
+from pulp_glue.common.jsonstream import StreamedPage
+from pulp_glue.common.openapi import METHODS, AsyncOpenAPI, OpenAPI
+from pulp_glue.common.paging import AdaptivePaging
+from pulp_glue.common.tracing import span
+from pulp_glue.common.transport import ConnectionSettings, Request, RetryPolicy
 
 if sys.version_info >= (3, 11):
     import tomllib
@@ -46,6 +57,7 @@ _ = translation.gettext
 
 DEFAULT_LIMIT = 25
 BATCH_SIZE = 1000
+MODIFY_BATCH_SIZE = 1000
 DATETIME_FORMATS = [
     "%Y-%m-%dT%H:%M:%S.%fZ",  # Pulp format
     "%Y-%m-%d",  # intl. format
@@ -67,6 +79,22 @@ href_regex = re.compile(r"\/([a-z0-9-_]+\/)+", flags=re.IGNORECASE)
 prn_regex = re.compile(
     r"^prn:(?P<plugin>[a-z][a-z0-9-_]*)\.(?P<model>[a-z][a-z0-9_]*):(?P<pulp_id>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})$",  # noqa: E501
 )
+# based on https://stackoverflow.com/a/42865957/2002471
+SIZE_UNITS = {"B": 1, "KB": 10**3, "MB": 10**6, "GB": 10**9, "TB": 10**12}
+
+
+def parse_size(value: str | int) -> int:
+    """
+    Parse a number of bytes with an optional unit, like `"10MB"`.
+
+    Raises:
+        ValueError: if the value is not a valid size.
+    """
+    match = re.match(r"^([0-9]+)\s*([KMGT]?B)?$", str(value).strip().upper())
+    if not match:
+        raise ValueError(_("Please pass in a valid size of form: [0-9] [K/M/G/T]B"))
+    number, unit = match.groups(default="B")
+    return int(number) * SIZE_UNITS[unit]
 
 
 class PreprocessedEntityDefinition(dict[str, t.Any]):
@@ -243,6 +271,125 @@ def patch_security_scheme_mutual_tls(api_spec: t.Any) -> t.Any:
     return api_spec
 
 
+def immutable_request(request: Request) -> bool:
+    """
+    Whether the response to a request never changes.
+
+    This is decided by the operations registered in `PulpEntityContext.IMMUTABLE_OPERATIONS`.
+    Filters on labels are never cacheable, because labels can change.
+    It is meant to be the `cacheable` predicate of a `ResponseCache`.
+    """
+    try:
+        parameter = PulpEntityContext.IMMUTABLE_OPERATIONS[request.operation_id]
+    except KeyError:
+        return False
+    params = request.params or {}
+    if any(key.startswith("pulp_label") for key in params):
+        return False
+    return parameter is None or parameter in params
+
+
+def request_settings(
+    config: t.Mapping[str, t.Any],
+) -> tuple[dict[str, t.Any], AdaptivePaging | None]:
+    """
+    Translate the settings about requests in a config into the objects implementing them.
+
+    These are the settings for retries, the governor, connections, the response cache and adaptive
+    paging. Unset settings may be missing or `None`. Sizes may be given with a unit like `"10MB"`.
+
+    Parameters:
+        config: dictionary of configuration values.
+    Returns:
+        Keyword arguments for `OpenAPI` and the adaptive paging to use, if any.
+    """
+    api_kwargs: dict[str, t.Any] = {}
+    if config.get("retries"):
+        retry_policy = RetryPolicy(retries=config["retries"])
+        if config.get("retry_deadline") is not None:
+            retry_policy.deadline = config["retry_deadline"]
+        api_kwargs["retry_policy"] = retry_policy
+    limits = {
+        key: config[key]
+        for key in ["max_in_flight", "read_rate", "write_rate", "upload_rate"]
+        if config.get(key)
+    }
+    if "upload_rate" in limits:
+        limits["upload_rate"] = parse_size(limits["upload_rate"])
+    if limits:
+        api_kwargs["governor"] = Governor(**limits)
+    connection = {
+        key: config[key]
+        for key in ["pool_size", "keep_alive", "connect_timeout", "read_timeout", "http2"]
+        if config.get(key) is not None
+    }
+    if connection:
+        api_kwargs["connection"] = ConnectionSettings(**connection)
+    if config.get("response_cache_size"):
+        api_kwargs["response_cache"] = ResponseCache(
+            default_path(),
+            parse_size(config["response_cache_size"]),
+            immutable_request,
+            cache_identity(
+                username=config.get("username"),
+                client_id=config.get("client_id"),
+                cert=config.get("cert"),
+                headers=config.get("headers"),
+            ),
+        )
+    paging: AdaptivePaging | None = None
+    if config.get("page_latency"):
+        paging = AdaptivePaging(target_latency=config["page_latency"])
+        if config.get("min_page_size") is not None:
+            paging.min_size = config["min_page_size"]
+        if config.get("max_page_size") is not None:
+            paging.max_size = config["max_page_size"]
+    return api_kwargs, paging
+
+
+class _EntityLoader:
+    # Coalesces reading entities by href within a `PulpContext.coalesce` block.
+    # Hrefs assigned to entity contexts are queued per type. The first read of any of them
+    # fetches all queued hrefs of that type with `pulp_href__in` list calls.
+
+    def __init__(self) -> None:
+        self.queued: dict[type[PulpEntityContext], dict[str, PulpEntityContext]] = {}
+        self.loaded: dict[str, EntityDefinition] = {}
+
+    def queue(self, entity_ctx: "PulpEntityContext", href: str) -> None:
+        if href not in self.loaded:
+            self.queued.setdefault(type(entity_ctx), {}).setdefault(href, entity_ctx)
+
+    def load(self, entity_ctx: "PulpEntityContext", href: str) -> EntityDefinition | None:
+        # Returns `None` for entities that could not be found in a batch.
+        if href not in self.loaded:
+            queued = self.queued.pop(type(entity_ctx), {})
+            queued.setdefault(href, entity_ctx)
+            queued = {key: value for key, value in queued.items() if key not in self.loaded}
+            if len(queued) > 1:
+                # On failure, leave it to reading the entities one by one.
+                with suppress(PulpException):
+                    self._load_batch(queued)
+        return self.loaded.get(href)
+
+    def _load_batch(self, queued: dict[str, "PulpEntityContext"]) -> None:
+        groups: dict[str, list[tuple[str, PulpEntityContext]]] = {}
+        for href, entity_ctx in queued.items():
+            key = json.dumps(entity_ctx._batch_filters(), sort_keys=True, default=str)
+            groups.setdefault(key, []).append((href, entity_ctx))
+        for items in groups.values():
+            batch_ctx = items[0][1]
+            query_params = batch_ctx.pulp_ctx.api.param_spec(
+                batch_ctx._operation_id("list"), "query"
+            )
+            if len(items) < 2 or "pulp_href__in" not in query_params:
+                continue
+            lookups = [{"pulp_href": href} for href, _entity_ctx in items]
+            for lookup, matches in zip(lookups, batch_ctx.find_many(lookups, complete=True)):
+                if len(matches) == 1:
+                    self.loaded[lookup["pulp_href"]] = matches[0]
+
+
 class PulpContext:
     """
     Abstract class for the global PulpContext object.
@@ -260,8 +407,12 @@ class PulpContext:
             This implies `dry_run=True` on the `api_kwargs`.
         verify_ssl: A boolean or a path to the CA bundle.
         api-version: Version of the Pulp API to talk to (e.g., "v3")
+        paging: Adapt the page sizes of listings without an explicit batch size.
     """
 
+    OPENAPI_CLASS: t.ClassVar[type[OpenAPI]] = OpenAPI
+    """Class of the wrapped `OpenAPI` object."""
+
     def echo(self, message: str, nl: bool = True, err: bool = False) -> None:
         """
         Abstract function that will be called to emit warnings and task progress.
@@ -292,8 +443,12 @@ class PulpContext:
         verify: bool | str | None = None,  # Deprecated
         chunk_size: int | None = None,
         api_version: str | None = "v3",
+        paging: AdaptivePaging | None = None,
     ) -> None:
         self._api: OpenAPI | None = None
+        # Reentrant, because checking the plugin requirements accesses the api again.
+        self._api_lock = threading.RLock()
+        self._local = threading.local()
         self._api_version = api_version
         self._api_root: str = api_root
         self._api_kwargs = api_kwargs
@@ -320,6 +475,7 @@ class PulpContext:
         if self.fake_mode:
             self._api_kwargs["dry_run"] = True
         self.chunk_size = chunk_size
+        self.paging = paging
 
     @classmethod
     def from_config_files(
@@ -395,6 +551,8 @@ class PulpContext:
         for key in ["cert", "key", "user_agent", "cid", "dry_run"]:
             if key in config:
                 api_kwargs[key] = config[key]
+        settings_kwargs, paging = request_settings(config)
+        api_kwargs.update(settings_kwargs)
 
         return cls(
             api_root=config.get("api_root", "/pulp/"),
@@ -402,6 +560,7 @@ class PulpContext:
             verify_ssl=config.get("verify_ssl", True),
             api_version=config.get("api_version", "v3"),
             api_kwargs=api_kwargs,
+            paging=paging,
         )
 
     def _patch_api_spec(self) -> None:
@@ -430,34 +589,35 @@ class PulpContext:
         This is only needed for low level interactions with the openapi spec.
         All calls to the API should be performed via `call`.
         """
-        if self._api is None:
-            username = self._api_kwargs.pop("username", None)
-            password = self._api_kwargs.pop("password", None)
-            if username:
-                # Deprecated for 'auth'.
-                if not password:
-                    password = self.prompt("password", hide_input=True)
-                self._api_kwargs["auth_provider"] = GlueAuthProvider(
-                    username=username, password=password
-                )
-                warnings.warn(
-                    "Using 'username' and 'password' with 'PulpContext' is deprecated. "
-                    "Use an auth provider with the 'auth_provider' argument instead.",
-                    DeprecationWarning,
-                )
-            try:
-                self._api = OpenAPI(
-                    doc_path=f"{self._api_root}api/{self._api_version}/docs/api.json",
-                    verify_ssl=self.verify_ssl,
-                    patch_api_hook=_patch_api_hook,
-                    **self._api_kwargs,
-                )
-            except OpenAPIError as e:
-                raise PulpException(str(e))
-            self._patch_api_spec()
-            # Rerun scheduled version checks
-            for plugin_requirement in self._needed_plugins:
-                self.needs_plugin(plugin_requirement)
+        with self._api_lock:
+            if self._api is None:
+                username = self._api_kwargs.pop("username", None)
+                password = self._api_kwargs.pop("password", None)
+                if username:
+                    # Deprecated for 'auth'.
+                    if not password:
+                        password = self.prompt("password", hide_input=True)
+                    self._api_kwargs["auth_provider"] = GlueAuthProvider(
+                        username=username, password=password
+                    )
+                    warnings.warn(
+                        "Using 'username' and 'password' with 'PulpContext' is deprecated. "
+                        "Use an auth provider with the 'auth_provider' argument instead.",
+                        DeprecationWarning,
+                    )
+                try:
+                    self._api = self.OPENAPI_CLASS(
+                        doc_path=f"{self._api_root}api/{self._api_version}/docs/api.json",
+                        verify_ssl=self.verify_ssl,
+                        patch_api_hook=_patch_api_hook,
+                        **self._api_kwargs,
+                    )
+                except OpenAPIError as e:
+                    raise PulpException(str(e))
+                self._patch_api_spec()
+                # Rerun scheduled version checks
+                for plugin_requirement in self._needed_plugins:
+                    self.needs_plugin(plugin_requirement)
         return self._api
 
     @property
@@ -465,6 +625,50 @@ class PulpContext:
         result: dict[str, str] = self.api.api_spec.get("info", {}).get("x-pulp-app-versions", {})
         return result
 
+    def projection(self, operation_id: str, fields: t.Iterable[str]) -> dict[str, t.Any]:
+        """
+        Parameters to restrict the response of an operation to a set of fields.
+
+        Parameters:
+            operation_id: The operation ID in the openapi v3 spec to be called.
+            fields: Names of the fields the caller is going to read.
+
+        Returns:
+            The `fields` parameter if the server supports it for this operation, else nothing.
+        """
+        try:
+            supported = "fields" in self.api.param_spec(operation_id, "query")
+        except KeyError:
+            supported = False
+        return {"fields": sorted(set(fields))} if supported else {}
+
+    @property
+    def _entity_loader(self) -> _EntityLoader | None:
+        loader: _EntityLoader | None = getattr(self._local, "entity_loader", None)
+        return loader
+
+    @contextmanager
+    def coalesce(self) -> t.Iterator[None]:
+        """
+        Context manager to coalesce reading many entities by href.
+
+        Within the block, hrefs assigned to entity contexts are queued.
+        The first time one of them is read, all queued entities of the same type are fetched
+        together with `pulp_href__in` list calls and remembered until the block is left.
+        So the number of calls grows with the number of types rather than the number of entities.
+        Any modifying call discards the remembered entities.
+
+        The block only affects the current thread. Nested blocks share the outer one.
+        """
+        if self._entity_loader is not None:
+            yield
+            return
+        self._local.entity_loader = _EntityLoader()
+        try:
+            yield
+        finally:
+            self._local.entity_loader = None
+
     def call(
         self,
         operation_id: str,
@@ -472,6 +676,7 @@ class PulpContext:
         parameters: dict[str, t.Any] | None = None,
         body: EntityDefinition | None = None,
         validate_body: bool = True,
+        stream: bool = False,
     ) -> t.Any:
         """
         Perform an API call for operation_id.
@@ -484,6 +689,7 @@ class PulpContext:
             parameters: Arguments that are to be sent as headers, querystrings or part of the URI.
             body: Body payload for POST, PUT, PATCH calls.
             validate_body: Indicate whether the body should be validated.
+            stream: Parse a list response while it is received, see `OpenAPI.call`.
 
         Returns:
             The body of the response, or the task or task group if one was issued.
@@ -494,31 +700,26 @@ class PulpContext:
             PulpHTTPError: for unhandeld REST API errors
             PulpException: for all unhandeld openapi and http connection exceptions
         """
-        if parameters is None:
-            parameters = {}
-        if (
-            self.domain_enabled
-            and
-            # Validation will fail if path doesn't need domain parameter
-            "pulp_domain" in self.api.param_spec(operation_id, "path", required=True)
-        ):
-            parameters["pulp_domain"] = self.pulp_domain
-        parameters = preprocess_payload(parameters)
-
-        if body is not None:
-            body = preprocess_payload(body)
+        parameters, body = self._call_arguments(operation_id, parameters, body)
         try:
-            result = self.api.call(
-                operation_id,
-                parameters=parameters,
-                body=body,
-                validate_body=validate_body,
-            )
+            with span("call", operation_id=operation_id):
+                result = self.api.call(
+                    operation_id,
+                    parameters=parameters,
+                    body=body,
+                    validate_body=validate_body,
+                    stream=stream,
+                )
         except UnsafeCallError:
             if self.fake_mode:
                 raise NotImplementedFake(f"Operation {operation_id} was attempted in fake mode.")
             else:
                 raise
+        finally:
+            if (loader := self._entity_loader) is not None and (
+                self.api.operations[operation_id][0] != "get"
+            ):
+                loader.loaded.clear()
         # Asynchronous tasks seem to be reported by a dict containing only one key "task"
         if isinstance(result, dict) and ["task"] == list(result.keys()):
             task_href = result["task"]
@@ -528,12 +729,7 @@ class PulpContext:
                 err=True,
             )
             if not non_blocking:
-                result = self.wait_for_task(result)
-                if (
-                    self.has_plugin(PluginRequirement("core", specifier=">=3.86"))
-                    and result["result"] is not None
-                ):
-                    result = result["result"]
+                result = self._task_result(self.wait_for_task(result))
         elif isinstance(result, dict) and ["task_group"] == list(result.keys()):
             task_group_href = result["task_group"]
             result = self.api.call(
@@ -549,6 +745,35 @@ class PulpContext:
                 result = self.wait_for_task_group(result)
         return result
 
+    def _call_arguments(
+        self,
+        operation_id: str,
+        parameters: dict[str, t.Any] | None,
+        body: EntityDefinition | None,
+    ) -> tuple[dict[str, t.Any], EntityDefinition | None]:
+        if parameters is None:
+            parameters = {}
+        if (
+            self.domain_enabled
+            and
+            # Validation will fail if path doesn't need domain parameter
+            "pulp_domain" in self.api.param_spec(operation_id, "path", required=True)
+        ):
+            parameters["pulp_domain"] = self.pulp_domain
+        parameters = preprocess_payload(parameters)
+
+        if body is not None:
+            body = preprocess_payload(body)
+        return parameters, body
+
+    def _task_result(self, task: EntityDefinition) -> t.Any:
+        if (
+            self.has_plugin(PluginRequirement("core", specifier=">=3.86"))
+            and task["result"] is not None
+        ):
+            return task["result"]
+        return task
+
     @staticmethod
     def _task_finished(task: EntityDefinition, expect_cancel: bool = False) -> bool:
         task_href = task["pulp_href"]
@@ -593,16 +818,17 @@ class PulpContext:
             raise PulpNoWait(_("Not waiting for task because --background was specified."))
         task_href = task["pulp_href"]
         try:
-            while not self._task_finished(task, expect_cancel=expect_cancel):
-                if deadline and datetime.datetime.now() > deadline:
-                    raise PulpNoWait(
-                        _("Waiting for task {task_href} timed out.").format(
-                            task_href=task["pulp_href"]
+            with span("wait_for_task", task_href=task_href):
+                while not self._task_finished(task, expect_cancel=expect_cancel):
+                    if deadline and datetime.datetime.now() > deadline:
+                        raise PulpNoWait(
+                            _("Waiting for task {task_href} timed out.").format(
+                                task_href=task["pulp_href"]
+                            )
                         )
-                    )
-                time.sleep(1)
-                self.echo(".", nl=False, err=True)
-                task = self.api.call("tasks_read", parameters={"task_href": task["pulp_href"]})
+                    time.sleep(1)
+                    self.echo(".", nl=False, err=True)
+                    task = self.api.call("tasks_read", parameters={"task_href": task["pulp_href"]})
             self.echo("Done.", err=True)
             return task
         except KeyboardInterrupt:
@@ -612,11 +838,10 @@ class PulpContext:
         if task_group["waiting"] + task_group["running"] + task_group["canceling"] > 0:
             return False
         if task_group["failed"] + task_group["canceled"] > 0:
-            errors = []
-            for task in task_group["tasks"]:
-                if task["state"] in ["failed", "canceled"]:
-                    task = self.api.call("tasks_read", parameters={"task_href": task["pulp_href"]})
-                    errors.append(task["error"].get("description") or task["error"].get("reason"))
+            errors = [
+                task["error"].get("description") or task["error"].get("reason")
+                for task in self._failed_tasks(task_group)
+            ]
             raise PulpException(
                 _("Task group {task_group_href} has failed/canceled tasks: '{errors}'").format(
                     task_group_href=task_group["pulp_href"],
@@ -625,6 +850,49 @@ class PulpContext:
             )
         return True
 
+    def _failed_tasks(self, task_group: EntityDefinition) -> list[EntityDefinition]:
+        hrefs = [
+            task["pulp_href"]
+            for task in task_group["tasks"]
+            if task["state"] in ["failed", "canceled"]
+        ]
+        return self.read_tasks(hrefs, fields=["pulp_href", "state", "error"])
+
+    def read_tasks(
+        self, task_hrefs: t.Iterable[str], fields: t.Iterable[str] | None = None
+    ) -> list[EntityDefinition]:
+        """
+        Read many tasks with as few calls as possible.
+
+        The tasks are fetched with `tasks_list` calls filtering on batches of hrefs, or one by one
+        if the server does not support that filter.
+
+        Parameters:
+            task_hrefs: The tasks to read.
+            fields: Names of the fields to read. Defaults to all fields.
+
+        Returns:
+            The task records in no particular order.
+        """
+        hrefs = list(task_hrefs)
+        fields = None if fields is None else list(fields)
+        if "pulp_href__in" not in self.api.param_spec("tasks_list", "query"):
+            projection = {} if fields is None else self.projection("tasks_read", fields)
+            return [
+                self.api.call("tasks_read", parameters={"task_href": href, **projection})
+                for href in hrefs
+            ]
+        projection = {} if fields is None else self.projection("tasks_list", fields)
+        tasks: list[EntityDefinition] = []
+        for batch in PulpEntityContext.lookup_batches(hrefs):
+            tasks.extend(
+                self.call(
+                    "tasks_list",
+                    parameters={"pulp_href__in": batch, "limit": len(batch), **projection},
+                )["results"]
+            )
+        return tasks
+
     def wait_for_task_group(self, task_group: EntityDefinition) -> t.Any:
         """
         Wait for a task group to finish and return the finished task object.
@@ -641,19 +909,20 @@ class PulpContext:
         if self.background_tasks:
             raise PulpNoWait("Not waiting for task group because --background was specified.")
         try:
-            while not self._task_group_finished(task_group):
-                if deadline and datetime.datetime.now() > deadline:
-                    raise PulpNoWait(
-                        _("Waiting for task group {task_group_href} timed out.").format(
-                            task_group_href=task_group["pulp_href"]
+            with span("wait_for_task_group", task_group_href=task_group["pulp_href"]):
+                while not self._task_group_finished(task_group):
+                    if deadline and datetime.datetime.now() > deadline:
+                        raise PulpNoWait(
+                            _("Waiting for task group {task_group_href} timed out.").format(
+                                task_group_href=task_group["pulp_href"]
+                            )
                         )
+                    time.sleep(1)
+                    self.echo(".", nl=False, err=True)
+                    task_group = self.api.call(
+                        "task_groups_read",
+                        parameters={"task_group_href": task_group["pulp_href"]},
                     )
-                time.sleep(1)
-                self.echo(".", nl=False, err=True)
-                task_group = self.api.call(
-                    "task_groups_read",
-                    parameters={"task_group_href": task_group["pulp_href"]},
-                )
         except KeyboardInterrupt:
             raise PulpNoWait(
                 _("Task group {task_group_href} sent to background.").format(
@@ -672,26 +941,27 @@ class PulpContext:
         self,
         plugin_requirement: PluginRequirement,
     ) -> None:
-        if self._api is not None:
-            if not self.has_plugin(plugin_requirement):
-                component = f"{plugin_requirement.name}{plugin_requirement.specifier}"
-                feature = plugin_requirement.feature or _("this command")
-                if plugin_requirement.inverted:
-                    msg = _(
-                        "The server provides the pulp component '{component}',"
-                        " which prevents the use of {feature}."
-                        " See 'pulp status' for installed components."
-                    )
-                else:
-                    msg = _(
-                        "The server does not provide the pulp component '{component}',"
-                        " which is needed to use {feature}."
-                        " See 'pulp status' for installed components."
-                    )
-                raise PulpException(msg.format(component=component, feature=feature))
-        else:
-            # Schedule for later checking
-            self._needed_plugins.append(plugin_requirement)
+        with self._api_lock:
+            if self._api is None:
+                # Schedule for later checking
+                self._needed_plugins.append(plugin_requirement)
+                return
+        if not self.has_plugin(plugin_requirement):
+            component = f"{plugin_requirement.name}{plugin_requirement.specifier}"
+            feature = plugin_requirement.feature or _("this command")
+            if plugin_requirement.inverted:
+                msg = _(
+                    "The server provides the pulp component '{component}',"
+                    " which prevents the use of {feature}."
+                    " See 'pulp status' for installed components."
+                )
+            else:
+                msg = _(
+                    "The server does not provide the pulp component '{component}',"
+                    " which is needed to use {feature}."
+                    " See 'pulp status' for installed components."
+                )
+            raise PulpException(msg.format(component=component, feature=feature))
 
     def resolve_prn(self, prn: str) -> "PulpEntityContext":
         """
@@ -708,6 +978,324 @@ class PulpContext:
             return result
         raise ValidationError(f"Resource type {plugin}:{model} unknown.")
 
+    def resolve_prns(self, prns: t.Iterable[str]) -> list["PulpEntityContext"]:
+        """
+        Resolve many PRNs to entity contexts with their entities loaded, using few calls.
+
+        The PRNs are grouped by their resource type.
+        Each group is fetched with paginated list calls filtering on `prn__in`, or on
+        `pulp_href__in` for servers that cannot filter on PRNs.
+
+        Parameters:
+            prns: The PRNs to resolve.
+
+        Returns:
+            The entity contexts in the order of the PRNs.
+
+        Raises:
+            ValidationError: if a PRN is malformed or of an unknown type.
+            PulpEntityNotFound: if any PRN does not name an existing entity.
+        """
+        by_prn: dict[type[PulpEntityContext], bool] = {}
+        entity_ctxs: list[PulpEntityContext] = []
+        for prn in prns:
+            match = prn_regex.fullmatch(prn)
+            if match is None:
+                raise ValidationError(f"{prn} is not a PRN.")
+            plugin = match.group("plugin")
+            model = match.group("model")
+            ctx_class = PulpEntityContext.PRN_TYPE_REGISTRY.get(f"{plugin}:{model}")
+            if ctx_class is None:
+                raise ValidationError(f"Resource type {plugin}:{model} unknown.")
+            entity_ctx = ctx_class(self)
+            if ctx_class not in by_prn:
+                by_prn[ctx_class] = "prn__in" in self.api.param_spec(
+                    entity_ctx._operation_id("list"), "query"
+                )
+            if by_prn[ctx_class]:
+                entity_ctx.entity = {"prn__in": [prn]}
+            else:
+                entity_ctx = ctx_class.from_pulp_id(self, match.group("pulp_id"))
+            entity_ctxs.append(entity_ctx)
+        self.load_entities(entity_ctxs)
+        return entity_ctxs
+
+    def prn_to_href(self, prn: str) -> str:
+        """
+        Translate a PRN into the href of the resource it names.
+
+        This does not contact the server for resource types providing an `HREF_TEMPLATE`.
+        """
+        entity_ctx = self.resolve_prn(prn)
+        href: str | None = entity_ctx._entity_lookup.get("pulp_href")
+        return href or entity_ctx.pulp_href
+
+    def _find_entities(
+        self, entity_ctxs: t.Sequence["PulpEntityContext"], complete: bool
+    ) -> list[EntityDefinition]:
+        # Performs the pending lookups of the contexts grouped by their type and search scope.
+        # Reports all lookups that did not match exactly one entity at once.
+        entities: list[EntityDefinition | None] = [None] * len(entity_ctxs)
+        groups: dict[tuple[t.Any, ...], list[int]] = {}
+        for index, entity_ctx in enumerate(entity_ctxs):
+            entity_ctx._prepare_lookup()
+            key = (
+                type(entity_ctx),
+                json.dumps(entity_ctx._batch_filters(), sort_keys=True, default=str),
+            )
+            groups.setdefault(key, []).append(index)
+        missing: list[str] = []
+        ambiguous: list[str] = []
+        for indices in groups.values():
+            entity_ctx = entity_ctxs[indices[0]]
+            lookups = [entity_ctxs[index]._entity_lookup for index in indices]
+            for index, lookup, matches in zip(
+                indices, lookups, entity_ctx.find_many(lookups, complete=complete)
+            ):
+                if len(matches) == 1:
+                    entities[index] = matches[0]
+                elif matches:
+                    ambiguous.append(
+                        _("Multiple {entities} found with {kwargs}.").format(
+                            entities=entity_ctx.ENTITIES, kwargs=lookup
+                        )
+                    )
+                else:
+                    missing.append(
+                        _("Could not find {entity} with {kwargs}.").format(
+                            entity=entity_ctx.ENTITY, kwargs=lookup
+                        )
+                    )
+        if ambiguous:
+            raise PulpException("\n".join(missing + ambiguous))
+        if missing:
+            raise PulpEntityNotFound("\n".join(missing))
+        return [entity for entity in entities if entity is not None]
+
+    def resolve_hrefs(self, entity_ctxs: t.Sequence["PulpEntityContext"]) -> list[str]:
+        """
+        Look up the hrefs of many entity contexts with as few calls as possible.
+
+        The contexts are grouped by their type and resolved with `PulpEntityContext.find_many`.
+        Afterwards, each context is attached to its entity by href.
+
+        Parameters:
+            entity_ctxs: Contexts with a pending lookup, an href or a loaded entity.
+
+        Returns:
+            The hrefs in the order of the contexts.
+
+        Raises:
+            PulpEntityNotFound: if any lookup did not match an entity.
+            PulpException: if any lookup matched multiple entities.
+        """
+        hrefs: list[str | None] = [None] * len(entity_ctxs)
+        pending: list[int] = []
+        for index, entity_ctx in enumerate(entity_ctxs):
+            if entity_ctx._entity is not None:
+                hrefs[index] = entity_ctx._entity["pulp_href"]
+            elif entity_ctx._entity_lookup.get("pulp_href"):
+                hrefs[index] = entity_ctx._entity_lookup["pulp_href"]
+            else:
+                pending.append(index)
+        entities = self._find_entities([entity_ctxs[index] for index in pending], complete=False)
+        for index, entity in zip(pending, entities):
+            hrefs[index] = entity["pulp_href"]
+        result: list[str] = []
+        for entity_ctx, href in zip(entity_ctxs, hrefs):
+            assert href is not None
+            if entity_ctx._entity is None:
+                entity_ctx.pulp_href = href
+            result.append(href)
+        return result
+
+    def load_entities(self, entity_ctxs: t.Sequence["PulpEntityContext"]) -> None:
+        """
+        Load the entities of many entity contexts with as few calls as possible.
+
+        The contexts are grouped by their type and their entities are fetched with
+        `PulpEntityContext.find_many`.
+        Contexts referring to their entity by href are included if the list endpoint can filter on
+        `pulp_href__in`. Otherwise they are left to be looked up lazily.
+        Afterwards, each context holds its entity as if `entity` had been accessed.
+
+        Parameters:
+            entity_ctxs: Contexts with a pending lookup, an href or a loaded entity.
+
+        Raises:
+            PulpEntityNotFound: if any lookup did not match an entity.
+            PulpException: if any lookup matched multiple entities.
+        """
+        pending: list[PulpEntityContext] = []
+        for entity_ctx in entity_ctxs:
+            if entity_ctx._entity is not None:
+                continue
+            if entity_ctx._entity_lookup.get("pulp_href") and (
+                "pulp_href__in"
+                not in self.api.param_spec(entity_ctx._operation_id("list"), "query")
+            ):
+                continue
+            pending.append(entity_ctx)
+        for entity_ctx, entity in zip(pending, self._find_entities(pending, complete=True)):
+            entity_ctx._entity = entity
+            entity_ctx._entity_lookup = {}
+            entity_ctx._partial_entity = {}
+
+
+class AsyncPulpContext(PulpContext):
+    """
+    Variant of `PulpContext` that can additionally be used from asyncio code.
+
+    It wraps an `AsyncOpenAPI` object and provides coroutine counterparts of the methods talking
+    to the server, prefixed with `a`.
+    The entity contexts offer the same for their operations if attached to an `AsyncPulpContext`.
+    All synchronous methods keep working.
+
+    ```python
+    pulp_ctx = AsyncPulpContext.from_config(config)
+    repository_ctx = PulpFileRepositoryContext(pulp_ctx)
+    async with asyncio.TaskGroup() as tg:
+        for index in range(100):
+            tg.create_task(repository_ctx.acreate({"name": f"repository_{index}"}))
+    await pulp_ctx.aclose()
+    ```
+    """
+
+    OPENAPI_CLASS = AsyncOpenAPI
+
+    @property
+    def async_api(self) -> AsyncOpenAPI:
+        """
+        The lazy evaluated `AsyncOpenAPI` object contained in this context.
+        """
+        return t.cast(AsyncOpenAPI, self.api)
+
+    async def aapi(self) -> AsyncOpenAPI:
+        """
+        The `AsyncOpenAPI` object, loaded without blocking the event loop.
+        """
+        if self._api is None:
+            # Loading the api spec may need to download it.
+            await asyncio.to_thread(lambda: self.api)
+        return self.async_api
+
+    async def aclose(self) -> None:
+        """
+        Release the connections held by the api object.
+        """
+        if self._api is not None:
+            await self.async_api.aclose()
+
+    async def acall(
+        self,
+        operation_id: str,
+        non_blocking: bool = False,
+        parameters: dict[str, t.Any] | None = None,
+        body: EntityDefinition | None = None,
+        validate_body: bool = True,
+    ) -> t.Any:
+        """
+        Perform an API call for operation_id without blocking the event loop.
+
+        See `call` for the parameters, return value and exceptions.
+        """
+        api = await self.aapi()
+        parameters, body = self._call_arguments(operation_id, parameters, body)
+        try:
+            with span("call", operation_id=operation_id):
+                result = await api.acall(
+                    operation_id,
+                    parameters=parameters,
+                    body=body,
+                    validate_body=validate_body,
+                )
+        except UnsafeCallError:
+            if self.fake_mode:
+                raise NotImplementedFake(f"Operation {operation_id} was attempted in fake mode.")
+            else:
+                raise
+        if isinstance(result, dict) and ["task"] == list(result.keys()):
+            task_href = result["task"]
+            result = await api.acall("tasks_read", parameters={"task_href": task_href})
+            self.echo(
+                _("Started background task {task_href}").format(task_href=task_href),
+                err=True,
+            )
+            if not non_blocking:
+                result = self._task_result(await self.await_for_task(result))
+        elif isinstance(result, dict) and ["task_group"] == list(result.keys()):
+            task_group_href = result["task_group"]
+            result = await api.acall(
+                "task_groups_read", parameters={"task_group_href": task_group_href}
+            )
+            self.echo(
+                _("Started background task group {task_group_href}").format(
+                    task_group_href=task_group_href
+                ),
+                err=True,
+            )
+            if not non_blocking:
+                result = await self.await_for_task_group(result)
+        return result
+
+    async def await_for_task(self, task: EntityDefinition, expect_cancel: bool = False) -> t.Any:
+        """
+        Wait for a task to finish without blocking the event loop.
+
+        See `wait_for_task` for the parameters, return value and exceptions.
+        """
+        deadline = datetime.datetime.now() + self.timeout if self.timeout else None
+
+        if self.background_tasks:
+            raise PulpNoWait(_("Not waiting for task because --background was specified."))
+        with span("wait_for_task", task_href=task["pulp_href"]):
+            while not self._task_finished(task, expect_cancel=expect_cancel):
+                if deadline and datetime.datetime.now() > deadline:
+                    raise PulpNoWait(
+                        _("Waiting for task {task_href} timed out.").format(
+                            task_href=task["pulp_href"]
+                        )
+                    )
+                await asyncio.sleep(1)
+                task = await (await self.aapi()).acall(
+                    "tasks_read", parameters={"task_href": task["pulp_href"]}
+                )
+        return task
+
+    async def await_for_task_group(self, task_group: EntityDefinition) -> t.Any:
+        """
+        Wait for a task group to finish without blocking the event loop.
+
+        See `wait_for_task_group` for the parameters, return value and exceptions.
+        """
+        deadline = datetime.datetime.now() + self.timeout if self.timeout else None
+
+        if self.background_tasks:
+            raise PulpNoWait("Not waiting for task group because --background was specified.")
+        with span("wait_for_task_group", task_group_href=task_group["pulp_href"]):
+            while not await self._atask_group_finished(task_group):
+                if deadline and datetime.datetime.now() > deadline:
+                    raise PulpNoWait(
+                        _("Waiting for task group {task_group_href} timed out.").format(
+                            task_group_href=task_group["pulp_href"]
+                        )
+                    )
+                await asyncio.sleep(1)
+                task_group = await (await self.aapi()).acall(
+                    "task_groups_read",
+                    parameters={"task_group_href": task_group["pulp_href"]},
+                )
+        return task_group
+
+    async def _atask_group_finished(self, task_group: EntityDefinition) -> bool:
+        if (
+            task_group["waiting"] + task_group["running"] + task_group["canceling"] == 0
+            and task_group["failed"] + task_group["canceled"] > 0
+        ):
+            # Reading the failed tasks blocks.
+            return await asyncio.to_thread(self._task_group_finished, task_group)
+        return self._task_group_finished(task_group)
+
 
 class PulpViewSetContext:
     """
@@ -730,6 +1318,11 @@ class PulpViewSetContext:
         for plugin_requirement in self.NEEDS_PLUGINS:
             self.pulp_ctx.needs_plugin(plugin_requirement)
 
+    def _operation_id(self, operation: str) -> str:
+        return t.cast(
+            str, getattr(self, operation.upper() + "_ID", None) or self.ID_PREFIX + "_" + operation
+        )
+
     def call(
         self,
         operation: str,
@@ -737,6 +1330,7 @@ class PulpViewSetContext:
         parameters: dict[str, t.Any] | None = None,
         body: EntityDefinition | None = None,
         validate_body: bool = True,
+        stream: bool = False,
     ) -> t.Any:
         """
         Perform an API call for operation.
@@ -750,6 +1344,7 @@ class PulpViewSetContext:
             parameters: Arguments that are to be sent as headers, querystrings or part of the URI.
             body: Body payload for POST, PUT, PATCH calls.
             validate_body: Indicate whether the body should be validated.
+            stream: Parse a list response while it is received, see `OpenAPI.call`.
 
         Returns:
             The body of the response, or the task or task group if one was issued.
@@ -757,17 +1352,54 @@ class PulpViewSetContext:
         Raises:
             PulpNoWait: in case the context has `background_tasks` set or a task (group) timed out.
         """
-        operation_id: str = (
-            getattr(self, operation.upper() + "_ID", None) or self.ID_PREFIX + "_" + operation
-        )
         return self.pulp_ctx.call(
-            operation_id,
+            self._operation_id(operation),
             non_blocking=non_blocking,
             parameters=parameters,
             body=body,
             validate_body=validate_body,
+            stream=stream,
         )
 
+    @property
+    def _async_pulp_ctx(self) -> AsyncPulpContext:
+        if not isinstance(self.pulp_ctx, AsyncPulpContext):
+            raise PulpException(_("Async operations need an AsyncPulpContext."))
+        return self.pulp_ctx
+
+    async def acall(
+        self,
+        operation: str,
+        non_blocking: bool = False,
+        parameters: dict[str, t.Any] | None = None,
+        body: EntityDefinition | None = None,
+        validate_body: bool = True,
+    ) -> t.Any:
+        """
+        Perform an API call for operation without blocking the event loop.
+
+        See `call` for the parameters and return value.
+        The context must be attached to an `AsyncPulpContext`.
+        """
+        return await self._async_pulp_ctx.acall(
+            self._operation_id(operation),
+            non_blocking=non_blocking,
+            parameters=parameters,
+            body=body,
+            validate_body=validate_body,
+        )
+
+
+def _match_lookup(lookup: EntityDefinition) -> EntityDefinition:
+    # Turns filters on a single value of an `__in` filter into lookups on the field itself.
+    result: EntityDefinition = {}
+    for key, value in lookup.items():
+        if key.endswith("__in") and isinstance(value, (list, tuple)) and len(value) == 1:
+            result[key[: -len("__in")]] = value[0]
+        else:
+            result[key] = value
+    return result
+
 
 class PulpEntityContext(PulpViewSetContext):
     """
@@ -817,15 +1449,60 @@ class PulpEntityContext(PulpViewSetContext):
     RESOURCE_TYPE: t.ClassVar[str]
     MODEL: t.ClassVar[str]
     PRN_TYPE_REGISTRY: t.Final[dict[str, type["PulpEntityContext"]]] = {}
+    BATCH_LOOKUP_SIZE: t.ClassVar[int] = 100
+    """Maximal number of values in a single `__in` filter sent by `find_many`."""
+    BATCH_LOOKUP_LENGTH: t.ClassVar[int] = 4000
+    """
+    Maximal length of the URL encoded values in a single `__in` filter, to stay below the common
+    limit of 8 KiB for request lines.
+    """
+    IMMUTABLE: t.ClassVar[bool] = False
+    """Whether the entities never change once created, so reading them can be cached."""
+    IMMUTABLE_OPERATIONS: t.Final[dict[str, str | None]] = {}
+    """
+    Operations with responses that never change, mapped to a query parameter they need to be
+    called with for that, if any.
+    """
 
     def __init_subclass__(cls, **kwargs: t.Any) -> None:
         super().__init_subclass__(**kwargs)
         if hasattr(cls, "PLUGIN") and hasattr(cls, "MODEL"):
             cls.PRN_TYPE_REGISTRY[f"{cls.PLUGIN}:{cls.MODEL}"] = cls
+        if cls.IMMUTABLE and hasattr(cls, "ID_PREFIX"):
+            read_id = getattr(cls, "READ_ID", None) or cls.ID_PREFIX + "_read"
+            cls.IMMUTABLE_OPERATIONS[read_id] = None
+
+    @classmethod
+    def lookup_batches(cls, values: t.Iterable[str]) -> t.Iterator[list[str]]:
+        """
+        Split values into batches to be sent in `__in` filters.
+
+        Batches hold up to `BATCH_LOOKUP_SIZE` values and up to `BATCH_LOOKUP_LENGTH` characters
+        once encoded.
+        The server splits `__in` filters on commas, so values containing one must be looked up on
+        their own.
+        """
+        batch: list[str] = []
+        length = 0
+        for value in values:
+            # Include the encoded separator.
+            value_length = len(quote(value, safe="")) + 3
+            if batch and (
+                len(batch) >= cls.BATCH_LOOKUP_SIZE
+                or length + value_length > cls.BATCH_LOOKUP_LENGTH
+            ):
+                yield batch
+                batch = []
+                length = 0
+            batch.append(value)
+            length += value_length
+        if batch:
+            yield batch
 
     # Hidden values for the lazy entity lookup
     _entity: EntityDefinition | None
     _entity_lookup: EntityDefinition
+    _partial_entity: EntityDefinition
 
     @property
     def scope(self) -> dict[str, t.Any]:
@@ -851,15 +1528,13 @@ class PulpEntityContext(PulpViewSetContext):
         Assigning to it will reset the lazy lookup behaviour.
         """
         if self._entity is None:
-            if not self._entity_lookup:
-                raise PulpException(
-                    _("A {entity} must be specified for this command.").format(entity=self.ENTITY)
-                )
+            self._prepare_lookup()
             if self._entity_lookup.get("pulp_href"):
                 self._entity = self.show(self._entity_lookup["pulp_href"])
             else:
                 self._entity = self.find(**self._entity_lookup)
             self._entity_lookup = {}
+            self._partial_entity = {}
         return self._entity
 
     @entity.setter
@@ -872,6 +1547,59 @@ class PulpEntityContext(PulpViewSetContext):
             self._entity_lookup.update(value)
             self._entity_lookup.pop("pulp_href", None)
         self._entity = None
+        self._partial_entity = {}
+
+    def _prepare_lookup(self) -> None:
+        # Hook for subclasses to adjust the lookup before it is performed.
+        if not self._entity_lookup:
+            raise PulpException(
+                _("A {entity} must be specified for this command.").format(entity=self.ENTITY)
+            )
+
+    async def _aprepare_lookup(self) -> None:
+        # Counterpart of `_prepare_lookup` for subclasses that need to ask the server.
+        self._prepare_lookup()
+
+    def partial_entity(self, fields: t.Iterable[str]) -> EntityDefinition:
+        """
+        Lookup only some fields of the entity.
+
+        If the entity has not been loaded yet, only the requested fields are fetched from the
+        server, given the api supports it.
+        The result is not cached as the `entity`, but the lookup is turned into one by href.
+
+        Parameters:
+            fields: Names of the fields the caller is going to read.
+
+        Returns:
+            A (possibly partial) representation of the entity containing at least `fields`.
+        """
+        if self._entity is not None:
+            return self._entity
+        fields = set(fields) | {"pulp_href"}
+        if fields <= self._partial_entity.keys():
+            return self._partial_entity
+        self._prepare_lookup()
+        if href := self._entity_lookup.get("pulp_href"):
+            loader = self.pulp_ctx._entity_loader
+            if loader is not None and (entity := loader.load(self, href)) is not None:
+                # The full entity has been fetched in a batch anyway.
+                self._entity = entity
+                self._entity_lookup = {}
+                self._partial_entity = {}
+                return entity
+            projection = self.pulp_ctx.projection(self._operation_id("read"), fields)
+            if not projection:
+                return self.entity
+            result = self.call("read", parameters={self.HREF: href, **projection})
+        else:
+            projection = self.pulp_ctx.projection(self._operation_id("list"), fields)
+            if not projection:
+                return self.entity
+            result = self.find(**self._entity_lookup, **projection)
+        self._entity_lookup = {"pulp_href": result["pulp_href"]}
+        self._partial_entity = result
+        return t.cast(EntityDefinition, result)
 
     @property
     def pulp_href(self) -> str:
@@ -879,6 +1607,14 @@ class PulpEntityContext(PulpViewSetContext):
         Property to represent the href of the attached entity.
         Assigning to it will reset the lazy lookup behaviour.
         """
+        if self._entity is None:
+            if "pulp_href" in self._partial_entity:
+                return str(self._partial_entity["pulp_href"])
+            self._prepare_lookup()
+            if href := self._entity_lookup.get("pulp_href"):
+                return str(href)
+        # A search for the href costs as much as one for the full entity, which is usually
+        # needed next.
         return str(self.entity["pulp_href"])
 
     @pulp_href.setter
@@ -893,6 +1629,9 @@ class PulpEntityContext(PulpViewSetContext):
         # Setting this property will always (lazily) retrigger retrieving the entity.
         self._entity_lookup = {"pulp_href": value}
         self._entity = None
+        self._partial_entity = {}
+        if (loader := self.pulp_ctx._entity_loader) is not None:
+            loader.queue(self, value)
 
     @classmethod
     def from_pulp_id(cls, pulp_ctx: PulpContext, pulp_id: str) -> "t.Self":
@@ -921,6 +1660,7 @@ class PulpEntityContext(PulpViewSetContext):
 
         self._entity = None
         self._entity_lookup = entity or {}
+        self._partial_entity = {}
         if pulp_href is not None:
             self.pulp_href = pulp_href
 
@@ -959,8 +1699,9 @@ class PulpEntityContext(PulpViewSetContext):
         self,
         parameters: dict[str, t.Any] | None = None,
         offset: int = 0,
-        batch_size: int = BATCH_SIZE,
+        batch_size: int | None = None,
         stats: dict[str, t.Any] | None = None,
+        paging: AdaptivePaging | None = None,
     ) -> t.Iterator[t.Any]:
         """
         List entities from this context in a batched iterator.
@@ -970,8 +1711,16 @@ class PulpEntityContext(PulpViewSetContext):
             offset: Number of entities to skip.
             batch_size: Size of the batches to fetch.
                 Maximally BATCH_SIZE will be used.
+                Without it, the batch size adapts according to `paging`.
             stats: If provided, a dictionary that will be filled with metadata:
                 count: Number of entities reported by the server to match the criteria.
+                page_sizes: The sizes of the batches requested.
+            paging: Adapt the batch size toward a target latency.
+                Defaults to the `paging` of the `PulpContext` unless `batch_size` is given.
+                Without either, BATCH_SIZE is used.
+
+        If the connection breaks while a page is received, the rest of the page is requested
+        again according to the retry policy of the api.
 
         Returns:
             Iterator of entities matching the search conditions.
@@ -979,15 +1728,95 @@ class PulpEntityContext(PulpViewSetContext):
         payload: dict[str, t.Any] = parameters.copy() if parameters else {}
         payload.update(self.scope)
         payload["offset"] = offset
-        payload["limit"] = min(batch_size, BATCH_SIZE)
+        paging, operation_id = self._list_paging(batch_size, paging, payload)
+        retry_policy = self.pulp_ctx.api.retry_policy
+        retries = 0
+        delay = 0.0
+        while True:
+            start = time.monotonic()
+            # Entities are parsed one by one while the page is received.
+            response = self.call("list", parameters=payload, stream=True)
+            latency = time.monotonic() - start
+            if stats is not None:
+                stats["count"] = response["count"]
+                stats.setdefault("page_sizes", []).append(payload["limit"])
+            received = 0
+            try:
+                for entity in response["results"]:
+                    payload["offset"] += 1
+                    received += 1
+                    yield entity
+            except OpenAPIConnectionError:
+                # A page that broke off while it was received is requested again, starting after
+                # the last entity received.
+                if retry_policy is None or retries >= retry_policy.retries:
+                    raise
+                retries += 1
+                delay = retry_policy.delay(None, delay)
+                time.sleep(delay)
+                continue
+            retries = 0
+            delay = 0.0
+            if response["next"] is None:
+                break
+            if paging is not None:
+                payload["limit"] = paging.record(
+                    operation_id,
+                    payload["limit"],
+                    received,
+                    latency,
+                    response.size if isinstance(response, StreamedPage) else None,
+                )
+
+    async def alist_iterator(
+        self,
+        parameters: dict[str, t.Any] | None = None,
+        offset: int = 0,
+        batch_size: int | None = None,
+        stats: dict[str, t.Any] | None = None,
+        paging: AdaptivePaging | None = None,
+    ) -> t.AsyncIterator[t.Any]:
+        """
+        List entities from this context in a batched async iterator.
+
+        See `list_iterator` for the parameters.
+        """
+        payload: dict[str, t.Any] = parameters.copy() if parameters else {}
+        payload.update(self.scope)
+        payload["offset"] = offset
+        paging, operation_id = self._list_paging(batch_size, paging, payload)
         while True:
-            response: t.Mapping[str, t.Any] = self.call("list", parameters=payload)
+            start = time.monotonic()
+            response: t.Mapping[str, t.Any] = await self.acall("list", parameters=payload)
+            latency = time.monotonic() - start
             if stats is not None:
                 stats["count"] = response["count"]
+                stats.setdefault("page_sizes", []).append(payload["limit"])
             payload["offset"] += len(response["results"])
-            yield from response["results"]
+            for entity in response["results"]:
+                yield entity
             if response["next"] is None:
                 break
+            if paging is not None:
+                payload["limit"] = paging.record(
+                    operation_id, payload["limit"], len(response["results"]), latency
+                )
+
+    def _list_paging(
+        self,
+        batch_size: int | None,
+        paging: AdaptivePaging | None,
+        payload: dict[str, t.Any],
+    ) -> tuple[AdaptivePaging | None, str]:
+        # Sets the first page size and returns the paging to adapt it with.
+        operation_id = self._operation_id("list")
+        if paging is None and batch_size is None:
+            paging = self.pulp_ctx.paging
+        if paging is None:
+            payload["limit"] = min(batch_size or BATCH_SIZE, BATCH_SIZE)
+        else:
+            payload["limit"] = paging.page_size(operation_id)
+        return paging, operation_id
 
     def _list(self, limit: int, offset: int, parameters: dict[str, t.Any]) -> list[t.Any]:
         """
@@ -1018,10 +1847,11 @@ class PulpEntityContext(PulpViewSetContext):
         except StopIteration:
             pass
         else:
-            self.pulp_ctx.echo(
-                _("Not all {count} entries were shown.").format(count=stats["count"]),
-                err=True,
-            )
+            if limit > 0:
+                self.pulp_ctx.echo(
+                    _("Not all {count} entries were shown.").format(count=stats["count"]),
+                    err=True,
+                )
         return entities
 
     def find(self, **kwargs: t.Any) -> t.Any:
@@ -1040,11 +1870,28 @@ class PulpEntityContext(PulpViewSetContext):
             PulpEntityNotFound: if no entity satisfies the search parameters.
             PulpException: if multiple entities satisfy the search parameters.
         """
+        result: t.Mapping[str, t.Any] = self.call("list", parameters=self._find_payload(kwargs))
+        return self._found(result, kwargs)
+
+    async def afind(self, **kwargs: t.Any) -> t.Any:
+        """
+        Find an entity based on search parameters without blocking the event loop.
+
+        See `find` for the parameters, return value and exceptions.
+        """
+        result = await self.acall("list", parameters=self._find_payload(kwargs))
+        return self._found(result, kwargs)
+
+    def _find_payload(self, kwargs: dict[str, t.Any]) -> dict[str, t.Any]:
         payload: dict[str, t.Any] = kwargs.copy()
         payload.update(self.scope)
         payload["offset"] = 0
         payload["limit"] = 1
-        result: t.Mapping[str, t.Any] = self.call("list", parameters=payload)
+        return payload
+
+    def _found(self, result: t.Mapping[str, t.Any], kwargs: dict[str, t.Any]) -> t.Any:
+        # A field projection is not part of the search criteria.
+        kwargs = {key: value for key, value in kwargs.items() if key != "fields"}
         if result["count"] == 0:
             raise PulpEntityNotFound(
                 _("Could not find {entity} with {kwargs}.").format(
@@ -1059,10 +1906,94 @@ class PulpEntityContext(PulpViewSetContext):
             )
         return result["results"][0]
 
+    def _batch_filters(self) -> dict[str, t.Any]:
+        # Search parameters shared by all lookups resolved together by `find_many`.
+        return dict(self.scope)
+
+    def find_many(
+        self, lookups: t.Sequence[EntityDefinition], complete: bool = False
+    ) -> list[list[EntityDefinition]]:
+        """
+        Find the entities matching each of many lookups with few list calls.
+
+        Lookups on the same fields, one of which provides an `__in` filter, are combined into list
+        calls filtering on batches of values of that field, see `lookup_batches`.
+        A lookup on a single value of an `__in` filter, like `{"prn__in": [prn]}`, is treated as
+        a lookup on the field itself.
+        The results are matched to the lookups locally.
+        All other lookups are searched one by one.
+
+        Parameters:
+            lookups: Search parameters like passed to `find`.
+            complete: Fetch the full entities.
+
+        Returns:
+            For each lookup, the entities matching it.
+            Unless `complete` is set, only `pulp_href` and the fields of the lookups are guaranteed
+            to be present.
+        """
+        operation_id = self._operation_id("list")
+        query_params = self.pulp_ctx.api.param_spec(operation_id, "query")
+        filters = self._batch_filters()
+        match_lookups = [_match_lookup(lookup) for lookup in lookups]
+        results: list[list[EntityDefinition]] = [[] for _lookup in lookups]
+        groups: dict[tuple[str, ...], list[int]] = {}
+        for index, lookup in enumerate(match_lookups):
+            groups.setdefault(tuple(lookup), []).append(index)
+        for fields, indices in groups.items():
+            key = next((field for field in fields if f"{field}__in" in query_params), None)
+            index_by_values: dict[tuple[str, ...], list[EntityDefinition]] | None = None
+            if key is not None:
+                index_by_values = self._find_many_by(
+                    key, fields, [match_lookups[i] for i in indices], complete
+                )
+            for index in indices:
+                if index_by_values is not None:
+                    results[index] = index_by_values.get(
+                        tuple(str(match_lookups[index][field]) for field in fields), []
+                    )
+                else:
+                    payload = {**lookups[index], **filters, "offset": 0, "limit": 2}
+                    results[index] = self.call("list", parameters=payload)["results"]
+        return results
+
+    def _find_many_by(
+        self,
+        key: str,
+        fields: tuple[str, ...],
+        lookups: list[EntityDefinition],
+        complete: bool = False,
+    ) -> dict[tuple[str, ...], list[EntityDefinition]] | None:
+        # Returns the entities indexed by the values of `fields`, or `None` if they cannot be
+        # matched locally because some of the fields are not part of the entities.
+        parameters = self._batch_filters()
+        if not complete:
+            parameters.update(
+                self.pulp_ctx.projection(self._operation_id("list"), ["pulp_href", *fields])
+            )
+        values = sorted({str(lookup[key]) for lookup in lookups})
+        index_by_values: dict[tuple[str, ...], list[EntityDefinition]] = {}
+        batches: list[dict[str, t.Any]] = [
+            {f"{key}__in": batch}
+            for batch in self.lookup_batches(value for value in values if "," not in value)
+        ]
+        # Values with a comma would be split by the server.
+        batches.extend({key: value} for value in values if "," in value)
+        for batch in batches:
+            for entity in self.list_iterator(parameters={**parameters, **batch}):
+                if any(field not in entity for field in fields):
+                    return None
+                index_by_values.setdefault(
+                    tuple(str(entity[field]) for field in fields), []
+                ).append(entity)
+        return index_by_values
+
     def show(self, href: str | None = None) -> t.Any:
         """
         Retrieve and return the full record of an entity from the server.
 
+        Within a `PulpContext.coalesce` block, the record may be taken from a batched list call.
+
         Parameters:
             href: href of the entity to fetch. If not specified, the entity represented by `entity`
                 will be used.
@@ -1073,7 +2004,50 @@ class PulpEntityContext(PulpViewSetContext):
         Raises:
             PulpException: if no href was specified and the lazy lookup failed.
         """
-        return self.call("read", parameters={self.HREF: href or self.pulp_href})
+        href = href or self.pulp_href
+        loader = self.pulp_ctx._entity_loader
+        if loader is not None and (entity := loader.load(self, href)) is not None:
+            return entity
+        return self.call("read", parameters={self.HREF: href})
+
+    async def ashow(self, href: str | None = None) -> t.Any:
+        """
+        Retrieve the full record of an entity without blocking the event loop.
+
+        See `show` for the parameters, return value and exceptions.
+        """
+        return await self.acall("read", parameters={self.HREF: href or await self.apulp_href()})
+
+    async def apulp_href(self) -> str:
+        """
+        The href of the attached entity, looked up without blocking the event loop.
+        """
+        if self._entity is not None:
+            return str(self._entity["pulp_href"])
+        if "pulp_href" in self._partial_entity:
+            return str(self._partial_entity["pulp_href"])
+        await self._aprepare_lookup()
+        if href := self._entity_lookup.get("pulp_href"):
+            return str(href)
+        # Like `pulp_href`, the full entity is looked up.
+        self._entity = await self.afind(**self._entity_lookup)
+        self._entity_lookup = {}
+        self._partial_entity = {}
+        return str(self._entity["pulp_href"])
+
+    def _created_href(self, task: EntityDefinition) -> str:
+        try:
+            if getattr(self, "HREF_PATTERN", None):
+                return str(
+                    next(
+                        h
+                        for h in task["created_resources"]
+                        if re.match(re.escape(self.pulp_ctx.api_path) + self.HREF_PATTERN, h)
+                    )
+                )
+            return str(task["created_resources"][0])  # YOLO
+        except (KeyError, StopIteration):
+            raise PulpException(_("No suitable resource got created."))
 
     def create(
         self,
@@ -1111,21 +2085,48 @@ class PulpEntityContext(PulpViewSetContext):
         )
         if result["pulp_href"].startswith(self.pulp_ctx.api_path + "tasks/"):
             if not non_blocking:
-                try:
-                    if getattr(self, "HREF_PATTERN", None):
-                        self.pulp_href = next(
-                            h
-                            for h in result["created_resources"]
-                            if re.match(
-                                re.escape(self.pulp_ctx.api_path) + self.HREF_PATTERN,
-                                h,
-                            )
-                        )
-                    else:
-                        self.pulp_href = result["created_resources"][0]  # YOLO
-                    result = self.entity
-                except (KeyError, StopIteration):
-                    raise PulpException(_("No suitable resource got created."))
+                self.pulp_href = self._created_href(result)
+                result = self.entity
+            else:
+                self.entity = None
+        else:
+            self._entity = result
+            self._entity_lookup = {}
+
+        return result
+
+    async def acreate(
+        self,
+        body: EntityDefinition,
+        parameters: t.Mapping[str, t.Any] | None = None,
+        non_blocking: bool = False,
+    ) -> t.Any:
+        """
+        Create an entity without blocking the event loop.
+
+        See `create` for the parameters and return value.
+        Type specific preparations of subclasses overriding `create`, like uploading files, are not
+        applied.
+        """
+        if self.pulp_ctx.fake_mode:
+            return await asyncio.to_thread(self.create, body, parameters, non_blocking)
+        _parameters = self.scope
+        if parameters:
+            _parameters.update(parameters)
+        # Resolving related entities may need lookups.
+        body = await asyncio.to_thread(self.preprocess_entity, body, False)
+
+        result = await self.acall(
+            "create",
+            parameters=_parameters,
+            body=body,
+            non_blocking=non_blocking,
+        )
+        if result["pulp_href"].startswith(self.pulp_ctx.api_path + "tasks/"):
+            if not non_blocking:
+                result = await self.ashow(self._created_href(result))
+                self._entity = result
+                self._entity_lookup = {}
             else:
                 self.entity = None
         else:
@@ -1178,6 +2179,43 @@ class PulpEntityContext(PulpViewSetContext):
 
         return result
 
+    async def aupdate(
+        self,
+        body: EntityDefinition | None = None,
+        parameters: t.Mapping[str, t.Any] | None = None,
+        non_blocking: bool = False,
+    ) -> t.Any:
+        """
+        Update the entity without blocking the event loop.
+
+        See `update` for the parameters and return value.
+        """
+        if self.pulp_ctx.fake_mode:
+            return await asyncio.to_thread(self.update, body, parameters, non_blocking)
+        href = await self.apulp_href()
+        _parameters = {self.HREF: href}
+        if parameters:
+            _parameters.update(parameters)
+        if body is not None:
+            body = await asyncio.to_thread(self.preprocess_entity, body, True)
+
+        result = await self.acall(
+            "partial_update",
+            parameters=_parameters,
+            body=body,
+            non_blocking=non_blocking,
+        )
+        if result["pulp_href"].startswith(self.pulp_ctx.api_path + "tasks/"):
+            self.pulp_href = href  # reenable lazy lookup
+            if not non_blocking:
+                result = await self.ashow(href)  # reload from server
+                self._entity = result
+        else:
+            self._entity = result
+            self._entity_lookup = {}
+
+        return result
+
     def delete(self, non_blocking: bool = False) -> t.Any:
         """
         Delete the entity.
@@ -1198,6 +2236,21 @@ class PulpEntityContext(PulpViewSetContext):
         self.entity = None
         return result
 
+    async def adelete(self, non_blocking: bool = False) -> t.Any:
+        """
+        Delete the entity without blocking the event loop.
+
+        See `delete` for the parameters and return value.
+        """
+        if self.pulp_ctx.fake_mode:
+            return await asyncio.to_thread(self.delete, non_blocking)
+
+        result = await self.acall(
+            "delete", parameters={self.HREF: await self.apulp_href()}, non_blocking=non_blocking
+        )
+        self.entity = None
+        return result
+
     def set_label(self, key: str, value: str, non_blocking: bool = False) -> t.Any:
         """
         Set a label.
@@ -1492,6 +2545,7 @@ class PulpRepositoryVersionContext(PulpEntityContext):
     ENTITY = _("repository version")
     ENTITIES = _("repository versions")
     ID_PREFIX = "repository_versions"
+    IMMUTABLE = True
     repository_ctx: "PulpRepositoryContext"
 
     def __init__(
@@ -1510,20 +2564,19 @@ class PulpRepositoryVersionContext(PulpEntityContext):
         else:
             return {self.repository_ctx.HREF: self.repository_ctx.pulp_href}
 
-    @property
-    def entity(self) -> EntityDefinition:
-        if (
-            self._entity is None
-            and "number" in self._entity_lookup
-            and self._entity_lookup.get("number") is None
-        ):
-            self.pulp_href = self.repository_ctx.entity["latest_version_href"]
-        return super().entity
+    def _prepare_lookup(self) -> None:
+        if "number" in self._entity_lookup and self._entity_lookup.get("number") is None:
+            self.pulp_href = self.repository_ctx.partial_entity(["latest_version_href"])[
+                "latest_version_href"
+            ]
+        super()._prepare_lookup()
 
-    @entity.setter
-    def entity(self, value: EntityDefinition | None) -> None:
-        # ignore needed due to a bug regarding overriding property setter in mypy
-        PulpEntityContext.entity.fset(self, value)  # type: ignore[attr-defined]
+    async def _aprepare_lookup(self) -> None:
+        if "number" in self._entity_lookup and self._entity_lookup.get("number") is None:
+            # Looking up the latest version blocks.
+            await asyncio.to_thread(self._prepare_lookup)
+        else:
+            self._prepare_lookup()
 
     def repair(self) -> t.Any:
         """
@@ -1576,9 +2629,11 @@ class PulpRepositoryContext(PulpEntityContext):
         """
         if number is not None:
             if number >= 0:
-                version_href = self.entity["versions_href"] + f"{number}/"
+                version_href = (
+                    self.partial_entity(["versions_href"])["versions_href"] + f"{number}/"
+                )
             elif number == -1:
-                version_href = self.entity["latest_version_href"]
+                version_href = self.partial_entity(["latest_version_href"])["latest_version_href"]
             else:
                 raise PulpException(_("Invalid version number ({number}).").format(number=number))
         else:
@@ -1587,46 +2642,129 @@ class PulpRepositoryContext(PulpEntityContext):
             pulp_ctx=self.pulp_ctx, repository_ctx=self, pulp_href=version_href
         )
 
-    def sync(self, body: EntityDefinition | None = None) -> t.Any:
+    def sync(self, body: EntityDefinition | None = None, non_blocking: bool = False) -> t.Any:
         """
         Trigger a sync task for this repository.
 
         Parameters:
             body: Any additional options specific to the repository type used to perform this sync.
+            non_blocking: Whether the result of the operation should be awaited on.
 
         Returns:
             Record of the sync task.
         """
-        return self.call("sync", parameters={self.HREF: self.pulp_href}, body=body or {})
+        return self.call(
+            "sync",
+            parameters={self.HREF: self.pulp_href},
+            body=body or {},
+            non_blocking=non_blocking,
+        )
 
     def modify(
         self,
         add_content: list[str] | None = None,
         remove_content: list[str] | None = None,
         base_version: str | PulpRepositoryVersionContext | None = None,
+        batch_size: int | None = MODIFY_BATCH_SIZE,
     ) -> t.Any:
         """
         Add to or remove content from this repository.
 
+        Large changes are split into batches of at most `batch_size` units.
+        Removals are sent before additions, like the server does within a single call.
+        Each batch is based on the repository version created by the previous one, so the batches
+        apply in order on top of `base_version`.
+
         Parameters:
             add_content: List of content hrefs to add.
             remove_content: List of content hrefs to remove.
             base_version: Href to a repository version relative to whose content the changes are to
                 be interpreted.
+            batch_size: Maximal number of content units to send in one modify call.
+                Use `None` to send all of them at once.
 
         Returns:
-            Record of the modify task.
+            Record of the (last) modify task.
         """
+        batches = _modify_batches(add_content, remove_content, batch_size)
+        if self.pulp_ctx.fake_mode:
+            return {"state": "completed"}  # Fake a task
+        if len(batches) == 1:
+            body = batches[0]
+            if base_version is not None:
+                body["base_version"] = base_version
+            return self.call("modify", parameters={self.HREF: self.pulp_href}, body=body)
+
+        if self.pulp_ctx.background_tasks:
+            # We cannot chain on versions we do not wait for.
+            # The tasks are serialized on the repository anyway.
+            for number, body in enumerate(batches, start=1):
+                if number == 1 and base_version is not None:
+                    body["base_version"] = base_version
+                self.call(
+                    "modify", parameters={self.HREF: self.pulp_href}, body=body, non_blocking=True
+                )
+            raise PulpNoWait(
+                _(
+                    "Not waiting for {count} modify tasks because --background was specified."
+                ).format(count=len(batches))
+            )
+
+        result: t.Any = None
+        for number, body in enumerate(batches, start=1):
+            self.pulp_ctx.echo(
+                _("Modifying {entity}: batch {number} of {total} ({units} units).").format(
+                    entity=self.ENTITY,
+                    number=number,
+                    total=len(batches),
+                    units=len(body.get("remove_content_units", []))
+                    + len(body.get("add_content_units", [])),
+                ),
+                err=True,
+            )
+            if base_version is not None:
+                body["base_version"] = base_version
+            result = self.call("modify", parameters={self.HREF: self.pulp_href}, body=body)
+            if isinstance(result, dict):
+                version_href = next(
+                    (
+                        href
+                        for href in result.get("created_resources") or []
+                        if "/versions/" in href
+                    ),
+                    None,
+                )
+                if version_href is not None:
+                    base_version = version_href
+        return result
+
+
+def _modify_batches(
+    add_content: list[str] | None,
+    remove_content: list[str] | None,
+    batch_size: int | None,
+) -> list[dict[str, t.Any]]:
+    # Split a modify request into bodies of at most batch_size units, removals first.
+    if batch_size is None or (len(add_content or []) + len(remove_content or [])) <= batch_size:
         body: dict[str, t.Any] = {}
         if add_content is not None:
             body["add_content_units"] = add_content
         if remove_content is not None:
             body["remove_content_units"] = remove_content
-        if base_version is not None:
-            body["base_version"] = base_version
-        if self.pulp_ctx.fake_mode:
-            return {"state": "completed"}  # Fake a task
-        return self.call("modify", parameters={self.HREF: self.pulp_href}, body=body)
+        return [body]
+    if batch_size < 1:
+        raise PulpException(_("The batch size must be positive."))
+
+    batches: list[dict[str, t.Any]] = []
+    units = [("remove_content_units", href) for href in remove_content or []] + [
+        ("add_content_units", href) for href in add_content or []
+    ]
+    for start in range(0, len(units), batch_size):
+        body = {}
+        for key, href in units[start : start + batch_size]:
+            body.setdefault(key, []).append(href)
+        batches.append(body)
+    return batches
 
 
 class PulpGenericRepositoryContext(PulpRepositoryContext):
@@ -1663,6 +2801,8 @@ class PulpContentContext(PulpEntityContext):
     HREF_PATTERN = r"content/(?P<plugin>[\w\-_]+)/(?P<resource_type>[\w\-_]+)/"
     HREF_TEMPLATE = "content/{plugin}/{resource_type}/{pulp_id}/"
     TYPE_REGISTRY: t.Final[dict[str, type["PulpContentContext"]]] = {}
+    # Only the labels change. Setting them discards the cached content unit and content lists.
+    IMMUTABLE = True
 
     def __init_subclass__(cls, **kwargs: t.Any) -> None:
         if hasattr(cls, "PLUGIN") and hasattr(cls, "RESOURCE_TYPE"):
@@ -1673,6 +2813,10 @@ class PulpContentContext(PulpEntityContext):
                 "{resource_type}", cls.RESOURCE_TYPE
             )
             cls.TYPE_REGISTRY[f"{cls.PLUGIN}:{cls.RESOURCE_TYPE}"] = cls
+        if cls.IMMUTABLE and hasattr(cls, "ID_PREFIX"):
+            # The content of a repository version does not change either.
+            list_id = getattr(cls, "LIST_ID", None) or cls.ID_PREFIX + "_list"
+            cls.IMMUTABLE_OPERATIONS[list_id] = "repository_version"
 
     def __init__(
         self,
@@ -1688,14 +2832,26 @@ class PulpContentContext(PulpEntityContext):
     def list(self, limit: int, offset: int, parameters: dict[str, t.Any]) -> list[t.Any]:
         if self.repository_ctx is not None:
             parameters = parameters.copy()
-            parameters["repository_version"] = self.repository_ctx.entity["latest_version_href"]
+            parameters["repository_version"] = self.repository_ctx.partial_entity(
+                ["latest_version_href"]
+            )["latest_version_href"]
         return super().list(limit, offset, parameters)
 
     def find(self, **kwargs: t.Any) -> t.Any:
         if self.repository_ctx is not None:
-            kwargs["repository_version"] = self.repository_ctx.entity["latest_version_href"]
+            kwargs["repository_version"] = self.repository_ctx.partial_entity(
+                ["latest_version_href"]
+            )["latest_version_href"]
         return super().find(**kwargs)
 
+    def _batch_filters(self) -> dict[str, t.Any]:
+        filters = super()._batch_filters()
+        if self.repository_ctx is not None:
+            filters["repository_version"] = self.repository_ctx.partial_entity(
+                ["latest_version_href"]
+            )["latest_version_href"]
+        return filters
+
     def _prepare_upload(
         self,
         body: EntityDefinition,
@@ -55,6 +55,10 @@ class OpenAPIError(PulpException):
     """Base Exception for errors related to using the openapi spec."""
 
 
+class OpenAPIConnectionError(OpenAPIError):
+    """Exception raised when the request could not be sent or no response was received."""
+
+
 class ValidationError(OpenAPIError):
     """Exception raised for failed client side validation of parameters or request bodies."""
 
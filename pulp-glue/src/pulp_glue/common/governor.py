@@ -0,0 +1,129 @@
+"""
+Client side limits on the load put on the server.
+
+A `Governor` is shared by all requests of an `OpenAPI` object, including those issued in
+parallel threads.
+It limits the number of requests in flight as well as the rate of read requests, write requests
+and uploaded bytes.
+When the server shows signs of distress (`429` or `5xx` responses, failed connections or high
+latency), the limits are tightened and then gradually relaxed again once it recovers.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+
+from pulp_glue.common.transport import Request
+
+_READ_METHODS = {"get", "head", "options"}
+
+
+class _TokenBucket:
+    # Tokens may be taken in advance; the taker waits until the debt is paid off.
+    # This allows single uploads larger than the burst size.
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self._tokens = rate
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self, amount: float, factor: float = 1.0) -> float:
+        """Returns the number of seconds to wait before the tokens are available."""
+        rate = self.rate * factor
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(rate, self._tokens + (now - self._updated) * rate)
+            self._updated = now
+            self._tokens -= amount
+            return max(0.0, -self._tokens / rate)
+
+
+@dataclass
+class Governor:
+    """
+    Concurrency and rate limits shared across all requests.
+
+    Parameters:
+        max_in_flight: Maximum number of concurrent requests.
+        read_rate: Maximum number of read (`GET`, `HEAD`, `OPTIONS`) requests per second.
+        write_rate: Maximum number of all other requests per second.
+        upload_rate: Maximum number of uploaded file bytes per second.
+        adaptive: Whether to tighten the limits while the server shows signs of distress.
+        latency_threshold: Response time in seconds considered a sign of distress.
+        min_factor: Lowest fraction of the configured limits to fall back to.
+    """
+
+    max_in_flight: int | None = None
+    read_rate: float | None = None
+    write_rate: float | None = None
+    upload_rate: float | None = None
+    adaptive: bool = True
+    latency_threshold: float = 10.0
+    min_factor: float = 0.1
+    factor: float = field(default=1.0, init=False)
+    in_flight: int = field(default=0, init=False)
+
+    def __post_init__(self) -> None:
+        self._condition = threading.Condition()
+        self._buckets: dict[str, _TokenBucket] = {
+            name: _TokenBucket(rate)
+            for name, rate in [
+                ("read", self.read_rate),
+                ("write", self.write_rate),
+                ("upload", self.upload_rate),
+            ]
+            if rate
+        }
+
+    @property
+    def effective_max_in_flight(self) -> int | None:
+        if self.max_in_flight is None:
+            return None
+        return max(1, round(self.max_in_flight * self.factor))
+
+    def acquire(self, request: Request) -> None:
+        """
+        Block until the request may be sent.
+
+        Every call must be followed by a call to `release`.
+        """
+        kind = "read" if request.method.lower() in _READ_METHODS else "write"
+        delays = [0.0]
+        if kind in self._buckets:
+            delays.append(self._buckets[kind].take(1, self.factor))
+        if "upload" in self._buckets and request.files:
+            size = sum(
+                len(upload) if isinstance(upload, bytes) else 0
+                for _name, upload, _type in request.files.values()
+            )
+            delays.append(self._buckets["upload"].take(size, self.factor))
+        if max(delays) > 0:
+            time.sleep(max(delays))
+        with self._condition:
+            while (limit := self.effective_max_in_flight) is not None and self.in_flight >= limit:
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, status_code: int, duration: float) -> None:
+        """
+        Report the outcome of a request.
+
+        Parameters:
+            status_code: Status of the response; `0` if none was received.
+            duration: Seconds it took to receive the response.
+        """
+        with self._condition:
+            self.in_flight -= 1
+            if self.adaptive:
+                if (
+                    status_code == 0
+                    or status_code == 429
+                    or status_code >= 500
+                    or duration > self.latency_threshold
+                ):
+                    # Multiplicative decrease, additive increase.
+                    self.factor = max(self.min_factor, self.factor / 2)
+                else:
+                    self.factor = min(1.0, self.factor + 0.05)
+            self._condition.notify_all()
@@ -0,0 +1,179 @@
+"""
+Incremental parsing of paginated list responses.
+
+Pages of list operations can be large, e.g. for packages with long changelogs.
+A `StreamedPage` parses the body of such a page while it is received, yielding the items of
+`results` one by one, so only a single item needs to be held in memory at a time.
+"""
+
+import codecs
+import json
+import typing as t
+
+from pulp_glue.common.exceptions import OpenAPIError
+from pulp_glue.common.i18n import get_translation
+
+translation = get_translation(__package__)
+_ = translation.gettext
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class StreamedPage:
+    """
+    A page of a list response that is parsed while its results are consumed.
+
+    The keys `count`, `next`, `previous` and `results` can be accessed like on the decoded page.
+    `results` is an iterator that can only be consumed once.
+    Looking up another key before the results are consumed keeps the results in memory if the
+    server sent them first; Pulp sends `count`, `next` and `previous` ahead of `results`.
+    `size` is the number of bytes of the body read so far.
+
+    Parameters:
+        chunks: The body of the response in chunks.
+    """
+
+    def __init__(self, chunks: t.Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self.size = 0
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._exhausted = False
+        self._values: dict[str, t.Any] = {}
+        self._results: t.Iterator[t.Any] | None = None
+        self._parser: t.Generator[t.Any, None, None] = self._parse()
+
+    def __getitem__(self, key: str) -> t.Any:
+        if key == "results":
+            if self._results is None:
+                self._results = self._iter_results()
+            return self._results
+        if self._results is None:
+            while key not in self._values:
+                try:
+                    event = next(self._parser)
+                except StopIteration:
+                    break
+                # The results come first, keep them for later.
+                self._values["results"] = [] if event is None else [event, *self._parser_results()]
+        # Keys following the results are only known once the results are consumed.
+        return self._values[key]
+
+    def get(self, key: str, default: t.Any = None) -> t.Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def close(self) -> None:
+        """
+        Stop parsing and release the underlying response.
+        """
+        self._parser.close()
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            close()
+
+    def _iter_results(self) -> t.Iterator[t.Any]:
+        try:
+            if "results" in self._values:
+                yield from self._values.pop("results")
+            else:
+                yield from self._parser_results()
+            # Parse the remainder to fill in the keys following the results.
+            for _event in self._parser:
+                pass
+        finally:
+            self.close()
+
+    def _parser_results(self) -> t.Iterator[t.Any]:
+        # The parser yields the items of `results` followed by `None`.
+        for event in self._parser:
+            if event is None:
+                return
+            yield event
+
+    # Low level parsing
+
+    def _fill(self) -> bool:
+        # Read another chunk into the buffer. Returns `False` at the end of the body.
+        if self._exhausted:
+            return False
+        # Drop what was parsed already, so the buffer stays as small as a single item.
+        self._buffer = self._buffer[self._pos :]
+        self._pos = 0
+        for chunk in self._chunks:
+            self.size += len(chunk)
+            text = self._text_decoder.decode(chunk)
+            if text:
+                self._buffer += text
+                return True
+        self._buffer += self._text_decoder.decode(b"", final=True)
+        self._exhausted = True
+        return False
+
+    def _error(self, message: str) -> OpenAPIError:
+        return OpenAPIError(_("Malformed list response: {message}").format(message=message))
+
+    def _peek(self) -> str:
+        # The next character that is not whitespace.
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise self._error(_("unexpected end of data"))
+
+    def _expect(self, chars: str) -> str:
+        char = self._peek()
+        if char not in chars:
+            raise self._error(_("expected '{chars}' at '{char}'").format(chars=chars, char=char))
+        self._pos += 1
+        return char
+
+    def _value(self) -> t.Any:
+        self._peek()
+        while True:
+            pending = len(self._buffer) - self._pos
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                if self._exhausted:
+                    raise self._error(str(e))
+            else:
+                # A number at the end of the buffer may continue in the next chunk.
+                if end < len(self._buffer) or self._exhausted:
+                    self._pos = end
+                    return value
+            # Read at least as much again as is pending, so large values are not decoded
+            # over and over.
+            while self._fill() and len(self._buffer) - self._pos < 2 * pending:
+                pass
+
+    def _parse(self) -> t.Generator[t.Any, None, None]:
+        # Yields the items of `results` followed by `None`, other keys are stored on the way.
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            key = self._value()
+            if not isinstance(key, str):
+                raise self._error(_("expected a key"))
+            self._expect(":")
+            if key == "results" and self._peek() == "[":
+                self._pos += 1
+                if self._peek() == "]":
+                    self._pos += 1
+                else:
+                    while True:
+                        yield self._value()
+                        if self._expect(",]") == "]":
+                            break
+                yield None
+            else:
+                self._values[key] = self._value()
+            if self._expect(",}") == "}":
+                return
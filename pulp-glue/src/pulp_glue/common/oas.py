@@ -1,10 +1,17 @@
+import json
 import typing as t
-from functools import cached_property
+from functools import cache, cached_property
 
 import pydantic
 import pydantic.alias_generators
 from pydantic_core import PydanticCustomError
 
+from pulp_glue.common.exceptions import OpenAPIError
+from pulp_glue.common.i18n import get_translation
+
+translation = get_translation(__package__)
+_ = translation.gettext
+
 
 def to_alias(value: str) -> str:
     return pydantic.alias_generators.to_camel(value.rstrip("_"))
@@ -454,3 +461,112 @@ class OpenAPISpec(ExtensibleOASBase):
             for method, operation in ((method, getattr(path_item, method)) for method in METHODS)
             if operation is not None
         }
+
+
+T = t.TypeVar("T")
+
+
+@cache
+def _adapter(annotation: t.Any) -> pydantic.TypeAdapter[t.Any]:
+    return pydantic.TypeAdapter(annotation)
+
+
+class LazyMapping(t.Mapping[str, T]):
+    """
+    Read only mapping that validates the raw values of a spec into models on first access.
+
+    Raises:
+        OpenAPIError: if the accessed value is not valid.
+    """
+
+    def __init__(self, raw: dict[str, t.Any], annotation: t.Any) -> None:
+        self._raw = raw
+        self._annotation = annotation
+        self._models: dict[str, T] = {}
+
+    def __getitem__(self, key: str) -> T:
+        try:
+            return self._models[key]
+        except KeyError:
+            try:
+                model: T = _adapter(self._annotation).validate_python(self._raw[key])
+            except pydantic.ValidationError as e:
+                raise OpenAPIError(
+                    _("The api spec is invalid at '{key}': {error}").format(key=key, error=e)
+                )
+            return self._models.setdefault(key, model)
+
+    def __iter__(self) -> t.Iterator[str]:
+        return iter(self._raw)
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+
+class LazyComponents:
+    def __init__(self, raw: dict[str, t.Any]) -> None:
+        self.schemas: t.Mapping[str, Schema] = LazyMapping(raw.get("schemas", {}), Schema)
+        self.parameters: t.Mapping[str, Parameter | Reference] = LazyMapping(
+            raw.get("parameters", {}), Parameter | Reference
+        )
+        self.security_schemes: t.Mapping[str, SecurityScheme | Reference] = LazyMapping(
+            raw.get("securitySchemes", {}), SecurityScheme | Reference
+        )
+
+
+class LazyOpenAPISpec:
+    """
+    Memory efficient stand-in for `OpenAPISpec`.
+
+    The decoded json document is the only copy of the spec held in memory.
+    Path items and components are validated into models only when they are accessed, which is a
+    small fraction of them for any single command.
+    The operations index is checked right away, so a broken document is rejected on loading.
+
+    Parameters:
+        raw: The decoded json document.
+
+    Raises:
+        ValueError: if the document is not an openapi document or its operations are malformed.
+    """
+
+    def __init__(self, raw: dict[str, t.Any]) -> None:
+        if not isinstance(raw.get("openapi"), str) or not isinstance(raw.get("paths", {}), dict):
+            raise ValueError("Not an openapi document.")
+        self.raw = raw
+        self.openapi: str = raw["openapi"]
+        self.security: SecurityRequirements | None = _adapter(
+            SecurityRequirements | None
+        ).validate_python(raw.get("security"))
+        self.paths: t.Mapping[str, PathItem] = LazyMapping(raw.get("paths", {}), PathItem)
+        self.components = LazyComponents(raw.get("components", {}))
+        self.operations: dict[str, tuple[OperationName, str]] = {}
+        for path, path_item in self.raw.get("paths", {}).items():
+            if not isinstance(path_item, dict):
+                raise ValueError(f"Path item '{path}' is not an object.")
+            for method in METHODS:
+                operation = path_item.get(method)
+                if operation is None:
+                    continue
+                if not isinstance(operation, dict) or not isinstance(
+                    operation.get("operationId"), str
+                ):
+                    raise ValueError(f"Operation '{method} {path}' has no operationId.")
+                self.operations[operation["operationId"]] = (method, path)
+
+
+def load_spec(data: bytes | str) -> t.Any:
+    """
+    Decode a json api document, sharing a single copy of repeated string values.
+
+    Type names, formats and references make up a large part of an api document.
+    """
+    strings: dict[str, str] = {}
+
+    def _share_strings(obj: dict[str, t.Any]) -> dict[str, t.Any]:
+        for key, value in obj.items():
+            if type(value) is str:
+                obj[key] = strings.setdefault(value, value)
+        return obj
+
+    return json.loads(data, object_hook=_share_strings)
@@ -3,11 +3,13 @@ import json
 import logging
 import os
 import ssl
+import threading
+import time
 import typing as t
 import warnings
+import weakref
 from base64 import b64encode
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from functools import cached_property
 from io import BufferedReader
 from pathlib import Path
@@ -15,12 +17,14 @@ from urllib.parse import urlencode, urljoin
 
 import requests
 import urllib3
-from multidict import CIMultiDict, CIMultiDictProxy, MutableMultiMapping
+from multidict import CIMultiDict, CIMultiDictProxy
 from requests.auth import AuthBase
 
 from pulp_glue.common import __version__, oas
 from pulp_glue.common.authentication import AuthProviderBase
+from pulp_glue.common.cache import ResponseCache
 from pulp_glue.common.exceptions import (
+    OpenAPIConnectionError,
     OpenAPIError,
     PulpAuthenticationFailed,
     PulpHTTPError,
@@ -29,20 +33,35 @@ from pulp_glue.common.exceptions import (
     UnsafeCallError,
     ValidationError,
 )
+from pulp_glue.common.governor import Governor
 from pulp_glue.common.i18n import get_translation
+from pulp_glue.common.jsonstream import StreamedPage
 from pulp_glue.common.schema import (
     encode_json,
     encode_param,
     encode_stringify,
     validate,
 )
+from pulp_glue.common.tracing import TraceRecord, TraceSink, span
+from pulp_glue.common.transport import (
+    AIOHTTP_AVAILABLE,
+    AiohttpTransport,
+    AsyncTransport,
+    ConnectionSettings,
+    HttpxTransport,
+    Request,
+    RequestsTransport,
+    Response,
+    RetryPolicy,
+    ThreadedAsyncTransport,
+    Transport,
+    UploadType,
+)
 
 translation = get_translation(__package__)
 _ = translation.gettext
 _logger = logging.getLogger("pulp_glue.openapi")
 
-UploadType = bytes | t.IO[bytes]
-
 METHODS: set[oas.OperationName] = {
     "get",
     "put",
@@ -55,24 +74,27 @@ METHODS: set[oas.OperationName] = {
 }
 SAFE_METHODS: set[oas.OperationName] = {"get", "head", "options"}
 
+# The request and response types used to be private to this module.
+_Request = Request
+_Response = Response
 
-@dataclass
-class _Request:
-    operation_id: str
-    method: str
-    url: str
-    headers: MutableMultiMapping[str] | CIMultiDict[str] | t.MutableMapping[str, str]
-    params: dict[str, str] | None = None
-    data: dict[str, t.Any] | str | None = None
-    files: dict[str, tuple[str, UploadType, str]] | None = None
-    security: list[dict[str, list[str]]] | None = None
 
+class _Phases:
+    # Stopwatch attributing the time of a call to its phases (in milliseconds).
+    def __init__(self) -> None:
+        self.started = datetime.now(timezone.utc)
+        self.durations: dict[str, float] = {}
+        self.retries = 0
+        self._start = self._mark = time.perf_counter()
 
-@dataclass
-class _Response:
-    status_code: int
-    headers: MutableMultiMapping[str] | CIMultiDictProxy[str] | t.MutableMapping[str, str]
-    body: bytes
+    def lap(self, name: str) -> None:
+        now = time.perf_counter()
+        self.durations[name] = self.durations.get(name, 0.0) + (now - self._mark) * 1000
+        self._mark = now
+
+    @property
+    def elapsed(self) -> float:
+        return (time.perf_counter() - self._start) * 1000
 
 
 class _RequestsFakeAuth(AuthBase):
@@ -98,11 +120,19 @@ class OpenAPI:
         debug_callback: Callback that will be called with strings useful for logging or debugging.
         user_agent: String to use in the User-Agent header.
         cid: Correlation ID to send with all requests.
+        trace_sink: Sink to receive a structured record of every request made.
+        transport: Transport to send the requests with. Defaults to using `requests`.
+        retry_policy: Policy to retry idempotent requests on transient failures.
+            By default no request is retried.
+        governor: Concurrency and rate limits to apply to all requests.
+        connection: Connection pool, keep-alive, timeout and HTTP/2 settings of the default
+            transport.
+        response_cache: On-disk cache serving responses of immutable resources.
         validate_certs: DEPRECATED use verify_ssl instead.
         safe_calls_only: DEPRECATED use dry_run instead.
     """
 
-    _api_spec: oas.OpenAPISpec
+    _api_spec: oas.LazyOpenAPISpec
     operations: dict[str, tuple[oas.OperationName, str]]
 
     def __init__(
@@ -122,6 +152,12 @@ class OpenAPI:
         validate_certs: bool | None = None,
         safe_calls_only: bool | None = None,
         patch_api_hook: t.Callable[[t.Any], t.Any] | None = None,
+        trace_sink: TraceSink | None = None,
+        transport: Transport | None = None,
+        retry_policy: RetryPolicy | None = None,
+        governor: Governor | None = None,
+        connection: ConnectionSettings | None = None,
+        response_cache: ResponseCache | None = None,
     ):
         if validate_certs is not None:
             warnings.warn(
@@ -151,6 +187,11 @@ class OpenAPI:
         self._verify_ssl = verify_ssl
 
         self._auth_provider = auth_provider
+        self._trace_sink = trace_sink
+        self._retry_policy = retry_policy
+        self._governor = governor
+        self._connection = connection or ConnectionSettings()
+        self._response_cache = response_cache
 
         self._headers.update(
             {
@@ -162,8 +203,23 @@ class OpenAPI:
             self._headers["Correlation-Id"] = cid
 
         self._setup_session()
-
-        self._oauth2_lock = asyncio.Lock()
+        default_transport: Transport
+        if self._connection.http2:
+            default_transport = HttpxTransport(self.ssl_context, self._connection)
+        else:
+            default_transport = RequestsTransport(self._session, self._connection)
+        if transport is None:
+            self._transport: Transport = default_transport
+        else:
+            transport.bind(default_transport)
+            self._transport = transport
+
+        # Guards the correlation id and the lazily created per event loop locks.
+        self._lock = threading.Lock()
+        self._oauth2_lock = threading.Lock()
+        self._oauth2_loop_locks: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Lock
+        ] = weakref.WeakKeyDictionary()
         self._oauth2_token: str | None = None
         self._oauth2_expires: datetime = datetime.now()
 
@@ -197,6 +253,12 @@ class OpenAPI:
             else:
                 self._session.cert = cert
 
+    def close(self) -> None:
+        """
+        Release the resources held by the transport.
+        """
+        self._transport.close()
+
     @property
     def base_url(self) -> str:
         return self._base_url
@@ -205,6 +267,10 @@ class OpenAPI:
     def cid(self) -> str | None:
         return self._headers.get("Correlation-Id")
 
+    @property
+    def retry_policy(self) -> RetryPolicy | None:
+        return self._retry_policy
+
     @cached_property
     def ssl_context(self) -> ssl.SSLContext | bool:
         _ssl_context: ssl.SSLContext | bool
@@ -220,6 +286,10 @@ class OpenAPI:
         return _ssl_context
 
     def load_api(self, refresh_cache: bool = False) -> None:
+        with span("load_api", base_url=self._base_url):
+            self._load_api(refresh_cache=refresh_cache)
+
+    def _load_api(self, refresh_cache: bool) -> None:
         # TODO: Find a way to invalidate caches on upstream change
         xdg_cache_home = Path(os.environ.get("XDG_CACHE_HOME") or "~/.cache").expanduser()
         apidoc_cache = (
@@ -246,8 +316,13 @@ class OpenAPI:
             apidoc_cache.write_bytes(data)
 
     def _parse_api(self, data: bytes) -> None:
-        raw_spec = self._patch_api_hook(json.loads(data))
-        self._api_spec = oas.OpenAPISpec.model_validate(raw_spec)
+        with span("parse_api"):
+            try:
+                raw_spec = self._patch_api_hook(oas.load_spec(data))
+                self._api_spec = oas.LazyOpenAPISpec(raw_spec)
+            except ValueError as e:
+                raise OpenAPIError(_("The api spec is invalid: {error}").format(error=e))
+        # The raw document is shared with the lazy spec, not copied.
         self.api_spec: dict[str, t.Any] = raw_spec
         if self._api_spec.openapi.startswith("3."):
             self.openapi_version: int = 3
@@ -256,27 +331,38 @@ class OpenAPI:
         self.operations = self._api_spec.operations
 
     def _download_api(self) -> bytes:
-        try:
-            response: requests.Response = self._session.get(urljoin(self._base_url, self._doc_path))
-        except requests.RequestException as e:
-            raise OpenAPIError(str(e))
-        response.raise_for_status()
+        request = Request(
+            operation_id="",
+            method="get",
+            url=urljoin(self._base_url, self._doc_path),
+            headers={},
+        )
+        with span("download_api"):
+            response = self._send_request(request)
+        if response.status_code >= 300:
+            raise PulpHTTPError(response.body.decode(), response.status_code)
         if "Correlation-Id" in response.headers:
-            self._set_correlation_id(response.headers["Correlation-Id"])
-        return response.content
-
-    def _set_correlation_id(self, correlation_id: str) -> None:
-        if "Correlation-Id" in self._headers:
-            if self._headers["Correlation-Id"] != correlation_id:
-                raise OpenAPIError(
-                    _("Correlation ID returned from server did not match. {} != {}").format(
-                        self._headers["Correlation-Id"], correlation_id
+            self._set_correlation_id(
+                response.headers["Correlation-Id"], sent="Correlation-Id" in request.headers
+            )
+        return response.body
+
+    def _set_correlation_id(self, correlation_id: str, sent: bool = True) -> None:
+        # `sent` tells whether the request carried a correlation id.
+        # Concurrent first requests are each assigned a new one by the server.
+        # The first one to return wins.
+        with self._lock:
+            if "Correlation-Id" in self._headers:
+                if sent and self._headers["Correlation-Id"] != correlation_id:
+                    raise OpenAPIError(
+                        _("Correlation ID returned from server did not match. {} != {}").format(
+                            self._headers["Correlation-Id"], correlation_id
+                        )
                     )
-                )
-        else:
-            self._headers["Correlation-Id"] = correlation_id
-            # Do it for requests too...
-            self._session.headers["Correlation-Id"] = correlation_id
+            else:
+                self._headers["Correlation-Id"] = correlation_id
+                # Do it for requests too...
+                self._session.headers["Correlation-Id"] = correlation_id
 
     def param_spec(
         self, operation_id: str, param_type: str, required: bool = False
@@ -474,7 +560,7 @@ class OpenAPI:
         headers: dict[str, str],
         body: dict[str, t.Any] | None = None,
         validate_body: bool = True,
-    ) -> _Request:
+    ) -> Request:
         method_spec: oas.Operation = getattr(path_spec, method)
         _headers = CIMultiDict(self._headers)
         _headers.update(headers)
@@ -495,7 +581,7 @@ class OpenAPI:
         if content_type is not None and content_type.startswith("application/json"):
             _headers["Content-Type"] = content_type
 
-        return _Request(
+        return Request(
             operation_id=method_spec.operation_id,
             method=method,
             url=url,
@@ -506,7 +592,7 @@ class OpenAPI:
             security=security,
         )
 
-    def _log_request(self, request: _Request) -> None:
+    def _log_request(self, request: Request) -> None:
         if request.params:
             qs = urlencode(request.params)
             self._debug_callback(1, f"{request.operation_id} : {request.method} {request.url}?{qs}")
@@ -526,7 +612,7 @@ class OpenAPI:
 
     def _select_proposal(
         self,
-        request: _Request,
+        request: Request,
     ) -> dict[str, list[str]] | None:
         proposal = None
         if (
@@ -553,7 +639,7 @@ class OpenAPI:
 
     async def _authenticate_request(
         self,
-        request: _Request,
+        request: Request,
         proposal: dict[str, list[str]],
     ) -> bool:
         assert self._auth_provider is not None
@@ -577,10 +663,11 @@ class OpenAPI:
                 flow = security_scheme.flows.client_credentials
                 if flow is None:
                     raise NotImplementedError("OAuth2: Only client credential flow is available.")
+                token, new_token = await self._fetch_oauth2_token(flow)
                 # Allow retry if the token was taken from cache.
-                may_retry = not await self._fetch_oauth2_token(flow)
+                may_retry = not new_token
                 # TODO Should we add, amend or replace the existing auth header?
-                request.headers["Authorization"] = f"Bearer {self._oauth2_token}"
+                request.headers["Authorization"] = f"Bearer {token}"
             elif isinstance(security_scheme, oas.SecuritySchemeMutualTLS):
                 # At this point, we assume the cert has already been loaded into the sslcontext.
                 pass
@@ -588,68 +675,76 @@ class OpenAPI:
                 raise NotImplementedError("Auth type: " + security_scheme.type_)
         return may_retry
 
-    async def _fetch_oauth2_token(self, flow: oas.OAuthFlowToken) -> bool:
+    def _oauth2_loop_lock(self) -> asyncio.Lock:
+        # Lets the coroutines of one event loop queue up without blocking the loop on the
+        # thread lock.
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            return self._oauth2_loop_locks.setdefault(loop, asyncio.Lock())
+
+    async def _fetch_oauth2_token(self, flow: oas.OAuthFlowToken) -> tuple[str, bool]:
+        # Returns the token and whether it was freshly fetched.
         assert self._auth_provider is not None
 
         new_token = False
-        async with self._oauth2_lock:
-            now = datetime.now()
-            if self._oauth2_token is None or self._oauth2_expires < now:
-                # Get or refresh token.
-                client_id, client_secret = await self._auth_provider.oauth2_client_credentials()
-                secret = b64encode(client_id + b":" + client_secret)
-                data: dict[str, t.Any] = {"grant_type": "client_credentials"}
-                scopes = flow.scopes
-                if scopes:
-                    data["scopes"] = " ".join(scopes)
-                request = _Request(
-                    operation_id="",
-                    method="post",
-                    url=flow.token_url,
-                    headers={"Authorization": f"Basic {secret.decode()}"},
-                    data=data,
-                )
-                response = self._send_request(request)
-                if response.status_code < 200 or response.status_code >= 300:
-                    raise OpenAPIError("Failed to fetch OAuth2 token")
-                result = json.loads(response.body)
-                self._oauth2_token = result["access_token"]
-                self._oauth2_expires = now + timedelta(seconds=result["expires_in"])
-                new_token = True
-        return new_token
+        async with self._oauth2_loop_lock():
+            with self._oauth2_lock:
+                now = datetime.now()
+                if self._oauth2_token is None or self._oauth2_expires < now:
+                    # Get or refresh token.
+                    client_id, client_secret = await self._auth_provider.oauth2_client_credentials()
+                    secret = b64encode(client_id + b":" + client_secret)
+                    data: dict[str, t.Any] = {"grant_type": "client_credentials"}
+                    scopes = flow.scopes
+                    if scopes:
+                        data["scopes"] = " ".join(scopes)
+                    request = Request(
+                        operation_id="",
+                        method="post",
+                        url=flow.token_url,
+                        headers={"Authorization": f"Basic {secret.decode()}"},
+                        data=data,
+                    )
+                    response = await self._send_token_request(request)
+                    if response.status_code < 200 or response.status_code >= 300:
+                        raise OpenAPIError("Failed to fetch OAuth2 token")
+                    result = json.loads(response.body)
+                    self._oauth2_token = result["access_token"]
+                    self._oauth2_expires = now + timedelta(seconds=result["expires_in"])
+                    new_token = True
+                token = self._oauth2_token
+        assert token is not None
+        return token, new_token
+
+    def _invalidate_oauth2_token(self, request: Request) -> None:
+        # Drop the token the request was sent with, unless another thread replaced it already.
+        with self._oauth2_lock:
+            if request.headers.get("Authorization") == f"Bearer {self._oauth2_token}":
+                self._oauth2_token = None
+
+    async def _send_token_request(self, request: Request) -> Response:
+        return self._send_request(request)
 
     def _send_request(
         self,
-        request: _Request,
-    ) -> _Response:
-        # This function uses requests to translate the _Request into a _Response.
+        request: Request,
+        stream: bool = False,
+    ) -> Response:
+        send = self._transport.send_stream if stream else self._transport.send
+        if self._governor is None:
+            return send(request)
+        with span("throttle", operation_id=request.operation_id):
+            self._governor.acquire(request)
+        status_code = 0
+        start = time.perf_counter()
         try:
-            r = self._session.request(
-                request.method,
-                request.url,
-                params=request.params,
-                headers=request.headers,
-                data=request.data,
-                files=request.files,
-            )
-            response = _Response(status_code=r.status_code, headers=r.headers, body=r.content)
-        except requests.TooManyRedirects as e:
-            assert e.response is not None
-            raise OpenAPIError(
-                _(
-                    "Received redirect to '{new_url} from {old_url}'."
-                    " Please check your configuration."
-                ).format(
-                    new_url=e.response.headers["location"],
-                    old_url=request.url,
-                )
-            )
-        except requests.RequestException as e:
-            raise OpenAPIError(str(e))
-
+            response = send(request)
+            status_code = response.status_code
+        finally:
+            self._governor.release(status_code, time.perf_counter() - start)
         return response
 
-    def _log_response(self, response: _Response) -> None:
+    def _log_response(self, response: Response) -> None:
         self._debug_callback(
             1, _("Response: {status_code}").format(status_code=response.status_code)
         )
@@ -658,9 +753,9 @@ class OpenAPI:
         if response.body:
             self._debug_callback(3, f"{response.body!r}")
 
-    def _parse_response(self, operation_spec: oas.Operation, response: _Response) -> t.Any:
-        if "Correlation-Id" in response.headers:
-            self._set_correlation_id(response.headers["Correlation-Id"])
+    def _parse_response(
+        self, operation_spec: oas.Operation, response: Response, stream: bool = False
+    ) -> t.Any:
         if response.status_code == 401:
             raise PulpAuthenticationFailed(operation_spec.operation_id)
         elif response.status_code == 403:
@@ -693,15 +788,122 @@ class OpenAPI:
         content_type = response.headers.get("content-type")
         if content_type is not None and content_type.startswith("application/json"):
             assert content_type in response_spec.content
+            if stream:
+                return StreamedPage(response.chunks or [response.body])
             return json.loads(response.body)
         return None
 
+    def _prepare_call(
+        self,
+        operation_id: str,
+        parameters: dict[str, t.Any] | None,
+        body: dict[str, t.Any] | None,
+        validate_body: bool,
+    ) -> tuple[oas.Operation, Request, _Phases]:
+        # Rendering and validation shared by the sync and async calls.
+        method, path = self.operations[operation_id]
+        path_spec = self._api_spec.paths[path]
+        operation_spec = getattr(path_spec, method)
+
+        if parameters is None:
+            parameters = {}
+        phases = _Phases()
+        with span("render_request", operation_id=operation_id):
+            rendered_parameters = self._render_parameters(path_spec, operation_spec, parameters)
+
+            if len(rendered_parameters["cookie"]) > 0:
+                raise NotImplementedError("Cookie Parameters")
+
+            headers = rendered_parameters["header"]
+
+            rel_url = path
+            for name, value in rendered_parameters["path"].items():
+                rel_url = path.replace("{" + name + "}", value)
+            query_params = rendered_parameters["query"]
+
+            url = urljoin(self._base_url, rel_url)
+
+            request = self._render_request(
+                path_spec,
+                method,
+                url,
+                query_params,
+                headers,
+                body,
+                validate_body=validate_body,
+            )
+        self._log_request(request)
+
+        if self._dry_run and request.method.lower() not in SAFE_METHODS:
+            raise UnsafeCallError(_("Call aborted due to safe mode"))
+        phases.lap("render")
+        return operation_spec, request, phases
+
+    def _cached_response(self, request: Request, phases: _Phases) -> Response | None:
+        if self._response_cache is None:
+            return None
+        with span("cache_lookup", operation_id=request.operation_id):
+            response = self._response_cache.get(request)
+        phases.lap("cache")
+        return response
+
+    def _finish_call(
+        self,
+        operation_spec: oas.Operation,
+        request: Request,
+        response: Response,
+        phases: _Phases,
+        stream: bool = False,
+    ) -> t.Any:
+        self._log_response(response)
+        if (
+            self._response_cache is not None
+            and phases.durations.get("send") is not None
+            and response.chunks is None
+        ):
+            # Only complete responses from the server are stored.
+            self._response_cache.put(request, response)
+        if "Correlation-Id" in response.headers:
+            self._set_correlation_id(
+                response.headers["Correlation-Id"], sent="Correlation-Id" in request.headers
+            )
+        result: t.Any = None
+        try:
+            with span("parse_response", operation_id=operation_spec.operation_id):
+                result = self._parse_response(operation_spec, response, stream=stream)
+        finally:
+            if response.chunks is not None and not isinstance(result, StreamedPage):
+                # Nothing is going to read the rest of the body.
+                response.chunks.close()
+        phases.lap("parse")
+        return result
+
+    def _stream_body(
+        self,
+        request: Request,
+        response: Response,
+        phases: _Phases,
+        chunks: t.Generator[bytes, None, None],
+    ) -> t.Generator[bytes, None, None]:
+        # Passes the chunks of a streamed body on and records the call once it is read.
+        size = 0
+        try:
+            for chunk in chunks:
+                size += len(chunk)
+                yield chunk
+        finally:
+            chunks.close()
+            phases.lap("stream")
+            if self._trace_sink is not None:
+                self._trace_sink.record(self._trace_record(request, response, phases, size))
+
     def call(
         self,
         operation_id: str,
         parameters: dict[str, t.Any] | None = None,
         body: dict[str, t.Any] | None = None,
         validate_body: bool = True,
+        stream: bool = False,
     ) -> t.Any:
         """
         Make a call to the server.
@@ -711,6 +913,9 @@ class OpenAPI:
             parameters: Arguments that are to be sent as headers, querystrings or part of the URI.
             body: Body payload for POST, PUT, PATCH calls.
             validate_body: Indicate whether the body should be validated.
+            stream: Parse a JSON list response while it is received.
+                The result is a `StreamedPage` then.
+                Responses the response cache can keep are still read as a whole.
 
         Returns:
             The JSON decoded server response if any.
@@ -721,57 +926,262 @@ class OpenAPI:
 
             NotImplementedError: well, the name really says is all.
         """
-        method, path = self.operations[operation_id]
-        path_spec = self._api_spec.paths[path]
-        operation_spec = getattr(path_spec, method)
-
-        if parameters is None:
-            parameters = {}
-        rendered_parameters = self._render_parameters(path_spec, operation_spec, parameters)
-
-        if len(rendered_parameters["cookie"]) > 0:
-            raise NotImplementedError("Cookie Parameters")
+        operation_spec, request, phases = self._prepare_call(
+            operation_id, parameters, body, validate_body
+        )
+        response: Response | None = self._cached_response(request, phases)
+        if response is not None:
+            return self._finish_call(operation_spec, request, response, phases, stream=stream)
+        # Cacheable responses are needed as a whole to be stored.
+        send_stream = stream and (
+            self._response_cache is None or not self._response_cache.cacheable(request)
+        )
+        try:
+            may_retry = False
+            if proposal := self._select_proposal(request):
+                with span("authenticate", operation_id=operation_id):
+                    may_retry = asyncio.run(self._authenticate_request(request, proposal))
+                phases.lap("authenticate")
+
+            response = self._send_request_with_retries(request, phases, stream=send_stream)
+
+            if proposal is not None:
+                assert self._auth_provider is not None
+                if may_retry and response.status_code == 401:
+                    phases.retries += 1
+                    self._invalidate_oauth2_token(request)
+                    with span("authenticate", operation_id=operation_id):
+                        asyncio.run(self._authenticate_request(request, proposal))
+                    phases.lap("authenticate")
+                    response = self._send_request_with_retries(request, phases, stream=send_stream)
+
+                if response.status_code >= 200 and response.status_code < 300:
+                    asyncio.run(self._auth_provider.auth_success_hook())
+                elif response.status_code == 401:
+                    asyncio.run(self._auth_provider.auth_failure_hook())
+
+            if response.chunks is not None:
+                # The call is recorded once the body is read.
+                response.chunks = self._stream_body(request, response, phases, response.chunks)
+            return self._finish_call(operation_spec, request, response, phases, stream=stream)
+        finally:
+            if self._trace_sink is not None and (response is None or response.chunks is None):
+                self._trace_sink.record(self._trace_record(request, response, phases))
+
+    def _retry_delay(
+        self,
+        request: Request,
+        response: Response | None,
+        error: OpenAPIConnectionError | None,
+        phases: _Phases,
+        previous: float,
+    ) -> float | None:
+        # Returns the delay before retrying the request, or `None` to give up.
+        policy = self._retry_policy
+        if (
+            policy is None
+            or phases.retries >= policy.retries
+            or not policy.may_retry(request)
+            or (response is not None and response.status_code not in policy.statuses)
+        ):
+            return None
+        delay = policy.delay(response, previous)
+        if phases.elapsed / 1000 + delay > policy.deadline:
+            return None
+        phases.retries += 1
+        _logger.info(
+            _("Retrying {operation_id} in {delay:.1f}s after {reason} ({attempt}/{total}).").format(
+                operation_id=request.operation_id,
+                delay=delay,
+                reason=error if response is None else response.status_code,
+                attempt=phases.retries,
+                total=policy.retries,
+            )
+        )
+        return delay
+
+    def _send_request_with_retries(
+        self, request: Request, phases: _Phases, stream: bool = False
+    ) -> Response:
+        delay: float | None = 0.0
+        while True:
+            response: Response | None = None
+            error: OpenAPIConnectionError | None = None
+            try:
+                with span("send_request", operation_id=request.operation_id, method=request.method):
+                    # Subclasses may override `_send_request` without streaming support.
+                    response = (
+                        self._send_request(request, stream=True)
+                        if stream
+                        else self._send_request(request)
+                    )
+            except OpenAPIConnectionError as e:
+                error = e
+            phases.lap("send")
+            delay = self._retry_delay(request, response, error, phases, delay or 0.0)
+            if delay is None:
+                break
+            with span("retry_wait", operation_id=request.operation_id):
+                time.sleep(delay)
+            phases.lap("retry_wait")
+        if error is not None:
+            raise error
+        assert response is not None
+        return response
 
-        headers = rendered_parameters["header"]
+    def _trace_record(
+        self,
+        request: Request,
+        response: Response | None,
+        phases: _Phases,
+        response_size: int | None = None,
+    ) -> TraceRecord:
+        url = request.url
+        if request.params:
+            url += "?" + urlencode(request.params, doseq=True)
+        correlation_id = self._headers.get("Correlation-Id")
+        if response is not None:
+            correlation_id = response.headers.get("Correlation-Id", correlation_id)
+        return TraceRecord(
+            timestamp=phases.started.isoformat(),
+            operation_id=request.operation_id,
+            method=request.method,
+            url=url,
+            status=response.status_code if response is not None else 0,
+            request_size=request.content_length,
+            response_size=(
+                response_size
+                if response_size is not None
+                else len(response.body)
+                if response is not None
+                else 0
+            ),
+            correlation_id=correlation_id,
+            retries=phases.retries,
+            duration=phases.elapsed,
+            phases=phases.durations,
+        )
 
-        rel_url = path
-        for name, value in rendered_parameters["path"].items():
-            rel_url = path.replace("{" + name + "}", value)
-        query_params = rendered_parameters["query"]
 
-        url = urljoin(self._base_url, rel_url)
+class AsyncOpenAPI(OpenAPI):
+    """
+    Variant of `OpenAPI` that can additionally be called from asyncio code.
 
-        request = self._render_request(
-            path_spec,
-            method,
-            url,
-            query_params,
-            headers,
-            body,
-            validate_body=validate_body,
-        )
-        self._log_request(request)
+    Rendering, validation and parsing are shared with `OpenAPI`, so `call` keeps working.
+    `acall` sends the requests with an `AsyncTransport`, allowing many concurrent calls on a
+    single event loop.
+    The api spec is still loaded synchronously when the object is created.
 
-        if self._dry_run and request.method.lower() not in SAFE_METHODS:
-            raise UnsafeCallError(_("Call aborted due to safe mode"))
+    Parameters:
+        async_transport: Transport to send the requests of `acall` with.
+            Defaults to `AiohttpTransport` if `aiohttp` is installed and no `transport` was
+            provided; otherwise the synchronous transport is run in worker threads.
+        kwargs: All arguments of `OpenAPI`.
+    """
 
-        may_retry = False
-        if proposal := self._select_proposal(request):
-            may_retry = asyncio.run(self._authenticate_request(request, proposal))
+    def __init__(
+        self,
+        *args: t.Any,
+        async_transport: AsyncTransport | None = None,
+        **kwargs: t.Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        if async_transport is None:
+            if AIOHTTP_AVAILABLE and kwargs.get("transport") is None:
+                async_transport = AiohttpTransport(self.ssl_context, self._connection)
+            else:
+                async_transport = ThreadedAsyncTransport(self._transport)
+        self._async_transport = async_transport
 
-        response = self._send_request(request)
+    async def aclose(self) -> None:
+        """
+        Release the resources held by the transports.
+        """
+        await self._async_transport.close()
+        self.close()
+
+    async def _send_token_request(self, request: Request) -> Response:
+        return await self._asend_request(request)
+
+    async def _asend_request(self, request: Request) -> Response:
+        if self._governor is None:
+            return await self._async_transport.send(request)
+        with span("throttle", operation_id=request.operation_id):
+            await asyncio.to_thread(self._governor.acquire, request)
+        status_code = 0
+        start = time.perf_counter()
+        try:
+            response = await self._async_transport.send(request)
+            status_code = response.status_code
+        finally:
+            self._governor.release(status_code, time.perf_counter() - start)
+        return response
 
-        if proposal is not None:
-            assert self._auth_provider is not None
-            if may_retry and response.status_code == 401:
-                self._oauth2_token = None
-                asyncio.run(self._authenticate_request(request, proposal))
-                response = self._send_request(request)
+    async def _asend_request_with_retries(self, request: Request, phases: _Phases) -> Response:
+        delay: float | None = 0.0
+        while True:
+            response: Response | None = None
+            error: OpenAPIConnectionError | None = None
+            try:
+                with span("send_request", operation_id=request.operation_id, method=request.method):
+                    response = await self._asend_request(request)
+            except OpenAPIConnectionError as e:
+                error = e
+            phases.lap("send")
+            delay = self._retry_delay(request, response, error, phases, delay or 0.0)
+            if delay is None:
+                break
+            with span("retry_wait", operation_id=request.operation_id):
+                await asyncio.sleep(delay)
+            phases.lap("retry_wait")
+        if error is not None:
+            raise error
+        assert response is not None
+        return response
 
-            if response.status_code >= 200 and response.status_code < 300:
-                asyncio.run(self._auth_provider.auth_success_hook())
-            elif response.status_code == 401:
-                asyncio.run(self._auth_provider.auth_failure_hook())
+    async def acall(
+        self,
+        operation_id: str,
+        parameters: dict[str, t.Any] | None = None,
+        body: dict[str, t.Any] | None = None,
+        validate_body: bool = True,
+    ) -> t.Any:
+        """
+        Make a call to the server without blocking the event loop.
 
-        self._log_response(response)
-        return self._parse_response(operation_spec, response)
+        See `call` for the parameters, return value and exceptions.
+        """
+        operation_spec, request, phases = self._prepare_call(
+            operation_id, parameters, body, validate_body
+        )
+        response: Response | None = self._cached_response(request, phases)
+        if response is not None:
+            return self._finish_call(operation_spec, request, response, phases)
+        try:
+            may_retry = False
+            if proposal := self._select_proposal(request):
+                with span("authenticate", operation_id=operation_id):
+                    may_retry = await self._authenticate_request(request, proposal)
+                phases.lap("authenticate")
+
+            response = await self._asend_request_with_retries(request, phases)
+
+            if proposal is not None:
+                assert self._auth_provider is not None
+                if may_retry and response.status_code == 401:
+                    phases.retries += 1
+                    self._invalidate_oauth2_token(request)
+                    with span("authenticate", operation_id=operation_id):
+                        await self._authenticate_request(request, proposal)
+                    phases.lap("authenticate")
+                    response = await self._asend_request_with_retries(request, phases)
+
+                if response.status_code >= 200 and response.status_code < 300:
+                    await self._auth_provider.auth_success_hook()
+                elif response.status_code == 401:
+                    await self._auth_provider.auth_failure_hook()
+
+            return self._finish_call(operation_spec, request, response, phases)
+        finally:
+            if self._trace_sink is not None:
+                self._trace_sink.record(self._trace_record(request, response, phases))
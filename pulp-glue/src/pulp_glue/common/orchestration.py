@@ -0,0 +1,499 @@
+"""
+Syncing many repositories.
+
+Syncing hundreds of repositories one after the other takes hours, while triggering all of the syncs
+at once floods the task queue of the server.
+A `SyncOrchestrator` keeps a bounded number of tasks in flight and watches all of them with batched
+task polling.
+Optionally, the repository version of each sync is published and distributed right after it, so the
+stages of different repositories overlap.
+Stages whose input did not change are skipped.
+"""
+
+import datetime
+import time
+import typing as t
+from collections import deque
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+
+from pulp_glue.common.context import (
+    EntityDefinition,
+    PulpContext,
+    PulpDistributionContext,
+    PulpPublicationContext,
+    PulpRepositoryContext,
+)
+from pulp_glue.common.exceptions import PulpEntityNotFound, PulpException
+from pulp_glue.common.i18n import get_translation
+
+translation = get_translation(__package__)
+_ = translation.gettext
+
+TASK_FIELDS = ["pulp_href", "state", "error", "created_resources"]
+"""Fields of the tasks read while polling."""
+
+
+def repository_types(pulp_ctx: PulpContext) -> list[str]:
+    """
+    Types of repositories that can be synced on the server.
+
+    Returns:
+        Keys of `PulpRepositoryContext.TYPE_REGISTRY` in the form '<plugin>:<resource_type>'.
+    """
+    return [
+        key
+        for key, ctx_class in PulpRepositoryContext.TYPE_REGISTRY.items()
+        if all(pulp_ctx.has_plugin(requirement) for requirement in ctx_class.NEEDS_PLUGINS)
+        and ctx_class(pulp_ctx)._operation_id("sync") in pulp_ctx.api.operations
+    ]
+
+
+def select_repositories(
+    pulp_ctx: PulpContext,
+    types: t.Iterable[str] | None = None,
+    label_select: str | None = None,
+    name_pattern: str | None = None,
+    names: t.Iterable[str] | None = None,
+) -> list[PulpRepositoryContext]:
+    """
+    Find the repositories to sync.
+
+    Parameters:
+        pulp_ctx: The server context.
+        types: Repository types in the form '<plugin>:<resource_type>'.
+            Defaults to all types that can be synced.
+        label_select: A label search query the repositories need to match.
+        name_pattern: A glob pattern the names of the repositories need to match.
+        names: Names of the repositories to select, all of which need to exist.
+
+    Raises:
+        PulpEntityNotFound: if none of the selected types has a repository with one of the `names`.
+
+    Returns:
+        Contexts of the selected repositories, ordered by type and name.
+    """
+    available = repository_types(pulp_ctx)
+    if types is None:
+        types = available
+    names = None if names is None else list(names)
+    found: set[str] = set()
+    result: list[PulpRepositoryContext] = []
+    for key in types:
+        if key not in available:
+            raise PulpException(
+                _("Repositories of type '{type}' cannot be synced on this server.").format(type=key)
+            )
+        ctx_class = PulpRepositoryContext.TYPE_REGISTRY[key]
+        list_ctx = ctx_class(pulp_ctx)
+        parameters = pulp_ctx.projection(list_ctx._operation_id("list"), ["pulp_href", "name"])
+        if label_select:
+            parameters["pulp_label_select"] = label_select
+        if name_pattern and not any(char in name_pattern for char in "*?["):
+            parameters["name"] = name_pattern
+        entities = sorted(
+            (
+                entity
+                for entity in _list_named(list_ctx, parameters, names)
+                if name_pattern is None or fnmatchcase(entity["name"], name_pattern)
+            ),
+            key=lambda entity: t.cast(str, entity["name"]),
+        )
+        found.update(entity["name"] for entity in entities)
+        result.extend(ctx_class(pulp_ctx, pulp_href=entity["pulp_href"]) for entity in entities)
+    if names is not None and (missing := [name for name in names if name not in found]):
+        raise PulpEntityNotFound(
+            _("Could not find repositories named {names}.").format(names=", ".join(missing))
+        )
+    return result
+
+
+def _list_named(
+    list_ctx: PulpRepositoryContext, parameters: dict[str, t.Any], names: list[str] | None
+) -> t.Iterator[EntityDefinition]:
+    if names is None:
+        yield from list_ctx.list_iterator(parameters=parameters)
+    elif "name__in" in list_ctx.pulp_ctx.api.param_spec(list_ctx._operation_id("list"), "query"):
+        for batch in list_ctx.lookup_batches(name for name in names if "," not in name):
+            yield from list_ctx.list_iterator(parameters={**parameters, "name__in": batch})
+        # Names with a comma would be split by the server.
+        for name in names:
+            if "," in name:
+                yield from list_ctx.list_iterator(parameters={**parameters, "name": name})
+    else:
+        wanted = set(names)
+        yield from (
+            entity
+            for entity in list_ctx.list_iterator(parameters=parameters)
+            if entity["name"] in wanted
+        )
+
+
+@dataclass
+class StageResult:
+    """
+    Outcome of a stage of a repository.
+    """
+
+    state: str = "running"
+    """One of 'running', 'completed', 'skipped' and 'failed'."""
+    started: float = field(default_factory=time.monotonic)
+    finished: float | None = None
+
+    @property
+    def latency(self) -> float | None:
+        """Seconds from starting the stage until it was seen finished."""
+        return None if self.finished is None else self.finished - self.started
+
+
+@dataclass
+class SyncRun:
+    """
+    Progress of syncing a single repository.
+
+    Parameters:
+        repository_ctx: The repository to sync.
+    """
+
+    repository_ctx: PulpRepositoryContext
+    state: str = "pending"
+    """One of 'pending', 'running', 'completed', 'failed', 'skipped' and 'timed out'."""
+    stage: str | None = None
+    """The stage running or, once finished, the last one that ran."""
+    stages: dict[str, StageResult] = field(default_factory=dict)
+    version_href: str | None = None
+    """The repository version created by the sync, or the latest one if nothing changed."""
+    changed: bool = False
+    """Whether the sync created a new repository version."""
+    publication_href: str | None = None
+    distribution_ctx: PulpDistributionContext | None = None
+    distributed_href: str | None = None
+    """The publication served by the distribution before."""
+    error: str | None = None
+    started: float | None = None
+    finished: float | None = None
+
+    def summary(self) -> dict[str, t.Any]:
+        """
+        The outcome of the run as a serializable record.
+        """
+        entity = self.repository_ctx.entity
+        duration = None
+        if self.started is not None:
+            duration = round((self.finished or time.monotonic()) - self.started, 3)
+        return {
+            "name": entity["name"],
+            "pulp_href": entity["pulp_href"],
+            "state": self.state,
+            "stages": {
+                name: {
+                    "state": result.state,
+                    "latency": None if result.latency is None else round(result.latency, 3),
+                }
+                for name, result in self.stages.items()
+            },
+            "version": self.version_href,
+            "changed": self.changed,
+            "publication": self.publication_href,
+            "duration": duration,
+            "error": self.error,
+        }
+
+
+@dataclass
+class StageStats:
+    """
+    Outcomes and latencies of a stage across repositories.
+    """
+
+    completed: int = 0
+    skipped: int = 0
+    failed: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        """Mean latency of the completed stages."""
+        return self.total / self.completed if self.completed else 0.0
+
+
+def stage_statistics(runs: t.Iterable[SyncRun]) -> dict[str, StageStats]:
+    """
+    Aggregate the outcomes and latencies of the stages of many runs.
+
+    Only completed stages count towards the latencies.
+
+    Returns:
+        Statistics per stage name in the order the stages run.
+    """
+    stats: dict[str, StageStats] = {}
+    for run in runs:
+        for name, result in run.stages.items():
+            stage_stats = stats.setdefault(name, StageStats())
+            if result.state == "completed" and result.latency is not None:
+                stage_stats.completed += 1
+                stage_stats.total += result.latency
+                stage_stats.max = max(stage_stats.max, result.latency)
+            elif result.state == "skipped":
+                stage_stats.skipped += 1
+            elif result.state == "failed":
+                stage_stats.failed += 1
+    order = ["sync", "publish", "distribute"]
+    return dict(sorted(stats.items(), key=lambda item: order.index(item[0])))
+
+
+class SyncOrchestrator:
+    """
+    Sync many repositories with a bounded number of tasks in flight.
+
+    Each repository runs through the stages 'sync', and optionally 'publish' and 'distribute'.
+    Publishing creates a publication of the repository version left by the sync.
+    Distributing points the distribution with the same name as the repository at it.
+    Both stages are left out for repository types without publications.
+    Stages of repositories already underway are started before the syncs of further ones, while
+    the stages of different repositories overlap.
+
+    A stage is skipped if its outcome is in place already:
+    Publishing, if the sync created a publication itself, like syncs of rpm repositories with the
+    'mirror_complete' policy, or if the sync did not create a new repository version and that
+    version has a publication.
+    Distributing, if the distribution serves that publication.
+
+    The orchestrator always waits for the tasks, regardless of `background_tasks`.
+
+    Parameters:
+        pulp_ctx: The server context.
+        max_in_flight: Largest number of tasks to keep running at a time.
+        sync_body: Options for all syncs, e.g. `{"mirror": True}`.
+        publish: Publish each synced repository version.
+        distribute: Distribute each publication. Implies `publish`.
+        poll_interval: Seconds to wait between polling unfinished tasks.
+    """
+
+    def __init__(
+        self,
+        pulp_ctx: PulpContext,
+        max_in_flight: int = 4,
+        sync_body: EntityDefinition | None = None,
+        publish: bool = False,
+        distribute: bool = False,
+        poll_interval: float = 1.0,
+    ) -> None:
+        if max_in_flight < 1:
+            raise PulpException(_("At least one task needs to be allowed in flight."))
+        self.pulp_ctx = pulp_ctx
+        self.max_in_flight = max_in_flight
+        self.sync_body = sync_body or {}
+        self.publish = publish or distribute
+        self.distribute = distribute
+        self.poll_interval = poll_interval
+
+    def run(self, repository_ctxs: t.Iterable[PulpRepositoryContext]) -> list[SyncRun]:
+        """
+        Sync the repositories and wait for all of them to finish.
+
+        Failures are recorded on the runs rather than raised.
+
+        Returns:
+            A run for each repository in the given order.
+        """
+        repository_ctxs = list(repository_ctxs)
+        self.pulp_ctx.load_entities(repository_ctxs)
+        runs = [SyncRun(repository_ctx) for repository_ctx in repository_ctxs]
+        if self.distribute:
+            self._find_distributions(runs)
+        pending = deque(runs)
+        active: dict[str, SyncRun] = {}
+        self._done = 0
+        self._total = len(runs)
+        deadline = (
+            datetime.datetime.now() + self.pulp_ctx.timeout if self.pulp_ctx.timeout else None
+        )
+        while pending or active:
+            while pending and len(active) < self.max_in_flight:
+                self._start(pending.popleft(), "sync", active)
+            if deadline and datetime.datetime.now() > deadline:
+                for run in [*active.values(), *pending]:
+                    run.state = "timed out"
+                    run.error = _("Waiting for the tasks timed out.")
+                break
+            finished = []
+            if active:
+                finished = [
+                    task
+                    for task in self.pulp_ctx.read_tasks(active, fields=TASK_FIELDS)
+                    if task["state"] not in ["waiting", "running", "canceling"]
+                ]
+            for task in finished:
+                self._finish_stage(active.pop(task["pulp_href"]), task, active)
+            if active and not finished:
+                time.sleep(self.poll_interval)
+        return runs
+
+    def _find_distributions(self, runs: list[SyncRun]) -> None:
+        # Distributions named like their repositories, looked up per type in batches.
+        by_type: dict[str, list[SyncRun]] = {}
+        for run in runs:
+            by_type.setdefault(self._type_key(run.repository_ctx), []).append(run)
+        for key, typed_runs in by_type.items():
+            distribution_class = PulpDistributionContext.TYPE_REGISTRY.get(key)
+            if distribution_class is None or key not in PulpPublicationContext.TYPE_REGISTRY:
+                continue
+            matches = distribution_class(self.pulp_ctx).find_many(
+                [{"name": run.repository_ctx.entity["name"]} for run in typed_runs], complete=True
+            )
+            for run, entities in zip(typed_runs, matches):
+                if len(entities) == 1:
+                    run.distribution_ctx = distribution_class(
+                        self.pulp_ctx, pulp_href=entities[0]["pulp_href"]
+                    )
+                    run.distributed_href = entities[0].get("publication")
+
+    @staticmethod
+    def _type_key(repository_ctx: PulpRepositoryContext) -> str:
+        return f"{repository_ctx.PLUGIN}:{repository_ctx.RESOURCE_TYPE}"
+
+    def _next_stage(self, run: SyncRun) -> str | None:
+        publishable = self._type_key(run.repository_ctx) in PulpPublicationContext.TYPE_REGISTRY
+        if run.stage == "sync" and self.publish and publishable:
+            return "publish"
+        if (
+            run.stage == "publish"
+            and run.distribution_ctx is not None
+            and run.publication_href is not None
+        ):
+            return "distribute"
+        return None
+
+    def _start(self, run: SyncRun, stage: str, active: dict[str, SyncRun]) -> None:
+        if run.started is None:
+            run.started = time.monotonic()
+        if stage == "sync" and not (
+            self.sync_body.get("remote") or run.repository_ctx.entity.get("remote")
+        ):
+            self._end(run, "skipped", _("The repository does not have a remote."))
+            return
+        run.state = "running"
+        run.stage = stage
+        run.stages[stage] = StageResult()
+        try:
+            if self._unchanged(run, stage):
+                self._finish_stage(run, None, active, skipped=True)
+                return
+            task = self._trigger(run, stage)
+        except PulpException as e:
+            self._end(run, "failed", str(e))
+            return
+        if task is None:
+            self._finish_stage(run, None, active)
+        else:
+            active[task["pulp_href"]] = run
+
+    def _unchanged(self, run: SyncRun, stage: str) -> bool:
+        # Whether the outcome of the stage is in place already.
+        if stage == "publish" and run.publication_href is not None:
+            # Published by the sync.
+            return True
+        if stage == "publish" and not run.changed:
+            publication_ctx = PulpPublicationContext.TYPE_REGISTRY[
+                self._type_key(run.repository_ctx)
+            ](self.pulp_ctx)
+            list_id = publication_ctx._operation_id("list")
+            if "repository_version" not in self.pulp_ctx.api.param_spec(list_id, "query"):
+                return False
+            publications = publication_ctx.call(
+                "list",
+                parameters={
+                    "repository_version": run.version_href,
+                    "limit": 1,
+                    **self.pulp_ctx.projection(list_id, ["pulp_href"]),
+                },
+            )["results"]
+            if publications:
+                run.publication_href = publications[0]["pulp_href"]
+                return True
+        if stage == "distribute":
+            return run.distributed_href == run.publication_href
+        return False
+
+    def _trigger(self, run: SyncRun, stage: str) -> EntityDefinition | None:
+        # Returns the task started for the stage, if any.
+        repository_ctx = run.repository_ctx
+        if stage == "sync":
+            return t.cast(EntityDefinition, repository_ctx.sync(self.sync_body, non_blocking=True))
+        if stage == "publish":
+            publication_class = PulpPublicationContext.TYPE_REGISTRY[self._type_key(repository_ctx)]
+            return t.cast(
+                EntityDefinition,
+                publication_class(self.pulp_ctx).create(
+                    {"repository_version": run.version_href}, non_blocking=True
+                ),
+            )
+        assert stage == "distribute" and run.distribution_ctx is not None
+        result = run.distribution_ctx.update(
+            {"publication": run.publication_href}, non_blocking=True
+        )
+        if result["pulp_href"].startswith(self.pulp_ctx.api_path + "tasks/"):
+            return t.cast(EntityDefinition, result)
+        return None
+
+    def _finish_stage(
+        self,
+        run: SyncRun,
+        task: EntityDefinition | None,
+        active: dict[str, SyncRun],
+        skipped: bool = False,
+    ) -> None:
+        assert run.stage is not None
+        if task is not None:
+            if task["state"] != "completed":
+                error = task.get("error") or {}
+                self._end(
+                    run,
+                    "failed",
+                    error.get("description")
+                    or error.get("reason")
+                    or _("Task {state}.").format(state=task["state"]),
+                )
+                return
+            created = task.get("created_resources") or []
+            publications_path = self.pulp_ctx.api_path + "publications/"
+            if run.stage in ["sync", "publish"]:
+                run.publication_href = next(
+                    (href for href in created if href.startswith(publications_path)), None
+                )
+            if run.stage == "sync":
+                versions_href = run.repository_ctx.entity["versions_href"]
+                run.version_href = next(
+                    (href for href in created if href.startswith(versions_href)), None
+                )
+                run.changed = run.version_href is not None
+                if not run.changed:
+                    run.version_href = run.repository_ctx.entity["latest_version_href"]
+        result = run.stages[run.stage]
+        result.state = "skipped" if skipped else "completed"
+        result.finished = time.monotonic()
+        next_stage = self._next_stage(run)
+        if next_stage is None:
+            self._end(run, "completed")
+        else:
+            self._start(run, next_stage, active)
+
+    def _end(self, run: SyncRun, state: str, error: str | None = None) -> None:
+        run.state = state
+        run.error = error
+        run.finished = time.monotonic()
+        if state == "failed" and run.stage is not None:
+            run.stages[run.stage].state = "failed"
+            run.stages[run.stage].finished = run.finished
+        self._done += 1
+        self.pulp_ctx.echo(
+            _("Repository {name} {state} ({done} of {total}).").format(
+                name=run.repository_ctx.entity["name"],
+                state=state,
+                done=self._done,
+                total=self._total,
+            ),
+            err=True,
+        )
@@ -0,0 +1,87 @@
+"""
+Adaptive page sizes for listing entities.
+
+Listing tiny entities like tags in pages of a fixed size takes many round trips, while a page of
+large entities like packages with long changelogs can keep the server busy long enough to risk
+gateway timeouts.
+`AdaptivePaging` measures the latency and the size of each page and scales the size of the next
+page toward a target latency.
+The sizes found are remembered per list operation, so later listings start out with them.
+"""
+
+import threading
+from dataclasses import dataclass
+
+
+@dataclass
+class AdaptivePaging:
+    """
+    Page sizes adapting to the time the server needs for a page.
+
+    It can be shared by multiple threads.
+
+    Parameters:
+        target_latency: Seconds the server should need to respond with a page.
+        min_size: Smallest page size to use.
+        max_size: Largest page size to use.
+        initial_size: Page size to start with for list operations not seen before.
+        max_page_bytes: Largest response body to aim for, where its size is known.
+        max_step: Largest factor to grow or shrink the page size by at a time.
+    """
+
+    target_latency: float = 2.0
+    min_size: int = 10
+    max_size: int = 1000
+    initial_size: int = 100
+    max_page_bytes: int | None = None
+    max_step: float = 2.0
+
+    def __post_init__(self) -> None:
+        self._sizes: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _clamp(self, size: float) -> int:
+        return max(self.min_size, min(self.max_size, round(size)))
+
+    def page_size(self, operation_id: str) -> int:
+        """
+        The page size to start listing with.
+        """
+        with self._lock:
+            return self._sizes.get(operation_id) or self._clamp(self.initial_size)
+
+    def record(
+        self,
+        operation_id: str,
+        size: int,
+        count: int,
+        latency: float,
+        body_size: int | None = None,
+    ) -> int:
+        """
+        Learn from the response to a page request.
+
+        Parameters:
+            operation_id: The list operation.
+            size: The page size requested.
+            count: The number of entities received.
+            latency: Seconds until the server responded.
+            body_size: Size of the response body in bytes, if known.
+
+        Returns:
+            The page size to request next.
+        """
+        if count == 0:
+            return size
+        # The time and space per entity predict the size of a page that meets the targets.
+        factor = self.target_latency / max(latency, 0.001)
+        if self.max_page_bytes and body_size:
+            factor = min(factor, self.max_page_bytes / body_size)
+        if count < size and factor >= 1:
+            # A short last page that was fast enough tells nothing about larger pages.
+            return size
+        factor = max(1 / self.max_step, min(self.max_step, factor))
+        new_size = self._clamp(count * factor)
+        with self._lock:
+            self._sizes[operation_id] = new_size
+        return new_size
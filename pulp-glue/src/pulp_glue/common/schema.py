@@ -116,7 +116,7 @@ def _assert_min_max(schema: oas.TypeSchema, name: str, value: int | float) -> No
 
 
 def validate(
-    schema: oas.Schema, name: str, value: t.Any, components: dict[str, oas.Schema]
+    schema: oas.Schema, name: str, value: t.Any, components: t.Mapping[str, oas.Schema]
 ) -> None:
     if isinstance(schema, bool):
         # 'true' and 'false' can be used as allow/deny anything quantors.
@@ -187,7 +187,11 @@ def validate(
 
 
 def _validate_type(
-    schema_type: str, schema: oas.TypeSchema, name: str, value: t.Any, components: dict[str, t.Any]
+    schema_type: str,
+    schema: oas.TypeSchema,
+    name: str,
+    value: t.Any,
+    components: t.Mapping[str, t.Any],
 ) -> None:
     if (typed_validator := _TYPED_VALIDATORS.get(schema_type)) is None:
         raise NotImplementedError(
@@ -196,7 +200,9 @@ def _validate_type(
     typed_validator(schema, name, value, components)
 
 
-def _validate_ref(schema_ref: str, name: str, value: t.Any, components: dict[str, t.Any]) -> None:
+def _validate_ref(
+    schema_ref: str, name: str, value: t.Any, components: t.Mapping[str, t.Any]
+) -> None:
     if not schema_ref.startswith("#/components/schemas/"):
         raise SchemaError(_("'{name}' contains an invalid reference.").format(name=name))
     schema_name = schema_ref[21:]
@@ -207,7 +213,7 @@ def _validate_ref(schema_ref: str, name: str, value: t.Any, components: dict[str
 
 
 def _validate_array(
-    schema: oas.TypeSchema, name: str, value: t.Any, components: dict[str, t.Any]
+    schema: oas.TypeSchema, name: str, value: t.Any, components: t.Mapping[str, t.Any]
 ) -> None:
     _assert_type(name, value, list, "array")
     if schema.min_items is not None and len(value) < schema.min_items:
@@ -231,13 +237,13 @@ def _validate_array(
 
 
 def _validate_boolean(
-    schema: oas.TypeSchema, name: str, value: t.Any, components: dict[str, t.Any]
+    schema: oas.TypeSchema, name: str, value: t.Any, components: t.Mapping[str, t.Any]
 ) -> None:
     _assert_type(name, value, bool, "boolean")
 
 
 def _validate_integer(
-    schema: oas.TypeSchema, name: str, value: t.Any, components: dict[str, t.Any]
+    schema: oas.TypeSchema, name: str, value: t.Any, components: t.Mapping[str, t.Any]
 ) -> None:
     _assert_type(name, value, int, "integer")
     _assert_min_max(schema, name, value)
@@ -251,21 +257,21 @@ def _validate_integer(
 
 
 def _validate_null(
-    schema: oas.TypeSchema, name: str, value: t.Any, components: dict[str, t.Any]
+    schema: oas.TypeSchema, name: str, value: t.Any, components: t.Mapping[str, t.Any]
 ) -> None:
     if value is not None:
         raise ValidationError(_("'{name}' is expected to be a null").format(name=name))
 
 
 def _validate_number(
-    schema: oas.TypeSchema, name: str, value: t.Any, components: dict[str, t.Any]
+    schema: oas.TypeSchema, name: str, value: t.Any, components: t.Mapping[str, t.Any]
 ) -> None:
     _assert_type(name, value, (float, int), "number")
     _assert_min_max(schema, name, value)
 
 
 def _validate_object(
-    schema: oas.TypeSchema, name: str, value: t.Any, components: dict[str, t.Any]
+    schema: oas.TypeSchema, name: str, value: t.Any, components: t.Mapping[str, t.Any]
 ) -> None:
     _assert_type(name, value, dict, "object")
     extra_values = {}
@@ -293,7 +299,7 @@ def _validate_object(
 
 
 def _validate_string(
-    schema: oas.TypeSchema, name: str, value: t.Any, components: dict[str, t.Any]
+    schema: oas.TypeSchema, name: str, value: t.Any, components: t.Mapping[str, t.Any]
 ) -> None:
     schema_format = schema.format_
     if schema_format == "byte":
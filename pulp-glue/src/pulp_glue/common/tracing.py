@@ -0,0 +1,335 @@
+"""
+Instrumentation hooks for pulp-glue.
+
+The expensive steps of talking to a Pulp server are wrapped in named spans.
+Span hooks can be registered to observe them, e.g. to aggregate timings or to export them to a
+tracing system:
+
+```python
+from opentelemetry import trace
+
+tracer = trace.get_tracer("pulp-glue")
+register_span_hook(lambda name, attributes: tracer.start_as_current_span(name, attributes=attributes))
+```
+
+Individual requests to the server can be recorded by passing a `TraceSink` to `OpenAPI`.
+The resulting trace files can be aggregated with `summarize_trace`.
+"""
+
+import json
+import threading
+import time
+import typing as t
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from pulp_glue.common import __version__
+
+SpanHook = t.Callable[[str, dict[str, t.Any]], t.ContextManager[t.Any]]
+"""A callable returning a context manager that is entered for the duration of a span."""
+
+_SPAN_HOOKS: list[SpanHook] = []
+
+
+def register_span_hook(hook: SpanHook) -> None:
+    """
+    Register a hook to be called for every span.
+
+    Parameters:
+        hook: Callable receiving the name and attributes of the span.
+            The returned context manager is entered for the duration of the span.
+    """
+    _SPAN_HOOKS.append(hook)
+
+
+def unregister_span_hook(hook: SpanHook) -> None:
+    """
+    Remove a previously registered span hook.
+    """
+    _SPAN_HOOKS.remove(hook)
+
+
+@contextmanager
+def span(name: str, **attributes: t.Any) -> t.Iterator[None]:
+    """
+    Context manager marking a unit of work to be reported to the registered span hooks.
+
+    Parameters:
+        name: Name of the span. Spans with the same name are aggregated.
+        attributes: Additional information about this particular span.
+    """
+    if not _SPAN_HOOKS:
+        yield
+        return
+    with ExitStack() as stack:
+        for hook in list(_SPAN_HOOKS):
+            stack.enter_context(hook(name, attributes))
+        yield
+
+
+@dataclass
+class SpanStats:
+    count: int = 0
+    total: float = 0.0
+    own: float = 0.0
+
+
+class SpanTimings:
+    """
+    A span hook aggregating the time spent per span name.
+
+    Besides the total time, the time not spent in nested spans is tracked as `own` time.
+    """
+
+    def __init__(self) -> None:
+        self.stats: dict[str, SpanStats] = {}
+        self._lock = threading.Lock()
+        # Time spent in nested spans, tracked per thread and per asyncio task.
+        self._parent: ContextVar[list[float] | None] = ContextVar("span_parent", default=None)
+
+    @contextmanager
+    def __call__(self, name: str, attributes: dict[str, t.Any]) -> t.Iterator[None]:
+        parent = self._parent.get()
+        children = [0.0]
+        token = self._parent.set(children)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self._parent.reset(token)
+            if parent is not None:
+                parent[0] += duration
+            with self._lock:
+                stats = self.stats.setdefault(name, SpanStats())
+                stats.count += 1
+                stats.total += duration
+                stats.own += duration - children[0]
+
+    def report(self) -> list[tuple[str, SpanStats]]:
+        """
+        Returns:
+            The aggregated timings, ordered by descending own time.
+        """
+        with self._lock:
+            return sorted(self.stats.items(), key=lambda item: item[1].own, reverse=True)
+
+
+@dataclass
+class TraceRecord:
+    """
+    A structured record of a single request made to the server.
+
+    Durations are given in milliseconds.
+    A `status` of `0` indicates that no response was received.
+    """
+
+    timestamp: str
+    operation_id: str
+    method: str
+    url: str
+    status: int
+    request_size: int
+    response_size: int
+    correlation_id: str | None
+    retries: int
+    duration: float
+    phases: dict[str, float] = field(default_factory=dict)
+
+
+class TraceSink:
+    """
+    Base class for consumers of trace records.
+
+    Sinks are handed to `OpenAPI` via the `trace_sink` parameter and receive one record per call.
+    """
+
+    def record(self, record: TraceRecord) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class NDJSONTraceSink(TraceSink):
+    """
+    Trace sink appending one JSON object per line to a file.
+
+    Records are written as they arrive, so the trace of a long running job can be inspected
+    while it is still running.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self._lock = threading.Lock()
+        self._file = Path(path).open("a", encoding="utf-8")  # noqa: SIM115
+
+    def record(self, record: TraceRecord) -> None:
+        line = json.dumps(asdict(record))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class HARTraceSink(TraceSink):
+    """
+    Trace sink writing an HTTP Archive (HAR 1.2) file when closed.
+
+    Headers and bodies are not recorded to avoid leaking credentials.
+    Fields without a HAR equivalent are added as custom fields prefixed with an underscore.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self._path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: list[dict[str, t.Any]] = []
+
+    def record(self, record: TraceRecord) -> None:
+        entry = {
+            "startedDateTime": record.timestamp,
+            "time": record.duration,
+            "request": {
+                "method": record.method.upper(),
+                "url": record.url,
+                "httpVersion": "HTTP/1.1",
+                "cookies": [],
+                "headers": [],
+                "queryString": [],
+                "headersSize": -1,
+                "bodySize": record.request_size,
+            },
+            "response": {
+                "status": record.status,
+                "statusText": "",
+                "httpVersion": "HTTP/1.1",
+                "cookies": [],
+                "headers": [],
+                "content": {"size": record.response_size, "mimeType": ""},
+                "redirectURL": "",
+                "headersSize": -1,
+                "bodySize": record.response_size,
+            },
+            "cache": {},
+            "timings": {"send": 0, "wait": record.phases.get("send", -1), "receive": 0},
+            "_operationId": record.operation_id,
+            "_correlationId": record.correlation_id,
+            "_retries": record.retries,
+            "_phases": record.phases,
+        }
+        with self._lock:
+            self._entries.append(entry)
+
+    def close(self) -> None:
+        with self._lock:
+            har = {
+                "log": {
+                    "version": "1.2",
+                    "creator": {"name": "pulp-glue", "version": __version__},
+                    "entries": self._entries,
+                }
+            }
+            self._path.write_text(json.dumps(har, indent=2), encoding="utf-8")
+
+
+def trace_sink(path: str | Path) -> TraceSink:
+    """
+    Create a trace sink for a file.
+
+    Files with the extension `.har` are written as HTTP Archive, all others as NDJSON.
+    """
+    if Path(path).suffix.lower() == ".har":
+        return HARTraceSink(path)
+    return NDJSONTraceSink(path)
+
+
+def load_trace(path: str | Path) -> list[TraceRecord]:
+    """
+    Read the records from a trace file written by one of the trace sinks.
+    """
+    text = Path(path).read_text(encoding="utf-8")
+    try:
+        data = json.loads(text)
+    except ValueError:
+        # Multiple lines of NDJSON.
+        data = None
+    if isinstance(data, dict) and "log" in data:
+        return [
+            TraceRecord(
+                timestamp=entry["startedDateTime"],
+                operation_id=entry.get("_operationId", ""),
+                method=entry["request"]["method"].lower(),
+                url=entry["request"]["url"],
+                status=entry["response"]["status"],
+                request_size=max(entry["request"]["bodySize"], 0),
+                response_size=max(entry["response"]["bodySize"], 0),
+                correlation_id=entry.get("_correlationId"),
+                retries=entry.get("_retries", 0),
+                duration=entry["time"],
+                phases=entry.get("_phases", {}),
+            )
+            for entry in data["log"]["entries"]
+        ]
+    return [TraceRecord(**json.loads(line)) for line in text.splitlines() if line.strip()]
+
+
+def summarize_trace(records: t.Iterable[TraceRecord], top: int = 10) -> dict[str, t.Any]:
+    """
+    Aggregate trace records.
+
+    Parameters:
+        records: The records to aggregate.
+        top: Number of slowest calls to report individually.
+
+    Returns:
+        Totals, per operation statistics ordered by descending total duration and the slowest
+            calls.
+    """
+    records = list(records)
+    operations: dict[str, dict[str, t.Any]] = {}
+    for record in records:
+        stats = operations.setdefault(
+            record.operation_id,
+            {
+                "operation_id": record.operation_id,
+                "count": 0,
+                "errors": 0,
+                "retries": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "bytes_sent": 0,
+                "bytes_received": 0,
+            },
+        )
+        stats["count"] += 1
+        stats["errors"] += not 200 <= record.status < 300
+        stats["retries"] += record.retries
+        stats["total_ms"] += record.duration
+        stats["max_ms"] = max(stats["max_ms"], record.duration)
+        stats["bytes_sent"] += record.request_size
+        stats["bytes_received"] += record.response_size
+    for stats in operations.values():
+        stats["mean_ms"] = stats["total_ms"] / stats["count"]
+    slowest = sorted(records, key=lambda record: record.duration, reverse=True)[:top]
+    return {
+        "requests": len(records),
+        "total_ms": sum(record.duration for record in records),
+        "bytes_sent": sum(record.request_size for record in records),
+        "bytes_received": sum(record.response_size for record in records),
+        "operations": sorted(operations.values(), key=lambda item: item["total_ms"], reverse=True),
+        "slowest": [
+            {
+                "operation_id": record.operation_id,
+                "method": record.method,
+                "url": record.url,
+                "status": record.status,
+                "duration_ms": record.duration,
+                "timestamp": record.timestamp,
+            }
+            for record in slowest
+        ],
+    }
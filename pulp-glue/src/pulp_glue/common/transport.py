@@ -0,0 +1,665 @@
+"""
+Transports used by `OpenAPI` to send rendered requests to the server, and the policy to retry them.
+
+Besides the default `RequestsTransport`, a `RecordingTransport` can capture all request/response
+pairs of a session to a cassette file, and a `ReplayTransport` serves them back without any
+network access.
+This allows to reproduce a session locally and to measure the client side in isolation:
+
+```python
+api = OpenAPI(base_url, doc_path, transport=RecordingTransport("session.json"))
+...
+api.close()
+api = OpenAPI(base_url, doc_path, transport=ReplayTransport("session.json"), refresh_cache=True)
+```
+
+The connection pool, keep-alive and timeouts of the default transports are configured with
+`ConnectionSettings`.
+With `http2` enabled, `HttpxTransport` multiplexes the requests over a single connection.
+This needs the optional `httpx[http2]` package.
+
+`AsyncOpenAPI` sends requests with an `AsyncTransport`.
+`AiohttpTransport` is used if `aiohttp` is installed, otherwise `ThreadedAsyncTransport` runs the
+synchronous transport in worker threads.
+"""
+
+import asyncio
+import base64
+import json
+import random
+import ssl
+import threading
+import typing as t
+from collections import defaultdict, deque
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from urllib.parse import urlencode
+
+import requests
+from multidict import CIMultiDict, CIMultiDictProxy, MutableMultiMapping
+
+from pulp_glue.common.exceptions import OpenAPIConnectionError, OpenAPIError
+from pulp_glue.common.i18n import get_translation
+
+try:
+    import aiohttp
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+else:
+    AIOHTTP_AVAILABLE = True
+
+try:
+    import httpx
+except ImportError:
+    HTTPX_AVAILABLE = False
+else:
+    HTTPX_AVAILABLE = True
+
+translation = get_translation(__package__)
+_ = translation.gettext
+
+UploadType = bytes | t.IO[bytes]
+
+IDEMPOTENT_METHODS = {"get", "head", "options", "put", "delete"}
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+CASSETTE_VERSION = 1
+# Size of the pieces a streamed response body is read in.
+STREAM_CHUNK_SIZE = 64 * 1024
+# Response headers that are not stored in cassettes.
+_UNRECORDED_HEADERS = {"set-cookie", "www-authenticate"}
+# Fields of token responses that are not stored in cassettes.
+_REDACTED_FIELDS = {"access_token", "refresh_token", "id_token"}
+_REDACTED = "REDACTED"
+
+
+@dataclass
+class Request:
+    operation_id: str
+    method: str
+    url: str
+    headers: MutableMultiMapping[str] | CIMultiDict[str] | t.MutableMapping[str, str]
+    params: dict[str, str] | None = None
+    data: dict[str, t.Any] | str | None = None
+    files: dict[str, tuple[str, UploadType, str]] | None = None
+    security: list[dict[str, list[str]]] | None = None
+    # Size of the body as sent, filled in by the transport.
+    content_length: int = 0
+
+
+@dataclass
+class Response:
+    status_code: int
+    headers: MutableMultiMapping[str] | CIMultiDictProxy[str] | t.MutableMapping[str, str]
+    body: bytes
+    # The body in chunks as it arrives, if it was not read into `body`.
+    chunks: t.Generator[bytes, None, None] | None = None
+
+
+@dataclass
+class ConnectionSettings:
+    """
+    Settings for the connections to the server.
+
+    Parameters:
+        pool_size: Maximum number of connections kept to the server.
+            Defaults to the choice of the transport.
+        keep_alive: Whether to reuse connections for subsequent requests.
+        connect_timeout: Seconds to wait for a connection to be established.
+        read_timeout: Seconds to wait for the server to send data.
+        http2: Whether to use HTTP/2 if the server supports it.
+    """
+
+    pool_size: int | None = None
+    keep_alive: bool = True
+    connect_timeout: float | None = None
+    read_timeout: float | None = None
+    http2: bool = False
+
+
+class Transport:
+    """
+    Base class for transports.
+
+    A transport translates a `Request` into a `Response`.
+    Failures to communicate with the server are reported as `OpenAPIError`.
+    """
+
+    def bind(self, default: "Transport") -> None:
+        """
+        Called by `OpenAPI` with the transport it would use otherwise.
+
+        Transports wrapping another one can use it unless they were given one explicitly.
+        """
+
+    def send(self, request: Request) -> Response:
+        raise NotImplementedError
+
+    def send_stream(self, request: Request) -> Response:
+        """
+        Send a request, but leave successful response bodies to be read in `chunks`.
+
+        Transports that cannot stream read the whole body like `send`.
+        """
+        return self.send(request)
+
+    def close(self) -> None:
+        pass
+
+
+class RequestsTransport(Transport):
+    """
+    Transport sending requests with a `requests.Session`.
+
+    `requests.Session` is not thread safe, so every thread gets its own copy of the session.
+    The copies share the connection pool of the original one.
+    """
+
+    def __init__(
+        self, session: requests.Session, settings: ConnectionSettings | None = None
+    ) -> None:
+        self.settings = settings or ConnectionSettings()
+        if self.settings.pool_size is not None:
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=self.settings.pool_size, pool_maxsize=self.settings.pool_size
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        if not self.settings.keep_alive:
+            session.headers["Connection"] = "close"
+        self._template = session
+        self._sessions = [session]
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._local.session = session
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        The session of the current thread.
+        """
+        session: requests.Session | None = getattr(self._local, "session", None)
+        if session is None:
+            template = self._template
+            session = requests.Session()
+            session.headers.update(template.headers)
+            session.auth = template.auth
+            session.proxies = dict(template.proxies)
+            session.verify = template.verify
+            session.cert = template.cert
+            session.max_redirects = template.max_redirects
+            session.trust_env = template.trust_env
+            for prefix, adapter in template.adapters.items():
+                session.mount(prefix, adapter)
+            with self._lock:
+                self._sessions.append(session)
+            self._local.session = session
+        return session
+
+    def send(self, request: Request) -> Response:
+        r = self._request(request, stream=False)
+        return Response(status_code=r.status_code, headers=r.headers, body=r.content)
+
+    def send_stream(self, request: Request) -> Response:
+        r = self._request(request, stream=True)
+        if r.status_code != 200:
+            # Errors are small and reported as a whole.
+            return Response(status_code=r.status_code, headers=r.headers, body=r.content)
+        return Response(
+            status_code=r.status_code, headers=r.headers, body=b"", chunks=self._iter_body(r)
+        )
+
+    def _iter_body(self, r: requests.Response) -> t.Generator[bytes, None, None]:
+        try:
+            yield from r.iter_content(STREAM_CHUNK_SIZE)
+        except requests.RequestException as e:
+            raise OpenAPIConnectionError(str(e))
+        finally:
+            r.close()
+
+    def _request(self, request: Request, stream: bool) -> requests.Response:
+        try:
+            r = self.session.request(
+                request.method,
+                request.url,
+                params=request.params,
+                headers=request.headers,
+                data=request.data,
+                files=request.files,
+                timeout=(self.settings.connect_timeout, self.settings.read_timeout),
+                stream=stream,
+            )
+        except requests.TooManyRedirects as e:
+            assert e.response is not None
+            raise OpenAPIError(
+                _(
+                    "Received redirect to '{new_url} from {old_url}'."
+                    " Please check your configuration."
+                ).format(
+                    new_url=e.response.headers["location"],
+                    old_url=request.url,
+                )
+            )
+        except requests.RequestException as e:
+            raise OpenAPIConnectionError(str(e))
+
+        request.content_length = int(r.request.headers.get("Content-Length", 0))
+        return r
+
+    def close(self) -> None:
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+
+
+class HttpxTransport(Transport):
+    """
+    Transport sending requests with a pooled `httpx.Client`, optionally over HTTP/2.
+
+    Parameters:
+        ssl_context: TLS settings including client certificates, or `False` to skip verifying the
+            server certificate.
+        settings: Connection pool and timeout settings.
+    """
+
+    def __init__(
+        self,
+        ssl_context: ssl.SSLContext | bool = True,
+        settings: ConnectionSettings | None = None,
+    ) -> None:
+        if not HTTPX_AVAILABLE:
+            raise OpenAPIError(_("The httpx transport requires the 'httpx' package."))
+        self.settings = settings or ConnectionSettings()
+        try:
+            self.client = httpx.Client(
+                http2=self.settings.http2,
+                verify=ssl_context,
+                headers={} if self.settings.keep_alive else {"Connection": "close"},
+                limits=httpx.Limits(
+                    max_connections=self.settings.pool_size,
+                    max_keepalive_connections=self.settings.pool_size
+                    if self.settings.keep_alive
+                    else 0,
+                ),
+                timeout=httpx.Timeout(
+                    None, connect=self.settings.connect_timeout, read=self.settings.read_timeout
+                ),
+                # Don't redirect, because carrying auth accross redirects is unsafe.
+                follow_redirects=False,
+                trust_env=True,
+            )
+        except ImportError:
+            raise OpenAPIError(_("HTTP/2 support requires the 'httpx[http2]' package."))
+
+    def send(self, request: Request) -> Response:
+        r = self._request(request, stream=False)
+        return Response(status_code=r.status_code, headers=r.headers, body=r.content)
+
+    def send_stream(self, request: Request) -> Response:
+        r = self._request(request, stream=True)
+        if r.status_code != 200:
+            # Errors are small and reported as a whole.
+            try:
+                return Response(status_code=r.status_code, headers=r.headers, body=r.read())
+            except httpx.TransportError as e:
+                raise OpenAPIConnectionError(str(e))
+            finally:
+                r.close()
+        return Response(
+            status_code=r.status_code, headers=r.headers, body=b"", chunks=self._iter_body(r)
+        )
+
+    def _iter_body(self, r: "httpx.Response") -> t.Generator[bytes, None, None]:
+        try:
+            yield from r.iter_bytes(STREAM_CHUNK_SIZE)
+        except httpx.TransportError as e:
+            raise OpenAPIConnectionError(str(e))
+        finally:
+            r.close()
+
+    def _request(self, request: Request, stream: bool) -> "httpx.Response":
+        data: t.Any = request.data
+        content: str | None = None
+        if isinstance(data, str):
+            content, data = data, None
+        try:
+            r = self.client.send(
+                self.client.build_request(
+                    request.method,
+                    request.url,
+                    params=request.params,
+                    headers=dict(request.headers),
+                    content=content,
+                    data=data,
+                    files=request.files,
+                ),
+                stream=stream,
+            )
+        except httpx.TransportError as e:
+            raise OpenAPIConnectionError(str(e))
+        if r.is_redirect:
+            r.close()
+            raise OpenAPIError(
+                _(
+                    "Received redirect to '{new_url} from {old_url}'."
+                    " Please check your configuration."
+                ).format(new_url=r.headers["location"], old_url=request.url)
+            )
+        request.content_length = int(r.request.headers.get("Content-Length", 0))
+        return r
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class AsyncTransport:
+    """
+    Base class for transports used by `AsyncOpenAPI`.
+
+    The contract is the same as for `Transport`, but sending is a coroutine.
+    """
+
+    async def send(self, request: Request) -> Response:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class ThreadedAsyncTransport(AsyncTransport):
+    """
+    Async transport running a synchronous transport in worker threads.
+
+    Parameters:
+        transport: The transport to send the requests with.
+    """
+
+    def __init__(self, transport: Transport) -> None:
+        self.transport = transport
+
+    async def send(self, request: Request) -> Response:
+        return await asyncio.to_thread(self.transport.send, request)
+
+
+class AiohttpTransport(AsyncTransport):
+    """
+    Async transport sending requests with a pooled `aiohttp.ClientSession`.
+
+    The session is created on first use, so it is bound to the running event loop.
+
+    Parameters:
+        ssl_context: TLS settings, or `False` to skip verifying the server certificate.
+        settings: Connection pool and timeout settings. The pool defaults to 100 connections.
+    """
+
+    def __init__(
+        self,
+        ssl_context: ssl.SSLContext | bool = True,
+        settings: ConnectionSettings | None = None,
+    ) -> None:
+        if not AIOHTTP_AVAILABLE:
+            raise OpenAPIError(_("The async transport requires the 'aiohttp' package."))
+        self.ssl_context = ssl_context
+        self.settings = settings or ConnectionSettings()
+        self._session: aiohttp.ClientSession | None = None
+
+    def _body(self, request: Request) -> t.Any:
+        if not request.files:
+            return request.data
+        form = aiohttp.FormData()
+        for key, value in (request.data or {}).items():  # type: ignore[union-attr]
+            form.add_field(key, str(value))
+        for key, (name, upload, content_type) in request.files.items():
+            form.add_field(key, upload, filename=name, content_type=content_type)
+        return form
+
+    async def send(self, request: Request) -> Response:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    ssl=self.ssl_context,
+                    limit=self.settings.pool_size or 100,
+                    force_close=not self.settings.keep_alive,
+                ),
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=self.settings.connect_timeout,
+                    sock_read=self.settings.read_timeout,
+                ),
+                trust_env=True,
+            )
+        try:
+            async with self._session.request(
+                request.method,
+                request.url,
+                params=request.params,
+                headers=dict(request.headers),
+                data=self._body(request),
+                # Don't redirect, because carrying auth accross redirects is unsafe.
+                allow_redirects=False,
+            ) as r:
+                body = await r.read()
+        except aiohttp.ClientError as e:
+            raise OpenAPIConnectionError(str(e))
+        if 300 <= r.status < 400 and "location" in r.headers:
+            raise OpenAPIError(
+                _(
+                    "Received redirect to '{new_url} from {old_url}'."
+                    " Please check your configuration."
+                ).format(new_url=r.headers["location"], old_url=request.url)
+            )
+        request.content_length = int(r.request_info.headers.get("Content-Length", 0))
+        return Response(status_code=r.status, headers=r.headers.copy(), body=body)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Policy to retry idempotent requests on transient failures.
+
+    Only requests with an idempotent method and without streamed uploads are retried.
+    Delays follow the decorrelated jitter scheme unless the server asks for a specific delay
+    with a `Retry-After` header.
+
+    Parameters:
+        retries: Maximum number of retries per call.
+        deadline: Seconds after the start of a call beyond which no retry is attempted.
+        backoff: Minimal delay between attempts in seconds.
+        max_backoff: Maximal delay between attempts in seconds.
+        statuses: Response status codes considered transient.
+    """
+
+    retries: int = 3
+    deadline: float = 300.0
+    backoff: float = 0.5
+    max_backoff: float = 30.0
+    statuses: frozenset[int] = RETRY_STATUSES
+
+    def may_retry(self, request: Request) -> bool:
+        return request.method.lower() in IDEMPOTENT_METHODS and all(
+            isinstance(upload, bytes) for _name, upload, _type in (request.files or {}).values()
+        )
+
+    def delay(self, response: Response | None, previous: float) -> float:
+        """
+        Parameters:
+            response: The transient response or `None` if the connection failed.
+            previous: The delay before the previous attempt; `0` on the first retry.
+
+        Returns:
+            Seconds to wait before the next attempt.
+        """
+        if response is not None:
+            retry_after = _retry_after(response)
+            if retry_after is not None:
+                return retry_after
+        return min(self.max_backoff, random.uniform(self.backoff, max(previous, self.backoff) * 3))
+
+
+def _retry_after(response: Response) -> float | None:
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max((date - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def _request_key(request: Request) -> str:
+    # Requests are matched on operation and parameters, never on headers.
+    params = urlencode(sorted((request.params or {}).items()), doseq=True)
+    data: t.Any = request.data
+    if isinstance(data, str):
+        with suppress(ValueError):
+            data = json.loads(data)
+    files = sorted(request.files or {})
+    return json.dumps(
+        [request.operation_id, request.method.lower(), request.url, params, data, files],
+        sort_keys=True,
+        default=str,
+    )
+
+
+def _encode_body(body: bytes) -> dict[str, str]:
+    try:
+        return {"text": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(body).decode("ascii")}
+
+
+def _decode_body(body: dict[str, str]) -> bytes:
+    if "base64" in body:
+        return base64.b64decode(body["base64"])
+    return body["text"].encode("utf-8")
+
+
+def _is_token_request(request: Request) -> bool:
+    # Requests outside the api spec are the download of the spec and the OAuth2 token exchange.
+    return request.operation_id == "" and request.method.lower() == "post"
+
+
+def _redact_body(body: bytes) -> bytes:
+    try:
+        result = json.loads(body)
+    except ValueError:
+        # Nothing of a body that cannot be inspected is kept.
+        return b""
+    if isinstance(result, dict):
+        result = {
+            key: _REDACTED if key in _REDACTED_FIELDS else value for key, value in result.items()
+        }
+    return json.dumps(result).encode()
+
+
+class RecordingTransport(Transport):
+    """
+    Transport capturing all request/response pairs to a cassette file.
+
+    Request headers are never recorded to avoid leaking credentials.
+    Tokens in the responses to OAuth2 token requests are replaced by a placeholder, so replaying
+    a session still works without the tokens being written to disk.
+    The cassette is written when the transport is closed.
+
+    Parameters:
+        path: Location of the cassette file.
+        transport: Transport to actually send the requests. Defaults to the one of `OpenAPI`.
+    """
+
+    def __init__(self, path: str | Path, transport: Transport | None = None) -> None:
+        self.path = Path(path)
+        self.transport = transport
+        self._lock = threading.Lock()
+        self._interactions: list[dict[str, t.Any]] = []
+
+    def bind(self, default: Transport) -> None:
+        if self.transport is None:
+            self.transport = default
+
+    def send(self, request: Request) -> Response:
+        assert self.transport is not None
+        response = self.transport.send(request)
+        interaction = {
+            "key": _request_key(request),
+            "request": {
+                "operation_id": request.operation_id,
+                "method": request.method,
+                "url": request.url,
+                "params": request.params,
+            },
+            "response": {
+                "status_code": response.status_code,
+                "headers": {
+                    key: value
+                    for key, value in response.headers.items()
+                    if key.lower() not in _UNRECORDED_HEADERS
+                },
+                "body": _encode_body(
+                    _redact_body(response.body) if _is_token_request(request) else response.body
+                ),
+            },
+        }
+        with self._lock:
+            self._interactions.append(interaction)
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            cassette = {"version": CASSETTE_VERSION, "interactions": self._interactions}
+            self.path.write_text(json.dumps(cassette, indent=2), encoding="utf-8")
+        if self.transport is not None:
+            self.transport.close()
+
+
+class ReplayTransport(Transport):
+    """
+    Transport serving responses from a cassette file without network access.
+
+    Requests are matched on operation id, method, URL, query parameters and body.
+    Repeated identical requests (like polling a task) are answered in the recorded order,
+    repeating the last recorded response once they are exhausted.
+
+    Parameters:
+        path: Location of the cassette file written by a `RecordingTransport`.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        cassette = json.loads(Path(path).read_text(encoding="utf-8"))
+        if cassette.get("version") != CASSETTE_VERSION:
+            raise OpenAPIError(_("Unsupported cassette version in {path}.").format(path=path))
+        self._lock = threading.Lock()
+        self._responses: defaultdict[str, deque[dict[str, t.Any]]] = defaultdict(deque)
+        for interaction in cassette["interactions"]:
+            self._responses[interaction["key"]].append(interaction["response"])
+
+    def send(self, request: Request) -> Response:
+        with self._lock:
+            responses = self._responses.get(_request_key(request))
+            if not responses:
+                raise OpenAPIError(
+                    _("No recorded response for {method} {url}.").format(
+                        method=request.method.upper(), url=request.url
+                    )
+                )
+            recorded = responses.popleft() if len(responses) > 1 else responses[0]
+        body = _decode_body(recorded["body"])
+        request.content_length = len(request.data) if isinstance(request.data, str) else 0
+        return Response(
+            status_code=recorded["status_code"],
+            headers=CIMultiDict(recorded["headers"]),
+            body=body,
+        )
@@ -1,6 +1,7 @@
 import typing as t
 
 from pulp_glue.common.context import (
+    MODIFY_BATCH_SIZE,
     EntityDefinition,
     PluginRequirement,
     PulpContentContext,
@@ -145,19 +146,17 @@ class PulpContainerRepositoryContext(PulpContainerBaseRepositoryContext):
         add_content: list[str] | None = None,
         remove_content: list[str] | None = None,
         base_version: str | PulpRepositoryVersionContext | None = None,
+        batch_size: int | None = MODIFY_BATCH_SIZE,
     ) -> t.Any:
-        if remove_content:
-            self.call(
-                "remove",
-                parameters={self.HREF: self.pulp_href},
-                body={"content_units": remove_content},
-            )
-        if add_content:
-            self.call(
-                "add",
-                parameters={self.HREF: self.pulp_href},
-                body={"content_units": add_content},
-            )
+        for operation, content_units in (("remove", remove_content), ("add", add_content)):
+            if content_units:
+                step = batch_size or len(content_units)
+                for start in range(0, len(content_units), step):
+                    self.call(
+                        operation,
+                        parameters={self.HREF: self.pulp_href},
+                        body={"content_units": content_units[start : start + step]},
+                    )
 
     def copy_tag(self, source_href: str, tags: list[str] | None) -> t.Any:
         body = {"source_repository_version": source_href, "names": tags}
@@ -15,6 +15,7 @@ from pulp_glue.common.context import (
 )
 from pulp_glue.common.exceptions import PulpException
 from pulp_glue.common.i18n import get_translation
+from pulp_glue.common.tracing import span
 
 translation = get_translation(__package__)
 _ = translation.gettext
@@ -38,6 +39,7 @@ class PulpArtifactContext(PulpEntityContext):
     MODEL = "artifact"
     HREF_TEMPLATE = "artifacts/{pulp_id}/"
     ID_PREFIX = "artifacts"
+    IMMUTABLE = True
 
     def upload(
         self,
@@ -375,15 +377,16 @@ class PulpUploadContext(PulpEntityContext):
         upload_href = self.create(body={"size": size})["pulp_href"]
         try:
             self.pulp_href = upload_href
-            while start < size:
-                chunk = file.read(chunk_size)
-                self.upload_chunk(
-                    chunk=chunk,
-                    size=size,
-                    start=start,
-                )
-                start += chunk_size
-                self.pulp_ctx.echo(".", nl=False, err=True)
+            with span("upload_file", size=size, chunk_size=chunk_size):
+                while start < size:
+                    chunk = file.read(chunk_size)
+                    self.upload_chunk(
+                        chunk=chunk,
+                        size=size,
+                        start=start,
+                    )
+                    start += chunk_size
+                    self.pulp_ctx.echo(".", nl=False, err=True)
         except Exception as e:
             self.delete(upload_href)
             raise e
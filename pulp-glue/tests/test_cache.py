@@ -0,0 +1,150 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from pulp_glue.common.cache import ResponseCache, cache_identity
+from pulp_glue.common.context import PulpContext, immutable_request
+from pulp_glue.common.transport import Request, Response
+from pulp_glue.core.context import PulpArtifactContext  # noqa: F401
+from pulp_glue.file.context import PulpFileContentContext  # noqa: F401
+
+pytestmark = pytest.mark.glue
+
+BASE_URL = "https://pulp.example.com/pulp/api/v3/"
+
+
+def _request(operation_id: str, path: str, method: str = "get", **params: str) -> Request:
+    return Request(operation_id, method, BASE_URL + path, {}, params=params or None)
+
+
+def _response(data: object) -> Response:
+    return Response(200, {"Content-Type": "application/json"}, json.dumps(data).encode())
+
+
+def test_immutable_request() -> None:
+    assert immutable_request(_request("artifacts_read", "artifacts/1/"))
+    assert immutable_request(_request("content_file_files_read", "content/file/files/1/"))
+    assert not immutable_request(_request("content_file_files_list", "content/file/files/"))
+    assert immutable_request(
+        _request("content_file_files_list", "content/file/files/", repository_version="/v/1/")
+    )
+    assert not immutable_request(_request("repositories_file_file_read", "repositories/1/"))
+    # Labels can change.
+    assert not immutable_request(
+        _request(
+            "content_file_files_list",
+            "content/file/files/",
+            repository_version="/v/1/",
+            pulp_label_select="key=value",
+        )
+    )
+
+
+def test_cache_hit_and_discard(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path / "cache.sqlite3", 1000, immutable_request)
+    request = _request("artifacts_read", "artifacts/1/")
+    assert cache.get(request) is None
+    cache.put(request, _response({"sha256": "0" * 64}))
+    response = cache.get(request)
+    assert response is not None
+    assert response.headers["content-type"] == "application/json"
+    assert json.loads(response.body) == {"sha256": "0" * 64}
+    # Projections are cached separately.
+    assert cache.get(_request("artifacts_read", "artifacts/1/", fields="sha256")) is None
+    # The cache is shared with other processes.
+    assert ResponseCache(cache.path, 1000, immutable_request).get(request) is not None
+
+    cache.put(_request("artifacts_delete", "artifacts/1/", method="delete"), Response(204, {}, b""))
+    assert cache.get(request) is None
+    cache.close()
+
+
+def test_cache_discards_affected_responses(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path / "cache.sqlite3", 1000, immutable_request)
+    content = _request("content_file_files_read", "content/file/files/1/")
+    version_hrefs = [
+        f"/pulp/api/v3/repositories/file/file/1/versions/{number}/" for number in [1, 2]
+    ]
+    version_contents = [
+        _request("content_file_files_list", "content/file/files/", repository_version=href)
+        for href in version_hrefs
+    ]
+    for request in [content, *version_contents]:
+        cache.put(request, _response({}))
+    # Setting a label changes the content unit and the lists showing it.
+    cache.put(
+        _request("content_file_files_set_label", "content/file/files/1/set_label/", method="post"),
+        _response({}),
+    )
+    assert cache.get(content) is None
+    assert cache.get(version_contents[0]) is None
+    assert cache.get(version_contents[1]) is None
+    # The content of a deleted repository version is gone.
+    for request in [content, *version_contents]:
+        cache.put(request, _response({}))
+    cache.put(
+        _request(
+            "repositories_file_file_versions_delete",
+            "repositories/file/file/1/versions/1/",
+            method="delete",
+        ),
+        Response(202, {}, b""),
+    )
+    assert cache.get(version_contents[0]) is None
+    assert cache.get(version_contents[1]) is not None
+    assert cache.get(content) is not None
+    cache.close()
+
+
+def test_cache_per_identity(tmp_path: Path) -> None:
+    admin_cache = ResponseCache(
+        tmp_path / "cache.sqlite3", 1000, immutable_request, cache_identity(username="admin")
+    )
+    request = _request("artifacts_read", "artifacts/1/")
+    admin_cache.put(request, _response({"sha256": "0" * 64}))
+    assert admin_cache.get(request) is not None
+    for credentials in [{"username": "user"}, {"client_id": "admin"}, {}]:
+        cache = ResponseCache(
+            admin_cache.path, 1000, immutable_request, cache_identity(**credentials)
+        )
+        assert cache.get(request) is None
+        cache.close()
+    # Deleting the resource discards it for everyone.
+    cache = ResponseCache(admin_cache.path, 1000, immutable_request)
+    cache.put(_request("artifacts_delete", "artifacts/1/", method="delete"), Response(204, {}, b""))
+    assert admin_cache.get(request) is None
+    admin_cache.close()
+    cache.close()
+
+
+def test_cache_skips_mutable_resources(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path / "cache.sqlite3", 1000, immutable_request)
+    request = _request("repositories_file_file_read", "repositories/file/file/1/")
+    cache.put(request, _response({"name": "repo"}))
+    assert cache.get(request) is None
+    assert not cache.path.exists()
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path / "cache.sqlite3", 250, immutable_request)
+    requests = [_request("artifacts_read", f"artifacts/{index}/") for index in range(3)]
+    body = {"data": "x" * 90}
+    cache.put(requests[0], _response(body))
+    cache.put(requests[1], _response(body))
+    assert cache.get(requests[0]) is not None
+    cache.put(requests[2], _response(body))
+    assert cache.get(requests[0]) is not None
+    assert cache.get(requests[1]) is None
+    assert cache.get(requests[2]) is not None
+    # Responses larger than the whole cache are not stored.
+    cache.put(requests[1], _response({"data": "x" * 300}))
+    assert cache.get(requests[1]) is None
+
+
+def test_cache_size_from_config(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    pulp_ctx = PulpContext.from_config({"base_url": "nowhere", "response_cache_size": "10MB"})
+    assert pulp_ctx._api_kwargs["response_cache"].max_size == 10 * 10**6
+    with pytest.raises(ValueError):
+        PulpContext.from_config({"base_url": "nowhere", "response_cache_size": "lots"})
@@ -1,3 +1,4 @@
+import json
 import random
 import string
 import typing as t
@@ -5,6 +6,9 @@ import typing as t
 import pytest
 
 from pulp_glue.common.context import PulpContext
+from pulp_glue.common.exceptions import OpenAPIConnectionError
+from pulp_glue.common.jsonstream import StreamedPage
+from pulp_glue.common.transport import RetryPolicy
 from pulp_glue.file.context import PulpFileRepositoryContext
 
 pytestmark = pytest.mark.glue
@@ -39,3 +43,41 @@ def test_entity_list_iterator(pulp_ctx: PulpContext, file_repository: dict[str,
         == 1
     )
     assert stats["count"] == 1
+
+
+def test_entity_list_iterator_resumes_broken_page(
+    mock_pulp_ctx: PulpContext, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    entities = [{"pulp_href": f"/pulp/api/v3/repositories/file/file/{i}/"} for i in range(5)]
+    calls: list[dict[str, t.Any]] = []
+
+    def _body(page: dict[str, t.Any], broken: bool) -> t.Iterator[bytes]:
+        body = json.dumps(page).encode()
+        if broken:
+            # The connection drops after the first entity.
+            yield body[: body.index(b"}") + 2]
+            raise OpenAPIConnectionError("Connection reset by peer")
+        yield body
+
+    def _call(operation_id: str, parameters: dict[str, t.Any], **kwargs: t.Any) -> t.Any:
+        calls.append(parameters.copy())
+        offset, limit = parameters["offset"], parameters["limit"]
+        page = {
+            "count": len(entities),
+            "next": "next" if offset + limit < len(entities) else None,
+            "previous": None,
+            "results": entities[offset : offset + limit],
+        }
+        return StreamedPage(_body(page, broken=len(calls) == 1))
+
+    entity_ctx = PulpFileRepositoryContext(mock_pulp_ctx)
+    monkeypatch.setattr(entity_ctx, "call", _call)
+    monkeypatch.setattr("pulp_glue.common.context.time.sleep", lambda delay: None)
+
+    with pytest.raises(OpenAPIConnectionError):
+        list(entity_ctx.list_iterator(batch_size=3))
+
+    calls.clear()
+    monkeypatch.setattr(mock_pulp_ctx.api, "_retry_policy", RetryPolicy())
+    assert list(entity_ctx.list_iterator(batch_size=3)) == entities
+    assert [call["offset"] for call in calls] == [0, 1, 4]
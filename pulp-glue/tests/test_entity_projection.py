@@ -0,0 +1,108 @@
+import typing as t
+
+import pytest
+
+from pulp_glue.common.context import PulpContext
+from pulp_glue.file.context import PulpFileContentContext, PulpFileRepositoryContext
+
+pytestmark = pytest.mark.glue
+
+REPO_HREF = "/pulp/api/v3/repositories/file/file/01234567-0123-0123-0123-0123456789ab/"
+REPO = {
+    "pulp_href": REPO_HREF,
+    "name": "test",
+    "versions_href": f"{REPO_HREF}versions/",
+    "latest_version_href": f"{REPO_HREF}versions/1/",
+}
+
+
+@pytest.fixture
+def calls(mock_pulp_ctx: PulpContext, monkeypatch: pytest.MonkeyPatch) -> list[dict[str, t.Any]]:
+    result: list[dict[str, t.Any]] = []
+
+    def _param_spec(operation_id: str, param_type: str, required: bool = False) -> t.Any:
+        if operation_id in ("repositories_file_file_list", "repositories_file_file_read"):
+            return {"fields": {}}
+        raise KeyError(operation_id)
+
+    def _call(operation_id: str, parameters: dict[str, t.Any], **kwargs: t.Any) -> t.Any:
+        result.append({"operation_id": operation_id, "parameters": parameters})
+        entity = REPO
+        if "fields" in parameters:
+            entity = {key: value for key, value in REPO.items() if key in parameters["fields"]}
+        if operation_id.endswith("_list"):
+            return {"count": 1, "results": [entity]}
+        return entity
+
+    monkeypatch.setattr(mock_pulp_ctx.api, "param_spec", _param_spec)
+    monkeypatch.setattr(mock_pulp_ctx, "call", _call)
+    return result
+
+
+def test_projection_depends_on_api(mock_pulp_ctx: PulpContext, calls: t.Any) -> None:
+    assert mock_pulp_ctx.projection("repositories_file_file_list", ["name", "pulp_href"]) == {
+        "fields": ["name", "pulp_href"]
+    }
+    assert mock_pulp_ctx.projection("content_file_files_list", ["pulp_href"]) == {}
+
+
+def test_pulp_href_lookup_is_the_entity_lookup(
+    mock_pulp_ctx: PulpContext, calls: list[dict[str, t.Any]]
+) -> None:
+    repository_ctx = PulpFileRepositoryContext(mock_pulp_ctx, entity={"name": "test"})
+    assert repository_ctx.pulp_href == REPO_HREF
+    assert repository_ctx.entity == REPO
+    assert len(calls) == 1
+    assert "fields" not in calls[0]["parameters"]
+    assert calls[0]["parameters"]["name"] == "test"
+
+    # An href is known without asking the server.
+    repository_ctx = PulpFileRepositoryContext(mock_pulp_ctx, pulp_href=REPO_HREF)
+    assert repository_ctx.pulp_href == REPO_HREF
+    assert len(calls) == 1
+
+
+def test_partial_entity_is_projected(
+    mock_pulp_ctx: PulpContext, calls: list[dict[str, t.Any]]
+) -> None:
+    repository_ctx = PulpFileRepositoryContext(mock_pulp_ctx, entity={"name": "test"})
+    assert repository_ctx.partial_entity(["latest_version_href"]) == {
+        "pulp_href": REPO_HREF,
+        "latest_version_href": REPO["latest_version_href"],
+    }
+    # The href found is reused.
+    assert repository_ctx.pulp_href == REPO_HREF
+    assert len(calls) == 1
+    assert calls[0]["parameters"]["fields"] == ["latest_version_href", "pulp_href"]
+
+    # The full entity is still fetched on demand.
+    assert repository_ctx.entity == REPO
+    assert len(calls) == 2
+    assert calls[1]["operation_id"] == "repositories_file_file_read"
+    assert "fields" not in calls[1]["parameters"]
+
+
+def test_partial_entity_is_reused(
+    mock_pulp_ctx: PulpContext, calls: list[dict[str, t.Any]]
+) -> None:
+    repository_ctx = PulpFileRepositoryContext(mock_pulp_ctx, pulp_href=REPO_HREF)
+    content_ctx = PulpFileContentContext(mock_pulp_ctx, repository_ctx=repository_ctx)
+    repository_ctx.get_version_context(-1)
+    content_ctx.find(relative_path="a")
+    assert [call["operation_id"] for call in calls] == [
+        "repositories_file_file_read",
+        "content_file_files_list",
+    ]
+    assert calls[0]["parameters"]["fields"] == ["latest_version_href", "pulp_href"]
+    assert calls[1]["parameters"]["repository_version"] == REPO["latest_version_href"]
+
+
+def test_projection_falls_back_to_full_entity(
+    mock_pulp_ctx: PulpContext, calls: list[dict[str, t.Any]]
+) -> None:
+    content_ctx = PulpFileContentContext(mock_pulp_ctx, entity={"relative_path": "a"})
+    content_ctx.partial_entity(["pulp_href"])
+    assert "fields" not in calls[0]["parameters"]
+    # The full entity found is kept.
+    content_ctx.entity
+    assert len(calls) == 1
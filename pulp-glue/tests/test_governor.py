@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+
+from pulp_glue.common.context import request_settings
+from pulp_glue.common.governor import Governor
+from pulp_glue.common.transport import Request
+
+pytestmark = pytest.mark.glue
+
+READ = Request("tasks_list", "get", "https://pulp.example.com/tasks/", {})
+WRITE = Request("tasks_delete", "delete", "https://pulp.example.com/tasks/1/", {})
+
+
+@pytest.fixture
+def sleeps(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    result: list[float] = []
+    monkeypatch.setattr("pulp_glue.common.governor.time.sleep", result.append)
+    return result
+
+
+def test_rate_limits_are_separate(sleeps: list[float]) -> None:
+    governor = Governor(read_rate=10, write_rate=1, adaptive=False)
+    for _ in range(10):
+        governor.acquire(READ)
+        governor.release(200, 0.01)
+    assert sleeps == []
+    governor.acquire(WRITE)
+    governor.release(204, 0.01)
+    assert sleeps == []
+    governor.acquire(WRITE)
+    governor.release(204, 0.01)
+    assert sleeps == [pytest.approx(1, abs=0.01)]
+
+
+def test_upload_rate(sleeps: list[float]) -> None:
+    governor = Governor(upload_rate=1000, adaptive=False)
+    upload = Request(
+        "uploads_update",
+        "put",
+        "https://pulp.example.com/uploads/1/",
+        {},
+        files={"file": ("file", b"x" * 3000, "application/octet-stream")},
+    )
+    governor.acquire(upload)
+    governor.release(200, 0.01)
+    assert sleeps == [pytest.approx(2, abs=0.01)]
+
+
+def test_max_in_flight() -> None:
+    governor = Governor(max_in_flight=2, adaptive=False)
+    peak = 0
+    lock = threading.Lock()
+
+    def _request() -> None:
+        nonlocal peak
+        governor.acquire(READ)
+        with lock:
+            peak = max(peak, governor.in_flight)
+        time.sleep(0.01)
+        governor.release(200, 0.01)
+
+    threads = [threading.Thread(target=_request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak == 2
+    assert governor.in_flight == 0
+
+
+def test_adaptive_backoff() -> None:
+    governor = Governor(max_in_flight=8)
+    for status_code in [503, 502, 429]:
+        governor.acquire(READ)
+        governor.release(status_code, 0.1)
+    assert governor.effective_max_in_flight == 1
+    governor.acquire(READ)
+    governor.release(200, governor.latency_threshold + 1)
+    assert governor.factor == governor.min_factor
+    for _ in range(30):
+        governor.acquire(READ)
+        governor.release(200, 0.1)
+    assert governor.factor == 1.0
+    assert governor.effective_max_in_flight == 8
+
+
+def test_governor_from_settings() -> None:
+    api_kwargs, paging = request_settings(
+        {"upload_rate": "10MB", "read_rate": None, "max_in_flight": 4, "retries": 0}
+    )
+    assert list(api_kwargs) == ["governor"]
+    assert api_kwargs["governor"].upload_rate == 10 * 10**6
+    assert api_kwargs["governor"].max_in_flight == 4
+    assert api_kwargs["governor"].read_rate is None
+    assert paging is None
+    assert request_settings({"read_rate": None, "http2": None}) == ({}, None)
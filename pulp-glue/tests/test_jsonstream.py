@@ -0,0 +1,80 @@
+import json
+import typing as t
+
+import pytest
+
+from pulp_glue.common.exceptions import OpenAPIError
+from pulp_glue.common.jsonstream import StreamedPage
+
+pytestmark = pytest.mark.glue
+
+PAGE: dict[str, t.Any] = {
+    "count": 1234,
+    "next": "/pulp/api/v3/content/?offset=3",
+    "previous": None,
+    "results": [
+        {"pulp_href": "/pulp/api/v3/content/1/", "changelog": ["ä" * 100, 12.5]},
+        {"pulp_href": "/pulp/api/v3/content/2/", "nested": {"results": [1, 2]}},
+        {"pulp_href": "/pulp/api/v3/content/3/", "size": 100000},
+    ],
+}
+
+
+def _chunks(data: t.Any, size: int) -> t.Iterator[bytes]:
+    body = json.dumps(data, ensure_ascii=False, indent=1).encode()
+    for start in range(0, len(body), size):
+        yield body[start : start + size]
+
+
+@pytest.mark.parametrize("size", [1, 7, 4096])
+def test_streamed_page(size: int) -> None:
+    page = StreamedPage(_chunks(PAGE, size))
+    assert page["count"] == 1234
+    assert page["next"] == PAGE["next"]
+    assert list(page["results"]) == PAGE["results"]
+    assert page["previous"] is None
+    assert page.get("missing") is None
+
+
+def test_streamed_page_results_first() -> None:
+    data = {"results": PAGE["results"], "count": 3, "next": None}
+    page = StreamedPage(_chunks(data, 5))
+    # Looking up the count first keeps the results around.
+    assert page["count"] == 3
+    assert list(page["results"]) == PAGE["results"]
+    assert page["next"] is None
+
+    page = StreamedPage(_chunks(data, 5))
+    assert list(page["results"]) == PAGE["results"]
+    assert page["count"] == 3
+
+
+def test_streamed_page_empty_results() -> None:
+    page = StreamedPage(_chunks({"count": 0, "next": None, "results": []}, 3))
+    assert list(page["results"]) == []
+    assert page["count"] == 0
+
+
+def test_streamed_page_close() -> None:
+    closed = []
+
+    def _body() -> t.Iterator[bytes]:
+        try:
+            yield from _chunks(PAGE, 10)
+        finally:
+            closed.append(True)
+
+    page = StreamedPage(_body())
+    results = page["results"]
+    assert next(results) == PAGE["results"][0]
+    assert not closed
+    results.close()
+    assert closed
+
+
+def test_streamed_page_malformed() -> None:
+    page = StreamedPage([b'{"count": 1, "results": [{"a": 1}, {"b":'])
+    results = page["results"]
+    assert next(results) == {"a": 1}
+    with pytest.raises(OpenAPIError, match="Malformed list response"):
+        next(results)
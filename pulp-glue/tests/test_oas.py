@@ -4,6 +4,7 @@ import pydantic
 import pytest
 
 from pulp_glue.common import oas
+from pulp_glue.common.exceptions import OpenAPIError
 
 pytestmark = pytest.mark.glue
 
@@ -187,3 +188,46 @@ class TestPydanticOpenAPISpec:
         )
         assert isinstance(parameter, oas.SchemaParameter)
         assert parameter.explode == explode
+
+
+class TestLazyOpenAPISpec:
+    def test_matches_validated_spec(self) -> None:
+        spec = oas.OpenAPISpec.model_validate(TEST_SCHEMA)
+        lazy_spec = oas.LazyOpenAPISpec(TEST_SCHEMA)
+        assert lazy_spec.operations == spec.operations
+        assert lazy_spec.paths["test/"] == spec.paths["test/"]
+        assert list(lazy_spec.components.security_schemes) == list(SECURITY_SCHEMES)
+        assert isinstance(lazy_spec.components.security_schemes["A"], oas.SecuritySchemeHttp)
+        assert lazy_spec.components.parameters["query1"] == spec.components.parameters["query1"]
+
+    def test_validates_on_access(self) -> None:
+        lazy_spec = oas.LazyOpenAPISpec(
+            {
+                "openapi": "3.1.0",
+                "paths": {
+                    "valid/": {"get": {"operationId": "valid"}},
+                    "invalid/": {"get": {"operationId": "invalid", "unknown": True}},
+                },
+            }
+        )
+        assert set(lazy_spec.operations) == {"valid", "invalid"}
+        assert lazy_spec.paths["valid/"] is lazy_spec.paths["valid/"]
+        with pytest.raises(OpenAPIError, match="invalid at 'invalid/'"):
+            lazy_spec.paths["invalid/"]
+
+    def test_rejects_other_documents(self) -> None:
+        with pytest.raises(ValueError):
+            oas.LazyOpenAPISpec({"swagger": "2.0"})
+
+    def test_rejects_broken_operations(self) -> None:
+        with pytest.raises(ValueError, match="has no operationId"):
+            oas.LazyOpenAPISpec({"openapi": "3.1.0", "paths": {"valid/": {"get": {}}}})
+        with pytest.raises(ValueError, match="is not an object"):
+            oas.LazyOpenAPISpec({"openapi": "3.1.0", "paths": {"valid/": []}})
+
+
+def test_load_spec_shares_strings() -> None:
+    data = '{"a": {"type": "string"}, "b": {"type": "string"}, "c": ["string"]}'
+    spec = oas.load_spec(data)
+    assert spec["a"]["type"] is spec["b"]["type"]
+    assert spec["c"] == ["string"]
@@ -2,7 +2,9 @@ import asyncio
 import datetime
 import json
 import logging
+import time
 import typing as t
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 from multidict import CIMultiDict
@@ -588,3 +590,29 @@ class TestAuthenticate:
         request = _Request("", "GET", "http://example.org", CIMultiDict())
         assert asyncio.run(mock_openapi._authenticate_request(request, {"D": ["scope1"]})) is False
         assert request.headers.get("Authorization") == "Bearer DEADBEEF"
+
+    def test_oauth2_token_is_fetched_once_by_threads(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        mock_openapi: OpenAPI,
+        oauth2_cc_auth_provider: AuthProviderBase,
+    ) -> None:
+        token_requests: list[_Request] = []
+
+        def _send_request(request: _Request) -> _Response:
+            if request.url.endswith("oauth/token"):
+                token_requests.append(request)
+                time.sleep(0.05)
+            return mock_send_request(request)
+
+        monkeypatch.setattr(mock_openapi, "_send_request", _send_request)
+
+        def _authenticate(index: int) -> str | None:
+            request = _Request("", "GET", "http://example.org", CIMultiDict())
+            asyncio.run(mock_openapi._authenticate_request(request, {"D": ["scope1"]}))
+            return request.headers.get("Authorization")
+
+        with ThreadPoolExecutor(16) as executor:
+            headers = set(executor.map(_authenticate, range(64)))
+        assert headers == {"Bearer DEADBEEF"}
+        assert len(token_requests) == 1
@@ -0,0 +1,42 @@
+import pytest
+
+from pulp_glue.common.paging import AdaptivePaging
+
+pytestmark = pytest.mark.glue
+
+
+def test_paging_grows_and_shrinks_toward_target() -> None:
+    paging = AdaptivePaging(target_latency=1.0, min_size=10, max_size=1000, initial_size=100)
+    assert paging.page_size("tags_list") == 100
+    # Fast pages grow by at most `max_step`.
+    assert paging.record("tags_list", 100, 100, 0.1) == 200
+    assert paging.record("tags_list", 200, 200, 0.8) == 250
+    # Slow pages shrink.
+    assert paging.record("packages_list", 100, 100, 4.0) == 50
+    assert paging.record("packages_list", 50, 50, 100.0) == 25
+    # The sizes are remembered per operation.
+    assert paging.page_size("tags_list") == 250
+    assert paging.page_size("packages_list") == 25
+
+
+def test_paging_bounds() -> None:
+    paging = AdaptivePaging(target_latency=1.0, min_size=20, max_size=300, initial_size=500)
+    assert paging.page_size("list") == 300
+    assert paging.record("list", 300, 300, 0.01) == 300
+    assert paging.record("list", 30, 30, 10.0) == 20
+
+
+def test_paging_short_pages() -> None:
+    paging = AdaptivePaging(target_latency=1.0)
+    # The last page being short and fast does not shrink the page size.
+    assert paging.record("list", 100, 3, 0.01) == 100
+    assert paging.page_size("list") == 100
+    assert paging.record("list", 100, 0, 5.0) == 100
+    # But a slow one does.
+    assert paging.record("list", 100, 80, 2.0) == 40
+
+
+def test_paging_max_page_bytes() -> None:
+    paging = AdaptivePaging(target_latency=1.0, max_page_bytes=1_000_000)
+    assert paging.record("list", 100, 100, 0.1, body_size=4_000_000) == 50
+    assert paging.record("list", 50, 50, 0.1, body_size=500_000) == 100
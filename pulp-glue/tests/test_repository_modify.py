@@ -0,0 +1,73 @@
+import typing as t
+
+import pytest
+
+from pulp_glue.common.context import PulpContext
+from pulp_glue.common.exceptions import PulpNoWait
+from pulp_glue.file.context import PulpFileRepositoryContext
+
+pytestmark = pytest.mark.glue
+
+REPO_HREF = "/pulp/api/v3/repositories/file/file/01234567-0123-0123-0123-0123456789ab/"
+
+
+@pytest.fixture
+def calls(mock_pulp_ctx: PulpContext, monkeypatch: pytest.MonkeyPatch) -> list[dict[str, t.Any]]:
+    result: list[dict[str, t.Any]] = []
+
+    def _call(operation_id: str, **kwargs: t.Any) -> t.Any:
+        if operation_id.endswith("_read"):
+            return {"pulp_href": REPO_HREF}
+        result.append({"operation_id": operation_id, **kwargs})
+        version = len(result)
+        return {
+            "pulp_href": "/pulp/api/v3/tasks/0/",
+            "state": "completed",
+            "created_resources": [f"{REPO_HREF}versions/{version}/"],
+        }
+
+    monkeypatch.setattr(mock_pulp_ctx, "call", _call)
+    return result
+
+
+def test_modify_small_change_is_a_single_call(
+    mock_pulp_ctx: PulpContext, calls: list[dict[str, t.Any]]
+) -> None:
+    repository_ctx = PulpFileRepositoryContext(mock_pulp_ctx, pulp_href=REPO_HREF)
+    repository_ctx.modify(add_content=["/a/", "/b/"], remove_content=["/c/"], batch_size=3)
+    assert len(calls) == 1
+    assert calls[0]["body"] == {
+        "add_content_units": ["/a/", "/b/"],
+        "remove_content_units": ["/c/"],
+    }
+
+
+def test_modify_batches_are_chained(
+    mock_pulp_ctx: PulpContext, calls: list[dict[str, t.Any]]
+) -> None:
+    repository_ctx = PulpFileRepositoryContext(mock_pulp_ctx, pulp_href=REPO_HREF)
+    repository_ctx.modify(
+        add_content=["/a/", "/b/", "/c/"],
+        remove_content=["/d/", "/e/"],
+        base_version=f"{REPO_HREF}versions/0/",
+        batch_size=2,
+    )
+    assert [call["body"] for call in calls] == [
+        {"remove_content_units": ["/d/", "/e/"], "base_version": f"{REPO_HREF}versions/0/"},
+        {"add_content_units": ["/a/", "/b/"], "base_version": f"{REPO_HREF}versions/1/"},
+        {"add_content_units": ["/c/"], "base_version": f"{REPO_HREF}versions/2/"},
+    ]
+
+
+def test_modify_batches_in_background(
+    mock_pulp_ctx: PulpContext, calls: list[dict[str, t.Any]]
+) -> None:
+    mock_pulp_ctx.background_tasks = True
+    repository_ctx = PulpFileRepositoryContext(mock_pulp_ctx, pulp_href=REPO_HREF)
+    with pytest.raises(PulpNoWait):
+        repository_ctx.modify(add_content=["/a/", "/b/", "/c/"], batch_size=2)
+    assert [call["body"] for call in calls] == [
+        {"add_content_units": ["/a/", "/b/"]},
+        {"add_content_units": ["/c/"]},
+    ]
+    assert all(call["non_blocking"] for call in calls)
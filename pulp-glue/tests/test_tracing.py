@@ -0,0 +1,113 @@
+import json
+import time
+import typing as t
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+from pulp_glue.common.tracing import (
+    HARTraceSink,
+    NDJSONTraceSink,
+    SpanTimings,
+    TraceRecord,
+    load_trace,
+    register_span_hook,
+    span,
+    summarize_trace,
+    trace_sink,
+    unregister_span_hook,
+)
+
+pytestmark = pytest.mark.glue
+
+
+def test_span_hooks_are_called() -> None:
+    seen: list[tuple[str, dict[str, t.Any]]] = []
+
+    @contextmanager
+    def _hook(name: str, attributes: dict[str, t.Any]) -> t.Iterator[None]:
+        seen.append((name, attributes))
+        yield
+
+    register_span_hook(_hook)
+    try:
+        with span("outer", operation_id="test"), span("inner"):
+            pass
+    finally:
+        unregister_span_hook(_hook)
+    with span("ignored"):
+        pass
+    assert seen == [("outer", {"operation_id": "test"}), ("inner", {})]
+
+
+def test_span_timings_track_own_time() -> None:
+    timings = SpanTimings()
+    register_span_hook(timings)
+    try:
+        with span("outer"):
+            for _ in range(2):
+                with span("inner"):
+                    time.sleep(0.01)
+    finally:
+        unregister_span_hook(timings)
+    stats = dict(timings.report())
+    assert stats["inner"].count == 2
+    assert stats["outer"].count == 1
+    assert stats["outer"].total >= stats["inner"].total >= 0.02
+    assert stats["outer"].own == pytest.approx(stats["outer"].total - stats["inner"].total)
+
+
+def _record(operation_id: str, duration: float, status: int = 200) -> TraceRecord:
+    return TraceRecord(
+        timestamp="2024-01-01T00:00:00+00:00",
+        operation_id=operation_id,
+        method="get",
+        url=f"https://pulp.example.com/{operation_id}/",
+        status=status,
+        request_size=10,
+        response_size=100,
+        correlation_id="cid",
+        retries=0,
+        duration=duration,
+        phases={"render": 0.1, "send": duration - 0.2, "parse": 0.1},
+    )
+
+
+@pytest.mark.parametrize(
+    "filename,sink_class", [("trace.ndjson", NDJSONTraceSink), ("trace.har", HARTraceSink)]
+)
+def test_trace_sinks_round_trip(filename: str, sink_class: type, tmp_path: Path) -> None:
+    records = [_record("tasks_list", 5.0), _record("tasks_read", 2.0, status=404)]
+    sink = trace_sink(tmp_path / filename)
+    assert isinstance(sink, sink_class)
+    for record in records:
+        sink.record(record)
+    sink.close()
+    if sink_class is HARTraceSink:
+        har = json.loads((tmp_path / filename).read_text())
+        assert har["log"]["version"] == "1.2"
+        assert har["log"]["entries"][1]["response"]["status"] == 404
+    assert load_trace(tmp_path / filename) == records
+
+
+def test_summarize_trace() -> None:
+    records = [
+        _record("tasks_list", 5.0),
+        _record("tasks_read", 2.0),
+        _record("tasks_read", 4.0, status=404),
+    ]
+    summary = summarize_trace(records, top=2)
+    assert summary["requests"] == 3
+    assert summary["total_ms"] == 11.0
+    assert summary["bytes_received"] == 300
+    assert [item["operation_id"] for item in summary["operations"]] == [
+        "tasks_read",
+        "tasks_list",
+    ]
+    tasks_read = summary["operations"][0]
+    assert tasks_read["count"] == 2
+    assert tasks_read["errors"] == 1
+    assert tasks_read["max_ms"] == 4.0
+    assert tasks_read["mean_ms"] == 3.0
+    assert [item["duration_ms"] for item in summary["slowest"]] == [5.0, 4.0]
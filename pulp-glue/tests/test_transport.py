@@ -0,0 +1,373 @@
+import asyncio
+import json
+import threading
+import typing as t
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+import requests
+
+from pulp_glue.common.authentication import GlueAuthProvider
+from pulp_glue.common.exceptions import OpenAPIConnectionError, OpenAPIError, PulpHTTPError
+from pulp_glue.common.openapi import AsyncOpenAPI, OpenAPI
+from pulp_glue.common.transport import (
+    AsyncTransport,
+    ConnectionSettings,
+    RecordingTransport,
+    ReplayTransport,
+    Request,
+    RequestsTransport,
+    Response,
+    RetryPolicy,
+    Transport,
+)
+
+pytestmark = pytest.mark.glue
+
+_OPERATION = {
+    "parameters": [
+        {"name": "task_href", "in": "path", "required": True, "schema": {"type": "string"}}
+    ],
+    "responses": {
+        "200": {"description": "", "content": {"application/json": {"schema": {}}}},
+    },
+}
+SPEC = json.dumps(
+    {
+        "openapi": "3.0.3",
+        "info": {"title": "test", "version": "0.0.0"},
+        "paths": {
+            "/tasks/{task_href}": {
+                "get": {"operationId": "tasks_read", **_OPERATION},
+                "post": {"operationId": "tasks_cancel", **_OPERATION},
+            }
+        },
+    }
+).encode()
+
+
+class FakeTransport(Transport):
+    def __init__(self) -> None:
+        self.requests: list[Request] = []
+
+    def send(self, request: Request) -> Response:
+        self.requests.append(request)
+        if request.operation_id == "":
+            return Response(200, {"content-type": "application/json"}, SPEC)
+        body = {"state": "running" if len(self.requests) < 3 else "completed"}
+        return Response(200, {"content-type": "application/json"}, json.dumps(body).encode())
+
+
+class FlakyTransport(Transport):
+    def __init__(self, *outcomes: Response | Exception) -> None:
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def send(self, request: Request) -> Response:
+        if request.operation_id == "":
+            return Response(200, {"content-type": "application/json"}, SPEC)
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else _OK
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+_OK = Response(200, {"content-type": "application/json"}, b'{"state": "completed"}')
+
+
+def _api(transport: Transport, retry_policy: RetryPolicy | None = None) -> OpenAPI:
+    return OpenAPI(
+        "https://pulp.example.com",
+        "/api.json",
+        refresh_cache=True,
+        transport=transport,
+        retry_policy=retry_policy,
+    )
+
+
+@pytest.fixture(autouse=True)
+def xdg_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+
+def _poll(api: OpenAPI) -> list[t.Any]:
+    return [api.call("tasks_read", parameters={"task_href": "1"})["state"] for _ in range(4)]
+
+
+def test_record_and_replay(tmp_path: Path) -> None:
+    cassette = tmp_path / "cassette.json"
+    fake = FakeTransport()
+    api = _api(RecordingTransport(cassette, transport=fake))
+    recorded = _poll(api)
+    api.close()
+    assert recorded == ["running", "completed", "completed", "completed"]
+    assert "Authorization" not in cassette.read_text()
+
+    api = _api(ReplayTransport(cassette))
+    assert _poll(api) == recorded
+    # The last response is repeated once the recording is exhausted.
+    assert api.call("tasks_read", parameters={"task_href": "1"})["state"] == "completed"
+    assert len(fake.requests) == 5
+
+
+def test_broken_cached_spec_is_downloaded_again(tmp_path: Path) -> None:
+    _api(FakeTransport()).close()
+    (cached,) = (tmp_path / "cache" / "squeezer").iterdir()
+    spec = json.loads(SPEC)
+    spec["paths"]["/tasks/{task_href}"]["get"]["operationId"] = None
+    cached.write_text(json.dumps(spec))
+
+    fake = FakeTransport()
+    api = OpenAPI("https://pulp.example.com", "/api.json", transport=fake)
+    assert "tasks_read" in api.operations
+    assert [request.operation_id for request in fake.requests] == [""]
+    assert cached.read_bytes() == SPEC
+
+
+def test_replay_unknown_request(tmp_path: Path) -> None:
+    cassette = tmp_path / "cassette.json"
+    api = _api(RecordingTransport(cassette, transport=FakeTransport()))
+    api.close()
+
+    api = _api(ReplayTransport(cassette))
+    with pytest.raises(OpenAPIError, match="No recorded response"):
+        api.call("tasks_read", parameters={"task_href": "2"})
+
+
+OAUTH2_SPEC = json.dumps(
+    {
+        **json.loads(SPEC),
+        "security": [{"oauth2": []}],
+        "components": {
+            "securitySchemes": {
+                "oauth2": {
+                    "type": "oauth2",
+                    "flows": {
+                        "clientCredentials": {
+                            "tokenUrl": "https://sso.example.com/token",
+                            "scopes": {},
+                        }
+                    },
+                }
+            }
+        },
+    }
+).encode()
+
+
+class OAuth2Transport(Transport):
+    def send(self, request: Request) -> Response:
+        if request.url.endswith("/token"):
+            body = {"access_token": "DEADBEEF", "refresh_token": "CAFEBABE", "expires_in": 600}
+            return Response(200, {"content-type": "application/json"}, json.dumps(body).encode())
+        if request.operation_id == "":
+            return Response(200, {"content-type": "application/json"}, OAUTH2_SPEC)
+        assert request.headers["Authorization"] in {"Bearer DEADBEEF", "Bearer REDACTED"}
+        return _OK
+
+
+def test_record_oauth2_session(tmp_path: Path) -> None:
+    cassette = tmp_path / "cassette.json"
+    auth_provider = GlueAuthProvider(client_id="client1", client_secret="secret1")
+    api = OpenAPI(
+        "https://pulp.example.com",
+        "/api.json",
+        refresh_cache=True,
+        auth_provider=auth_provider,
+        transport=RecordingTransport(cassette, transport=OAuth2Transport()),
+    )
+    assert api.call("tasks_read", parameters={"task_href": "1"})["state"] == "completed"
+    api.close()
+    recorded = cassette.read_text()
+    assert "DEADBEEF" not in recorded
+    assert "CAFEBABE" not in recorded
+    assert "secret1" not in recorded
+
+    api = OpenAPI(
+        "https://pulp.example.com",
+        "/api.json",
+        refresh_cache=True,
+        auth_provider=auth_provider,
+        transport=ReplayTransport(cassette),
+    )
+    assert api.call("tasks_read", parameters={"task_href": "1"})["state"] == "completed"
+
+
+@pytest.fixture
+def sleeps(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    result: list[float] = []
+    monkeypatch.setattr("pulp_glue.common.openapi.time.sleep", result.append)
+    return result
+
+
+def test_retry_transient_failures(sleeps: list[float]) -> None:
+    transport = FlakyTransport(
+        Response(503, {"Retry-After": "7"}, b""),
+        OpenAPIConnectionError("Connection reset"),
+        Response(429, {}, b""),
+    )
+    api = _api(transport, RetryPolicy(retries=3, backoff=0.5, max_backoff=2))
+    assert api.call("tasks_read", parameters={"task_href": "1"}) == {"state": "completed"}
+    assert transport.calls == 4
+    assert sleeps[0] == 7
+    assert all(0.5 <= delay <= 2 for delay in sleeps[1:])
+
+
+def test_retry_gives_up(sleeps: list[float]) -> None:
+    transport = FlakyTransport(*[Response(502, {}, b"Bad Gateway")] * 3)
+    api = _api(transport, RetryPolicy(retries=2))
+    with pytest.raises(PulpHTTPError) as exc_info:
+        api.call("tasks_read", parameters={"task_href": "1"})
+    assert exc_info.value.status_code == 502
+    assert transport.calls == 3
+    assert len(sleeps) == 2
+
+
+def test_retry_respects_deadline(sleeps: list[float]) -> None:
+    transport = FlakyTransport(Response(503, {"Retry-After": "60"}, b""))
+    api = _api(transport, RetryPolicy(retries=3, deadline=30))
+    with pytest.raises(PulpHTTPError):
+        api.call("tasks_read", parameters={"task_href": "1"})
+    assert transport.calls == 1
+    assert sleeps == []
+
+
+def test_no_retry_for_unsafe_methods(sleeps: list[float]) -> None:
+    transport = FlakyTransport(OpenAPIConnectionError("Connection reset"))
+    api = _api(transport, RetryPolicy(retries=3))
+    with pytest.raises(OpenAPIConnectionError):
+        api.call("tasks_cancel", parameters={"task_href": "1"})
+    assert transport.calls == 1
+    assert sleeps == []
+
+
+class SlowAsyncTransport(AsyncTransport):
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send(self, request: Request) -> Response:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return _OK
+
+
+def test_async_calls_run_concurrently() -> None:
+    async_transport = SlowAsyncTransport()
+    api = AsyncOpenAPI(
+        "https://pulp.example.com",
+        "/api.json",
+        refresh_cache=True,
+        transport=FakeTransport(),
+        async_transport=async_transport,
+    )
+
+    async def _run() -> list[t.Any]:
+        return await asyncio.gather(
+            *(api.acall("tasks_read", parameters={"task_href": str(i)}) for i in range(10))
+        )
+
+    assert asyncio.run(_run()) == [{"state": "completed"}] * 10
+    assert async_transport.max_in_flight == 10
+
+
+def test_async_retry(monkeypatch: pytest.MonkeyPatch) -> None:
+    sleeps: list[float] = []
+
+    async def _sleep(delay: float) -> None:
+        sleeps.append(delay)
+
+    monkeypatch.setattr("pulp_glue.common.openapi.asyncio.sleep", _sleep)
+    transport = FlakyTransport(Response(503, {"Retry-After": "7"}, b""))
+    # Without an async transport, the sync one is run in threads.
+    api = AsyncOpenAPI(
+        "https://pulp.example.com",
+        "/api.json",
+        refresh_cache=True,
+        transport=transport,
+        retry_policy=RetryPolicy(retries=3),
+    )
+    result = asyncio.run(api.acall("tasks_read", parameters={"task_href": "1"}))
+    assert result == {"state": "completed"}
+    assert transport.calls == 2
+    assert sleeps == [7]
+
+
+def test_connection_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    session = requests.Session()
+    sent: list[dict[str, t.Any]] = []
+
+    def _request(method: str, url: str, **kwargs: t.Any) -> requests.Response:
+        sent.append(kwargs)
+        response = requests.Response()
+        response.status_code = 200
+        response.request = requests.Request(method, url).prepare()
+        response._content = b"{}"
+        return response
+
+    monkeypatch.setattr(session, "request", _request)
+    transport = RequestsTransport(
+        session,
+        ConnectionSettings(pool_size=3, keep_alive=False, connect_timeout=2, read_timeout=30),
+    )
+    adapter = session.get_adapter("https://pulp.example.com/")
+    assert isinstance(adapter, requests.adapters.HTTPAdapter)
+    assert adapter._pool_maxsize == 3  # type: ignore[attr-defined]
+    assert session.headers["Connection"] == "close"
+    transport.send(Request("tasks_read", "get", "https://pulp.example.com/pulp/api/v3/", {}))
+    assert sent[0]["timeout"] == (2, 30)
+
+
+def test_http2_needs_httpx(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("pulp_glue.common.transport.HTTPX_AVAILABLE", False)
+    with pytest.raises(OpenAPIError, match="httpx"):
+        OpenAPI(
+            "https://pulp.example.com",
+            "/api.json",
+            connection=ConnectionSettings(http2=True),
+        )
+
+
+class ConcurrentTransport(Transport):
+    # Holds the requests back until all threads have sent one.
+
+    def __init__(self, parties: int) -> None:
+        self.barrier = threading.Barrier(parties)
+
+    def send(self, request: Request) -> Response:
+        if request.operation_id == "":
+            return Response(200, {"content-type": "application/json"}, SPEC)
+        if "Correlation-Id" not in request.headers:
+            self.barrier.wait(timeout=5)
+        # The server assigns a new correlation id to requests without one.
+        cid = request.headers.get("Correlation-Id", uuid.uuid4().hex)
+        return Response(200, {"Correlation-Id": cid}, b"")
+
+
+def test_concurrent_first_requests() -> None:
+    api = _api(ConcurrentTransport(8))
+    with ThreadPoolExecutor(8) as executor:
+        list(
+            executor.map(lambda i: api.call("tasks_read", parameters={"task_href": i}), "12345678")
+        )
+    # The first correlation id returned is used from then on.
+    assert api.cid is not None
+    api.call("tasks_read", parameters={"task_href": "9"})
+
+
+def test_requests_session_per_thread() -> None:
+    session = requests.Session()
+    transport = RequestsTransport(session, ConnectionSettings(pool_size=4))
+    with ThreadPoolExecutor(4) as executor:
+        sessions = list(executor.map(lambda i: transport.session, range(4)))
+    assert transport.session is session
+    assert all(other is not session for other in sessions)
+    assert all(
+        other.get_adapter("https://pulp/") is session.get_adapter("https://pulp/")
+        for other in sessions
+    )
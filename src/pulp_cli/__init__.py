@@ -1,5 +1,7 @@
 import logging
+import os
 import sys
+import time
 import typing as t
 from importlib.metadata import entry_points
 from pathlib import Path
@@ -7,10 +9,25 @@ from types import ModuleType
 
 import click
 
+from pulp_glue.common.context import request_settings
 from pulp_glue.common.i18n import get_translation
+from pulp_glue.common.tracing import (
+    SpanTimings,
+    register_span_hook,
+    span,
+    trace_sink,
+    unregister_span_hook,
+)
+from pulp_glue.common.transport import (
+    RecordingTransport,
+    ReplayTransport,
+    Transport,
+)
 
+from pulp_cli.completion import REFRESH_COMMAND, cache_path, refresh_names
 from pulp_cli.config import CONFIG_LOCATIONS, config, config_options, validate_config
-from pulp_cli.generic import PulpCLIContext, pulp_group
+from pulp_cli.generic import PulpCLIContext, PulpGroup, pass_pulp_context, pulp_group
+from pulp_cli.index import ARGS_KEY, DISABLE_ENV, INDEX_KEY, CommandIndex
 
 if sys.version_info >= (3, 11):
     import tomllib
@@ -39,15 +56,16 @@ def load_plugins(
     # Load plugins
     # https://packaging.python.org/guides/creating-and-discovering-plugins/#using-package-metadata
 
-    discovered_plugins: dict[str, ModuleType] = {
-        entry_point.name: entry_point.load()
-        for entry_point in entry_points(group="pulp_cli.plugins")
-        if (enabled_plugins is None or entry_point.name in enabled_plugins)
-        and entry_point.name not in loaded_plugins
-    }
-    for name, plugin in discovered_plugins.items():
-        plugin.mount(main, discovered_plugins=discovered_plugins)
-        loaded_plugins[name] = plugin
+    with span("load_plugins"):
+        discovered_plugins: dict[str, ModuleType] = {
+            entry_point.name: entry_point.load()
+            for entry_point in entry_points(group="pulp_cli.plugins")
+            if (enabled_plugins is None or entry_point.name in enabled_plugins)
+            and entry_point.name not in loaded_plugins
+        }
+        for name, plugin in discovered_plugins.items():
+            plugin.mount(main, discovered_plugins=discovered_plugins)
+            loaded_plugins[name] = plugin
     return loaded_plugins
 
 
@@ -84,50 +102,70 @@ def _load_config(ctx: click.Context) -> None:
 
     enabled_plugins: list[str] | None = None
     try:
-        config_path = ctx.meta[CONFIG_KEY]
-        profile_key = ctx.meta[PROFILE_KEY]
-        if config_path is not None:
-            config = tomllib.loads(Path(config_path).read_text())
-        else:
-            config = {"cli": {}}
-            for location in CONFIG_LOCATIONS:
-                try:
-                    new_config = tomllib.loads(Path(location).read_text())
-                except (FileNotFoundError, PermissionError):
-                    pass
-                else:
-                    if location.endswith("settings.toml"):
-                        click.echo(
-                            _(
-                                "Warning: "
-                                "Using '{location}' for the pulp-cli configuration is deprecated.\n"
-                                "Please move your config to '{new_location}'."
-                            ).format(location=location, new_location=CONFIG_LOCATIONS[-1]),
-                            err=True,
-                        )
-
-                    # level 1 merge
-                    for key in new_config:
-                        if key in config:
-                            config[key].update(new_config[key])
-                        else:
-                            config[key] = new_config[key]
-        profile: str = "cli"
-        if profile_key is not None:
-            profile = "cli-" + profile_key
-        try:
-            validate_config(config[profile])
-            enabled_plugins = config[profile].pop("plugins", None)
-            ctx.default_map = config[profile]
-        except KeyError:
-            raise click.ClickException(
-                _("Config profile named '{profile}' not found.").format(profile=profile)
-            )
+        with span("load_config"):
+            config_path = ctx.meta[CONFIG_KEY]
+            profile_key = ctx.meta[PROFILE_KEY]
+            if config_path is not None:
+                config = tomllib.loads(Path(config_path).read_text())
+            else:
+                config = {"cli": {}}
+                for location in CONFIG_LOCATIONS:
+                    try:
+                        new_config = tomllib.loads(Path(location).read_text())
+                    except (FileNotFoundError, PermissionError):
+                        pass
+                    else:
+                        if location.endswith("settings.toml"):
+                            click.echo(
+                                _(
+                                    "Warning: "
+                                    "Using '{location}' for the pulp-cli configuration is deprecated.\n"
+                                    "Please move your config to '{new_location}'."
+                                ).format(location=location, new_location=CONFIG_LOCATIONS[-1]),
+                                err=True,
+                            )
+
+                        # level 1 merge
+                        for key in new_config:
+                            if key in config:
+                                config[key].update(new_config[key])
+                            else:
+                                config[key] = new_config[key]
+            profile: str = "cli"
+            if profile_key is not None:
+                profile = "cli-" + profile_key
+            try:
+                validate_config(config[profile])
+                enabled_plugins = config[profile].pop("plugins", None)
+                ctx.default_map = config[profile]
+            except KeyError:
+                raise click.ClickException(
+                    _("Config profile named '{profile}' not found.").format(profile=profile)
+                )
     except ValueError as e:
         click.echo(_("Config file failed to parse. ({}).").format(e), err=True)
         if not sys.stdout.isatty() or not click.confirm(_("Continue without config?")):
             raise click.ClickException(_("Aborted."))
-    ctx.meta[PLUGIN_KEY] = load_plugins(enabled_plugins)
+    if not os.environ.get(DISABLE_ENV) and (
+        ctx.resilient_parsing or "--help" in ctx.meta.get(ARGS_KEY, [])
+    ):
+        # Serve shell completion and help pages from the command index if possible.
+        index = CommandIndex.load(enabled_plugins)
+        ctx.meta[INDEX_KEY] = index
+        if index.tree is not None:
+            if ctx.resilient_parsing:
+                index.mount_stubs(main)
+                ctx.meta[PLUGIN_KEY] = loaded_plugins
+                return
+            help_page = index.help_page(ctx)
+            if help_page is not None:
+                click.echo(help_page, color=ctx.color)
+                ctx.exit()
+        ctx.meta[PLUGIN_KEY] = load_plugins(enabled_plugins)
+        if index.tree is None:
+            index.update_tree(main, ctx)
+    else:
+        ctx.meta[PLUGIN_KEY] = load_plugins(enabled_plugins)
 
 
 def _version_callback(ctx: click.Context, param: t.Any, value: bool) -> None:
@@ -142,6 +180,38 @@ def _version_callback(ctx: click.Context, param: t.Any, value: bool) -> None:
         ctx.exit(0)
 
 
+def _timings_callback(ctx: click.Context, param: click.Parameter, value: bool) -> None:
+    if value and not ctx.resilient_parsing:
+        timings = SpanTimings()
+        register_span_hook(timings)
+        start = time.perf_counter()
+
+        def _report() -> None:
+            unregister_span_hook(timings)
+            overall = time.perf_counter() - start
+            click.echo(_("Timings:"), err=True)
+            click.echo(
+                "  {:<24} {:>6} {:>10} {:>10}".format(_("span"), _("count"), _("total"), _("own")),
+                err=True,
+            )
+            for name, stats in timings.report():
+                click.echo(
+                    f"  {name:<24} {stats.count:>6}"
+                    f" {stats.total * 1000:>8.1f}ms {stats.own * 1000:>8.1f}ms",
+                    err=True,
+                )
+            click.echo("  {:<31} {:>8.1f}ms".format(_("overall"), overall * 1000), err=True)
+
+        ctx.call_on_close(_report)
+
+
+class _PulpMainGroup(PulpGroup):
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        # Remember the arguments to look up help pages in the command index.
+        ctx.meta[ARGS_KEY] = list(args)
+        return super().parse_args(ctx, args)
+
+
 def _help_callback(ctx: click.Context, param: click.Parameter, value: bool) -> None:
     if value and not ctx.resilient_parsing:
         # Ensure _load_config runs even if --config/--profile callbacks
@@ -155,6 +225,14 @@ def _help_callback(ctx: click.Context, param: click.Parameter, value: bool) -> N
         ctx.exit()
 
 
+@click.option(
+    "--timings",
+    is_flag=True,
+    expose_value=False,
+    is_eager=True,
+    callback=_timings_callback,
+    help=_("Print a breakdown of where the time was spent to stderr."),
+)
 @click.option(
     "--help",
     is_flag=True,
@@ -201,8 +279,26 @@ def _help_callback(ctx: click.Context, param: click.Parameter, value: bool) -> N
         " (note: server configuration may require a valid GUID and ignore CIDs that aren't)"
     ),
 )
+@click.option(
+    "--trace-file",
+    type=click.Path(dir_okay=False, writable=True),
+    help=_(
+        "Record every request made to the server in this file."
+        " Files ending in '.har' are written as HTTP Archive, all others as NDJSON."
+    ),
+)
+@click.option(
+    "--record",
+    type=click.Path(dir_okay=False, writable=True),
+    help=_("Record all requests and responses to this cassette file."),
+)
+@click.option(
+    "--replay",
+    type=click.Path(exists=True, dir_okay=False),
+    help=_("Serve responses from a cassette file recorded with --record instead of the server."),
+)
 @config_options
-@pulp_group(no_args_is_help=False)
+@pulp_group(no_args_is_help=False, cls=_PulpMainGroup)
 @click.pass_context
 def main(
     ctx: click.Context,
@@ -224,7 +320,25 @@ def main(
     chunk_size: int | None,
     dry_run: bool,
     timeout: int,
+    retries: int | None,
+    retry_deadline: int | None,
+    max_in_flight: int | None,
+    read_rate: float | None,
+    write_rate: float | None,
+    upload_rate: int | None,
+    pool_size: int | None,
+    keep_alive: bool | None,
+    connect_timeout: float | None,
+    read_timeout: float | None,
+    http2: bool | None,
+    response_cache_size: int | None,
+    page_latency: float | None,
+    min_page_size: int | None,
+    max_page_size: int | None,
     cid: str,
+    trace_file: str | None,
+    record: str | None,
+    replay: str | None,
     api_version: str,
 ) -> None:
     if verbose:
@@ -239,6 +353,24 @@ def main(
         "user_agent": f"Pulp-CLI/{__version__}",
         "cid": cid,
     }
+    if trace_file:
+        sink = trace_sink(trace_file)
+        api_kwargs["trace_sink"] = sink
+        ctx.call_on_close(sink.close)
+    if record and replay:
+        raise click.UsageError(_("--record and --replay are mutually exclusive."))
+    settings_kwargs, paging = request_settings(ctx.params)
+    if "response_cache" in settings_kwargs:
+        ctx.call_on_close(settings_kwargs["response_cache"].close)
+    api_kwargs.update(settings_kwargs)
+    transport: Transport | None = None
+    if record:
+        transport = RecordingTransport(record)
+    elif replay:
+        transport = ReplayTransport(replay)
+    if transport is not None:
+        api_kwargs["transport"] = transport
+        ctx.call_on_close(transport.close)
     ctx.obj = PulpCLIContext(
         api_root=api_root,
         api_kwargs=api_kwargs,
@@ -254,12 +386,37 @@ def main(
         oauth2_client_secret=client_secret,
         chunk_size=chunk_size,
         api_version=api_version,
+        paging=paging,
     )
 
 
 main.add_command(config)
 
 
+@main.command(REFRESH_COMMAND, hidden=True)
+@click.argument("context_path")
+@click.option("--lookup-key", default="name")
+@pass_pulp_context
+@click.pass_context
+def refresh_completion_cache(
+    ctx: click.Context, pulp_ctx: PulpCLIContext, /, context_path: str, lookup_key: str
+) -> None:
+    """Refresh the cached entity names for shell completion."""
+    root_ctx = ctx.find_root()
+    target = cache_path(root_ctx.meta[PROFILE_KEY], pulp_ctx.pulp_domain, context_path, lookup_key)
+    try:
+        refresh_names(
+            pulp_ctx,
+            context_path,
+            lookup_key,
+            target,
+            root_ctx.params["base_url"],
+            root_ctx.params["api_root"],
+        )
+    finally:
+        target.with_name(target.name + ".refresh").unlink(missing_ok=True)
+
+
 if HAS_CLICK_SHELL:
 
     @main.command("shell")
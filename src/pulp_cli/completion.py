@@ -0,0 +1,256 @@
+"""
+Shell completion of entity names.
+
+Listing entities on the server for every keystroke would be far too slow for interactive
+completion.
+Instead the names are kept in a local cache per profile, domain and entity type, so completion
+is answered from local data only.
+Once the cache is older than `COMPLETION_MAX_AGE`, a detached process is spawned to refresh it
+in the background, which is picked up by the next completion.
+"""
+
+import hashlib
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+import typing as t
+from pathlib import Path
+
+import click
+from click.shell_completion import CompletionItem
+
+from pulp_glue.common.context import PulpContext, PulpEntityContext
+
+CACHE_VERSION = 1
+# Seconds after which the cached names are refreshed.
+COMPLETION_MAX_AGE = 300
+# Seconds to wait for a running refresh before starting another one.
+REFRESH_TIMEOUT = 60
+# Name of the hidden command refreshing the cache.
+REFRESH_COMMAND = "refresh-completion-cache"
+# Root options passed on to the refreshing process. Credentials are taken from the config.
+_FORWARDED_PARAMS = ["base_url", "api_root", "domain"]
+
+
+def context_path(context_class: type[PulpEntityContext]) -> str:
+    return f"{context_class.__module__}:{context_class.__qualname__}"
+
+
+def _import_context(path: str) -> type[PulpEntityContext]:
+    module_name, _sep, qualname = path.partition(":")
+    obj: t.Any = importlib.import_module(module_name)
+    for name in qualname.split("."):
+        obj = getattr(obj, name)
+    assert isinstance(obj, type) and issubclass(obj, PulpEntityContext)
+    return obj
+
+
+def cache_path(profile: str | None, domain: str, path: str, lookup_key: str) -> Path:
+    cache_home = Path(os.environ.get("XDG_CACHE_HOME") or "~/.cache").expanduser()
+    return (
+        cache_home
+        / "pulp"
+        / "completion"
+        / (profile or "cli")
+        / domain
+        / f"{path.replace(':', '.')}.{lookup_key}.json"
+    )
+
+
+def _server_id(base_url: str | None, api_root: str | None) -> str:
+    return hashlib.sha256(f"{base_url}{api_root}".encode()).hexdigest()[:16]
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}")
+    tmp_path.write_text(text)
+    tmp_path.replace(path)
+
+
+def refresh_names(
+    pulp_ctx: PulpContext,
+    path: str,
+    lookup_key: str,
+    target: Path,
+    base_url: str | None,
+    api_root: str | None,
+) -> int:
+    """
+    List the values of `lookup_key` for all entities of a type and store them in `target`.
+
+    Only the needed field is requested from the server and the list is fetched page by page.
+
+    Returns:
+        The number of names stored.
+    """
+    entity_ctx = _import_context(path)(pulp_ctx)  # type: ignore[call-arg]
+    parameters = pulp_ctx.projection(entity_ctx._operation_id("list"), [lookup_key])
+    names = sorted(
+        {
+            str(entity[lookup_key])
+            for entity in entity_ctx.list_iterator(parameters=parameters)
+            if entity.get(lookup_key) is not None
+        }
+    )
+    target.parent.mkdir(parents=True, exist_ok=True)
+    _write_atomic(
+        target,
+        json.dumps(
+            {
+                "version": CACHE_VERSION,
+                "server": _server_id(base_url, api_root),
+                "names": names,
+            }
+        ),
+    )
+    return len(names)
+
+
+class EntityNameCompletion:
+    """
+    Shell completion callback for options referencing entities by name.
+
+    Parameters:
+        contexts: Paths of the entity context classes by the `<plugin>:<resource_type>` prefix
+            that selects them. The prefix `""` stands for values without a type prefix.
+        lookup_key: Field of the entities that is completed.
+        default_plugin: Plugin assumed if the value does not specify one.
+        default_type: Resource type assumed if the value does not specify one.
+    """
+
+    def __init__(
+        self,
+        contexts: dict[str, str],
+        lookup_key: str = "name",
+        default_plugin: str | None = None,
+        default_type: str | None = None,
+    ) -> None:
+        self.contexts = contexts
+        self.lookup_key = lookup_key
+        self.default_plugin = default_plugin
+        self.default_type = default_type
+
+    def to_dict(self) -> dict[str, t.Any]:
+        return {
+            "contexts": self.contexts,
+            "lookup_key": self.lookup_key,
+            "default_plugin": self.default_plugin,
+            "default_type": self.default_type,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, t.Any]) -> "EntityNameCompletion":
+        return cls(**data)
+
+    def _split(self, incomplete: str) -> tuple[str, str, str]:
+        # Returns the typed prefix, the key of the context and the incomplete name.
+        if "" in self.contexts:
+            return "", "", incomplete
+        parts = incomplete.split(":", maxsplit=2)
+        while len(parts) < 3:
+            parts.insert(0, "")
+        plugin, resource_type, name = parts
+        prefix = incomplete[: len(incomplete) - len(name)]
+        return (
+            prefix,
+            f"{plugin or self.default_plugin}:{resource_type or self.default_type}",
+            name,
+        )
+
+    def __call__(
+        self, ctx: click.Context, param: click.Parameter, incomplete: str
+    ) -> list[CompletionItem]:
+        if incomplete.startswith(("/", "prn:")):
+            return []
+        prefix, key, name = self._split(incomplete)
+        items: list[CompletionItem] = []
+        path = self.contexts.get(key)
+        if path is not None:
+            items.extend(
+                CompletionItem(prefix + value)
+                for value in self.names(ctx, path)
+                if value.startswith(name)
+            )
+        if not prefix and "" not in self.contexts:
+            # Offer the type prefixes as well.
+            items.extend(
+                CompletionItem(f"{key}:", type="plain")
+                for key in self.contexts
+                if f"{key}:".startswith(incomplete)
+            )
+        return items
+
+    def names(self, ctx: click.Context, path: str) -> list[str]:
+        """
+        The cached names of the entities.
+
+        A refresh is started in the background if they are missing or outdated.
+        """
+        root_ctx = ctx.find_root()
+        # Importing at runtime to avoid a circular import.
+        from pulp_cli import CONFIG_KEY, PROFILE_KEY
+
+        profile: str | None = root_ctx.meta.get(PROFILE_KEY)
+        config_path: str | None = root_ctx.meta.get(CONFIG_KEY)
+        params = {
+            name: root_ctx.params.get(name) or (root_ctx.default_map or {}).get(name)
+            for name in _FORWARDED_PARAMS
+        }
+        target = cache_path(profile, params["domain"] or "default", path, self.lookup_key)
+        server = _server_id(params["base_url"], params["api_root"])
+        names: list[str] = []
+        fresh = False
+        try:
+            data = json.loads(target.read_text())
+            if data.get("version") == CACHE_VERSION and data.get("server") == server:
+                names = data["names"]
+                fresh = time.time() - target.stat().st_mtime < COMPLETION_MAX_AGE
+        except (OSError, ValueError):
+            pass
+        if not fresh:
+            self._start_refresh(target, path, profile, config_path, params)
+        return names
+
+    def _start_refresh(
+        self,
+        target: Path,
+        path: str,
+        profile: str | None,
+        config_path: str | None,
+        params: dict[str, t.Any],
+    ) -> None:
+        marker = target.with_name(target.name + ".refresh")
+        try:
+            if time.time() - marker.stat().st_mtime < REFRESH_TIMEOUT:
+                # Another refresh is still running.
+                return
+        except OSError:
+            pass
+        args = [sys.executable, "-c", "from pulp_cli import main; main()"]
+        if profile is not None:
+            args += ["--profile", profile]
+        if config_path is not None:
+            args += ["--config", config_path]
+        for name, value in params.items():
+            if value is not None:
+                args += ["--" + name.replace("_", "-"), str(value)]
+        args += [REFRESH_COMMAND, path, "--lookup-key", self.lookup_key]
+        # Do not let the child process answer the completion request again.
+        env = {key: value for key, value in os.environ.items() if not key.endswith("_COMPLETE")}
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            marker.touch()
+            subprocess.Popen(
+                args,
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+        except OSError:
+            # Completion is a convenience only.
+            pass
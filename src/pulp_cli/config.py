@@ -59,6 +59,21 @@ OPTIONAL_SETTINGS = {
     "chunk_size",
     "plugins",
     "api_version",
+    "retries",
+    "retry_deadline",
+    "max_in_flight",
+    "read_rate",
+    "write_rate",
+    "upload_rate",
+    "pool_size",
+    "keep_alive",
+    "connect_timeout",
+    "read_timeout",
+    "http2",
+    "response_cache_size",
+    "page_latency",
+    "min_page_size",
+    "max_page_size",
 }
 SETTINGS = REQUIRED_SETTINGS | OPTIONAL_SETTINGS
 
@@ -132,6 +147,105 @@ CONFIG_OPTIONS = [
         default=0,
         help=_("Time to wait for background tasks, set to 0 to wait infinitely"),
     ),
+    click.option(
+        "--retries",
+        type=click.IntRange(min=0),
+        default=None,
+        help=_(
+            "Number of times to retry idempotent requests on transient failures"
+            " (429, 502, 503, 504 or connection errors). Defaults to no retries."
+        ),
+    ),
+    click.option(
+        "--retry-deadline",
+        type=click.IntRange(min=0),
+        default=None,
+        help=_("Seconds after the start of a request beyond which it is not retried anymore."),
+    ),
+    click.option(
+        "--max-in-flight",
+        type=click.IntRange(min=1),
+        default=None,
+        help=_("Maximum number of concurrent requests to the server."),
+    ),
+    click.option(
+        "--read-rate",
+        type=click.FloatRange(min=0, min_open=True),
+        default=None,
+        help=_("Maximum number of read requests per second."),
+    ),
+    click.option(
+        "--write-rate",
+        type=click.FloatRange(min=0, min_open=True),
+        default=None,
+        help=_("Maximum number of write requests per second."),
+    ),
+    click.option(
+        "--upload-rate",
+        default=None,
+        callback=chunk_size_callback,
+        help=_("Maximum number of bytes per second to upload, e.g. '10MB'."),
+    ),
+    click.option(
+        "--pool-size",
+        type=click.IntRange(min=1),
+        default=None,
+        help=_("Maximum number of connections kept open to the server."),
+    ),
+    click.option(
+        "--keep-alive/--no-keep-alive",
+        default=None,
+        help=_("Reuse connections for subsequent requests. Enabled by default."),
+    ),
+    click.option(
+        "--connect-timeout",
+        type=click.FloatRange(min=0, min_open=True),
+        default=None,
+        help=_("Seconds to wait for a connection to the server to be established."),
+    ),
+    click.option(
+        "--read-timeout",
+        type=click.FloatRange(min=0, min_open=True),
+        default=None,
+        help=_("Seconds to wait for the server to send data."),
+    ),
+    click.option(
+        "--http2/--no-http2",
+        default=None,
+        help=_(
+            "Multiplex requests over a single HTTP/2 connection. Needs the 'httpx[http2]' package."
+        ),
+    ),
+    click.option(
+        "--response-cache-size",
+        default=None,
+        callback=chunk_size_callback,
+        help=_(
+            "Keep responses of immutable resources like repository versions, content and"
+            " artifacts in an on-disk cache of this size, e.g. '100MB'. Disabled by default."
+        ),
+    ),
+    click.option(
+        "--page-latency",
+        type=click.FloatRange(min=0, min_open=True),
+        default=None,
+        help=_(
+            "Adapt the page sizes of complete listings ('--limit 0') so the server answers each"
+            " page in about this many seconds. Disabled by default."
+        ),
+    ),
+    click.option(
+        "--min-page-size",
+        type=click.IntRange(min=1),
+        default=None,
+        help=_("Smallest page size to use with '--page-latency'."),
+    ),
+    click.option(
+        "--max-page-size",
+        type=click.IntRange(min=1),
+        default=None,
+        help=_("Largest page size to use with '--page-latency'."),
+    ),
     click.option(
         "-v",
         "--verbose",
@@ -183,18 +297,35 @@ def validate_config(config: dict[str, t.Any], strict: bool = False) -> None:
         errors.append(_("'format' is not one of {choices}").format(choices=FORMAT_CHOICES))
     if "verify_ssl" in config and not isinstance(config["verify_ssl"], bool):
         errors.append(_("'verify_ssl' is not a bool"))
-    if "chunk_size" in config:
-        try:
-            # Casting to string to see if it looks like a positive number with optional units.
-            parse_size(str(config["chunk_size"]))
-        except click.ClickException as e:
-            errors.append(e.message)
+    for key in ["chunk_size", "upload_rate", "response_cache_size"]:
+        if key in config:
+            try:
+                # Sizes are positive numbers with optional units.
+                parse_size(str(config[key]))
+            except click.ClickException as e:
+                errors.append(e.message)
     if "dry_run" in config and not isinstance(config["dry_run"], bool):
         errors.append(_("'dry_run' is not a bool"))
     if "timeout" in config and not isinstance(config["timeout"], int):
         errors.append(_("'timeout' is not an integer"))
     if "verbose" in config and not isinstance(config["verbose"], int):
         errors.append(_("'verbose' is not an integer"))
+    for key in ["retries", "retry_deadline"]:
+        if key in config and not (isinstance(config[key], int) and config[key] >= 0):
+            errors.append(_("'{key}' is not a non-negative integer").format(key=key))
+    for key in ["max_in_flight", "pool_size", "min_page_size", "max_page_size"]:
+        if key in config and not (isinstance(config[key], int) and config[key] >= 1):
+            errors.append(_("'{key}' is not a positive integer").format(key=key))
+    for key in ["read_rate", "write_rate", "connect_timeout", "read_timeout", "page_latency"]:
+        if key in config and not (
+            isinstance(config[key], (int, float))
+            and not isinstance(config[key], bool)
+            and config[key] > 0
+        ):
+            errors.append(_("'{key}' is not a positive number").format(key=key))
+    for key in ["keep_alive", "http2"]:
+        if key in config and not isinstance(config[key], bool):
+            errors.append(_("'{key}' is not a bool").format(key=key))
     if "domain" in config and not re.match(r"^[-a-zA-Z0-9_]+\Z", config["domain"]):
         errors.append(_("'domain' must be a slug string"))
     if "headers" in config:
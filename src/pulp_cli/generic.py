@@ -12,9 +12,12 @@ import schema as s
 import yaml
 
 from pulp_glue.common.authentication import AuthProviderBase
+from pulp_glue.common.content_index import ContentIndex
+from pulp_glue.common.content_index import default_path as content_index_path
 from pulp_glue.common.context import (
     DATETIME_FORMATS,
     DEFAULT_LIMIT,
+    MODIFY_BATCH_SIZE,
     EntityDefinition,
     EntityFieldDefinition,
     PluginRequirement,
@@ -30,8 +33,20 @@ from pulp_glue.common.context import (
     PulpViewSetContext,
     prn_regex,
 )
-from pulp_glue.common.exceptions import PulpException, PulpNoWait
+from pulp_glue.common.context import parse_size as glue_parse_size
+from pulp_glue.common.exceptions import PulpException, PulpNoWait, ValidationError
 from pulp_glue.common.i18n import get_translation
+from pulp_glue.common.orchestration import (
+    SyncOrchestrator,
+    SyncRun,
+    select_repositories,
+    stage_statistics,
+)
+from pulp_glue.common.paging import AdaptivePaging
+from pulp_glue.common.tracing import span
+
+from pulp_cli.completion import EntityNameCompletion, context_path
+from pulp_cli.index import INDEX_KEY
 
 if sys.version_info >= (3, 13):
     from warnings import deprecated
@@ -150,6 +165,7 @@ class PulpCLIContext(PulpContext):
         timeout: Limit of time (in seconds) to wait for unfinished tasks.
         format: The format to be used by `output_result`.
         domain: Name of the domain to interact with.
+        paging: Adapt the page sizes of listings with `--limit 0`.
     """
 
     def __init__(
@@ -168,6 +184,7 @@ class PulpCLIContext(PulpContext):
         oauth2_client_secret: str | None = None,
         chunk_size: int | None = None,
         api_version: str | None = "v3",
+        paging: AdaptivePaging | None = None,
     ) -> None:
         self.username = username
         self.password = password
@@ -187,6 +204,7 @@ class PulpCLIContext(PulpContext):
             domain=domain,
             chunk_size=chunk_size,
             api_version=api_version,
+            paging=paging,
         )
         self.format = format
 
@@ -206,7 +224,8 @@ class PulpCLIContext(PulpContext):
             raise NotImplementedError(
                 _("Format '{format}' not implemented.").format(format=self.format)
             )
-        click.echo(formatter(result))
+        with span("output_result", format=self.format):
+            click.echo(formatter(result))
 
 
 class PulpCLIAuthProvider(AuthProviderBase):
@@ -415,14 +434,18 @@ class PulpCommand(click.Command):
 
     def invoke(self, ctx: click.Context) -> t.Any:
         try:
+            pulp_ctx = ctx.find_object(PulpCLIContext)
             if self.needs_plugins:
-                pulp_ctx = ctx.find_object(PulpCLIContext)
                 assert pulp_ctx is not None
                 for plugin_requirement in self.needs_plugins:
                     pulp_ctx.needs_plugin(plugin_requirement)
             for processor in self.option_processors:
                 processor(ctx)
-            return super().invoke(ctx)
+            if pulp_ctx is None:
+                return super().invoke(ctx)
+            # Entities read while running the command are fetched in batches per type.
+            with pulp_ctx.coalesce():
+                return super().invoke(ctx)
         except PulpException as e:
             raise click.ClickException(str(e))
         except PulpNoWait as e:
@@ -431,6 +454,13 @@ class PulpCommand(click.Command):
     def get_short_help_str(self, limit: int = 45) -> str:
         return self.short_help or ""
 
+    def get_help(self, ctx: click.Context) -> str:
+        help_text = super().get_help(ctx)
+        index = ctx.find_root().meta.get(INDEX_KEY)
+        if index is not None:
+            index.add_help(ctx, help_text)
+        return help_text
+
     def format_help_text(
         self, ctx: click.Context, formatter: click.formatting.HelpFormatter
     ) -> None:
@@ -763,19 +793,50 @@ def create_content_json_callback(
     return _callback
 
 
-# based on https://stackoverflow.com/a/42865957/2002471
-units = {"B": 1, "KB": 10**3, "MB": 10**6, "GB": 10**9, "TB": 10**12}
+def content_href_file_callback(
+    ctx: click.Context, param: click.Parameter, value: t.IO[str] | None
+) -> list[str] | None:
+    """
+    A reusable callback that reads content hrefs or PRNs, one per line, from a file.
+
+    Empty lines and lines starting with `"#"` are ignored. PRNs are translated into hrefs.
+    """
+    if value is None:
+        return None
+
+    pulp_ctx = ctx.find_object(PulpCLIContext)
+    assert pulp_ctx is not None
+    result: list[str] = []
+    for lineno, line in enumerate(value, start=1):
+        item = line.strip()
+        if not item or item.startswith("#"):
+            continue
+        if item.startswith("prn:"):
+            try:
+                item = pulp_ctx.prn_to_href(item)
+            except ValidationError as e:
+                raise click.ClickException(
+                    _("Line {lineno} of '{parameter}': {error}").format(
+                        lineno=lineno, parameter=param.name, error=str(e)
+                    )
+                )
+        elif not item.startswith("/"):
+            raise click.ClickException(
+                _("Line {lineno} of '{parameter}' is neither an href nor a PRN: '{item}'").format(
+                    lineno=lineno, parameter=param.name, item=item
+                )
+            )
+        result.append(item)
+    return result
 
 
 def parse_size(value: str | None) -> int | None:
     if value is None:
         return None
-    size = value.strip().upper()
-    match = re.match(r"^([0-9]+)\s*([KMGT]?B)?$", size)
-    if not match:
-        raise click.ClickException("Please pass in a valid size of form: [0-9] [K/M/G/T]B")
-    number, unit = match.groups(default="B")
-    return int(float(number) * units[unit])
+    try:
+        return glue_parse_size(value)
+    except ValueError as e:
+        raise click.ClickException(str(e))
 
 
 def chunk_size_callback(
@@ -796,6 +857,20 @@ def null_callback(ctx: click.Context, param: click.Parameter, value: str | None)
     return value
 
 
+def content_filter_callback(
+    ctx: click.Context, param: click.Parameter, value: t.Iterable[str]
+) -> list[tuple[str, str, str]]:
+    result: list[tuple[str, str, str]] = []
+    for item in value:
+        match = re.fullmatch(r"([^=~]+)([=~])(.*)", item)
+        if match is None:
+            raise click.BadParameter(
+                _("format must be <field>=<value> or <field>~<pattern>: {item}").format(item=item)
+            )
+        result.append((match.group(1), match.group(2), match.group(3)))
+    return result
+
+
 def remote_header_callback(
     ctx: click.Context, param: click.Parameter, value: t.Iterable[str]
 ) -> list[dict[str, str]] | None:
@@ -981,6 +1056,10 @@ def resource_lookup_option(*args: t.Any, **kwargs: t.Any) -> t.Callable[[FC], FC
     if "cls" not in kwargs:
         kwargs["cls"] = PulpOption
     kwargs["callback"] = _option_callback
+    if lookup_key is not None and "shell_complete" not in kwargs:
+        kwargs["shell_complete"] = EntityNameCompletion(
+            {"": context_path(context_class)}, lookup_key=lookup_key
+        )
 
     kwargs["expose_value"] = False
 
@@ -1125,7 +1204,14 @@ def resource_option(*args: t.Any, **kwargs: t.Any) -> t.Callable[[FC], FC]:
         ctx: click.Context, param: click.Parameter, value: t.Iterable[str | None]
     ) -> t.Iterable[EntityFieldDefinition]:
         if value:
-            return [_option_callback(ctx, param, item) for item in value]
+            result = [_option_callback(ctx, param, item) for item in value]
+            entity_ctxs = [item for item in result if isinstance(item, PulpEntityContext)]
+            if len(entity_ctxs) > 1 and not (parent_resource_lookup or ctx.resilient_parsing):
+                # Load all entities with one list call per type instead of one lookup each.
+                pulp_ctx = ctx.find_object(PulpCLIContext)
+                assert pulp_ctx is not None
+                pulp_ctx.load_entities(entity_ctxs)
+            return result
         return ()
 
     if "cls" not in kwargs:
@@ -1134,6 +1220,13 @@ def resource_option(*args: t.Any, **kwargs: t.Any) -> t.Callable[[FC], FC]:
         kwargs["callback"] = _multi_option_callback
     else:
         kwargs["callback"] = _option_callback
+    if "shell_complete" not in kwargs:
+        kwargs["shell_complete"] = EntityNameCompletion(
+            {key: context_path(value) for key, value in context_table.items()},
+            lookup_key=lookup_key,
+            default_plugin=default_plugin,
+            default_type=default_type,
+        )
 
     if "help" not in kwargs:
         kwargs["help"] = _(
@@ -1197,8 +1290,8 @@ def type_option(*args: t.Any, **kwargs: t.Any) -> t.Callable[[FC], FC]:
 limit_option = pulp_option(
     "--limit",
     default=DEFAULT_LIMIT,
-    type=click.IntRange(1),
-    help=_("Limit the number of {entities} to show."),
+    type=click.IntRange(0),
+    help=_("Limit the number of {entities} to show. Use 0 to show all."),
 )
 
 offset_option = pulp_option(
@@ -1312,6 +1405,14 @@ version_option = click.option(
     expose_value=False,
 )
 
+content_index_option = click.option(
+    "--index-file",
+    type=click.Path(dir_okay=False),
+    default=lambda: str(content_index_path()),
+    show_default=_("content_index.sqlite3 in the user cache directory"),
+    help=_("Location of the local content index."),
+)
+
 label_select_option = pulp_option(
     "--label-select",
     "pulp_label_select",
@@ -1383,6 +1484,15 @@ retained_versions_option = pulp_option(
     type=int_or_empty,
 )
 
+mirror_option = pulp_option(
+    "--mirror/--no-mirror",
+    default=None,
+    help=_(
+        "Make the new repository versions mirror the remotes, removing content the remotes do"
+        " not have. Defaults to adding content only."
+    ),
+)
+
 retain_checkpoints_option = pulp_option(
     "--retain-checkpoints",
     needs_plugins=[PluginRequirement("core", specifier=">=3.106.0")],
@@ -1661,7 +1771,8 @@ def version_command(**kwargs: t.Any) -> click.Command:
     """
     A factory that creates a repository version command group.
 
-    This group contains `list`, `show`, `destroy`, `repair` and `scan` subcommands.
+    This group contains `list`, `show`, `destroy`, `repair`, `scan`, `index` and `query`
+    subcommands.
     If `list_only=True` is passed, only the `list` command will be instantiated.
     Repository lookup options can be provided in `decorators`.
     """
@@ -1708,6 +1819,90 @@ def version_command(**kwargs: t.Any) -> click.Command:
             result = repository_version_ctx.scan()
             pulp_ctx.output_result(result)
 
+        @callback.command()
+        @repository_lookup_option
+        @version_option
+        @content_index_option
+        @pass_repository_version_context
+        @pass_pulp_context
+        def index(
+            pulp_ctx: PulpCLIContext,
+            repository_version_ctx: PulpRepositoryVersionContext,
+            /,
+            index_file: str,
+        ) -> None:
+            """
+            Index the content of a repository version locally.
+
+            If an earlier version of the repository is indexed already, only the content added
+            and removed since is downloaded.
+            """
+            with ContentIndex(index_file) as content_index:
+                result = content_index.update(repository_version_ctx)
+            pulp_ctx.output_result(result)
+
+        @callback.command()
+        @repository_lookup_option
+        @version_option
+        @content_index_option
+        @click.option(
+            "--filter",
+            "filters",
+            multiple=True,
+            callback=content_filter_callback,
+            help=_(
+                "Match a field of the content with '<field>=<value>' or a glob pattern with"
+                " '<field>~<pattern>'. Can be specified multiple times."
+            ),
+        )
+        @click.option(
+            "--sql",
+            help=_(
+                "SQL query to run on the index."
+                " The view 'units' holds the content_type, pulp_href and JSON data of the content."
+            ),
+        )
+        @click.option(
+            "--limit",
+            default=DEFAULT_LIMIT,
+            type=click.IntRange(0),
+            help=_("Limit the number of content units to show. Use 0 to show all."),
+        )
+        @click.option(
+            "--offset",
+            default=0,
+            type=int,
+            help=_("Skip a number of content units to show."),
+        )
+        @pass_repository_version_context
+        @pass_pulp_context
+        def query(
+            pulp_ctx: PulpCLIContext,
+            repository_version_ctx: PulpRepositoryVersionContext,
+            /,
+            index_file: str,
+            filters: list[tuple[str, str, str]],
+            sql: str | None,
+            limit: int,
+            offset: int,
+        ) -> None:
+            """
+            Search the content of a repository version in the local index.
+
+            The repository version is indexed first if needed.
+            """
+            if sql is not None and filters:
+                raise click.UsageError(_("The options --sql and --filter are mutually exclusive."))
+            with ContentIndex(index_file) as content_index:
+                content_index.update(repository_version_ctx)
+                if sql is not None:
+                    result = content_index.query(repository_version_ctx, sql)
+                else:
+                    result = content_index.find(
+                        repository_version_ctx, filters, limit=limit or None, offset=offset
+                    )
+            pulp_ctx.output_result(result)
+
     return callback
 
 
@@ -1759,6 +1954,116 @@ def label_command(**kwargs: t.Any) -> click.Command:
     return label_group
 
 
+def report_sync_runs(pulp_ctx: PulpCLIContext, runs: list[SyncRun]) -> None:
+    """
+    Output the summaries of sync runs and print the latencies of their stages to stderr.
+
+    Raises:
+        click.ClickException: if any of the repositories could not be synced.
+    """
+    pulp_ctx.output_result([run.summary() for run in runs])
+    stats = stage_statistics(runs)
+    if stats:
+        click.echo(_("Stages:"), err=True)
+        click.echo(
+            "  {:<12} {:>9} {:>7} {:>6} {:>10} {:>10}".format(
+                _("stage"), _("completed"), _("skipped"), _("failed"), _("mean"), _("max")
+            ),
+            err=True,
+        )
+        for name, stage_stats in stats.items():
+            click.echo(
+                f"  {name:<12} {stage_stats.completed:>9} {stage_stats.skipped:>7}"
+                f" {stage_stats.failed:>6} {stage_stats.mean:>9.1f}s {stage_stats.max:>9.1f}s",
+                err=True,
+            )
+    failed = sum(run.state in ["failed", "timed out"] for run in runs)
+    if failed:
+        raise click.ClickException(
+            _("{failed} of {total} repositories could not be synced.").format(
+                failed=failed, total=len(runs)
+            )
+        )
+
+
+def pipeline_command(**kwargs: t.Any) -> click.Command:
+    """
+    A factory that creates a pipeline command.
+
+    It syncs, publishes and distributes many repositories of the type of the nearest repository
+    context, overlapping the stages of different repositories and skipping those without changes.
+    Pass options in as `decorators` to add to the sync options.
+    """
+
+    kwargs.setdefault("name", "pipeline")
+    kwargs.setdefault(
+        "help",
+        _(
+            "Sync {entities} from their remotes, publish the new repository versions and point"
+            " the distributions named like the {entities} at the publications."
+            " Publishing and distributing are skipped where nothing changed."
+        ),
+    )
+    decorators = kwargs.pop("decorators", [])
+
+    @pulp_command(**kwargs)
+    @pulp_option(
+        "--name",
+        "names",
+        multiple=True,
+        help=_("Name of a {entity} to run through the pipeline. Can be specified multiple times."),
+    )
+    @label_select_option
+    @pulp_option(
+        "--name-pattern",
+        help=_("Glob pattern the names of the {entities} need to match."),
+    )
+    @pulp_option(
+        "--max-tasks",
+        type=click.IntRange(min=1),
+        default=4,
+        show_default=True,
+        help=_("Largest number of tasks to keep running at a time."),
+    )
+    @mirror_option
+    @pass_entity_context
+    @pass_pulp_context
+    def callback(
+        pulp_ctx: PulpCLIContext,
+        repository_ctx: PulpEntityContext,
+        /,
+        names: tuple[str, ...],
+        pulp_label_select: str | None,
+        name_pattern: str | None,
+        max_tasks: int,
+        mirror: bool | None,
+        **kwargs: t.Any,
+    ) -> None:
+        """
+        Sync, publish and distribute {entities}.
+        """
+        assert isinstance(repository_ctx, PulpRepositoryContext)
+        repository_ctxs = select_repositories(
+            pulp_ctx,
+            types=[f"{repository_ctx.PLUGIN}:{repository_ctx.RESOURCE_TYPE}"],
+            label_select=pulp_label_select,
+            name_pattern=name_pattern,
+            names=names or None,
+        )
+        sync_body = {key: value for key, value in kwargs.items() if value not in (None, ())}
+        if mirror is not None:
+            sync_body["mirror"] = mirror
+        orchestrator = SyncOrchestrator(
+            pulp_ctx, max_in_flight=max_tasks, sync_body=sync_body, distribute=True
+        )
+        report_sync_runs(pulp_ctx, orchestrator.run(repository_ctxs))
+
+    for option in decorators:
+        # Decorate callback
+        callback = option(callback)
+    return callback
+
+
 def role_command(**kwargs: t.Any) -> click.Command:
     """
     A factory that creates a (object) role command group.
@@ -1931,13 +2236,38 @@ def repository_content_command(**kwargs: t.Any) -> click.Group:
     @repository_lookup_option
     @base_repository_option
     @click.option("--base-version", type=int)
+    @click.option(
+        "--add-content-from",
+        type=click.File("r"),
+        callback=content_href_file_callback,
+        help=_("File with one content href or PRN per line to add. Use '-' to read from stdin."),
+    )
+    @click.option(
+        "--remove-content-from",
+        type=click.File("r"),
+        callback=content_href_file_callback,
+        help=_("File with one content href or PRN per line to remove. Use '-' to read from stdin."),
+    )
+    @click.option(
+        "--batch-size",
+        type=click.IntRange(1),
+        default=MODIFY_BATCH_SIZE,
+        show_default=True,
+        help=_(
+            "Maximal number of content units per modify call."
+            " Larger changes are split into consecutive repository versions."
+        ),
+    )
     @pass_repository_context
     def content_modify(
         repo_ctx: PulpRepositoryContext,
         base_repository: PulpRepositoryContext | None,
         base_version: int | None,
-        add_content: list[PulpContentContext] | None,
-        remove_content: list[PulpContentContext] | None,
+        add_content_from: list[str] | None,
+        remove_content_from: list[str] | None,
+        batch_size: int,
+        add_content: list[PulpContentContext] | None = None,
+        remove_content: list[PulpContentContext] | None = None,
     ) -> None:
         base_version_ctx: PulpRepositoryVersionContext | None = None
         if base_version is not None:
@@ -1946,9 +2276,16 @@ def repository_content_command(**kwargs: t.Any) -> click.Group:
             base_version_ctx = base_repository.get_version_context(base_version)
         elif base_repository is not None:
             base_version_ctx = base_repository.get_version_context(-1)
-        ac = [unit.pulp_href for unit in add_content] if add_content else None
-        rc = [unit.pulp_href for unit in remove_content] if remove_content else None
-        repo_ctx.modify(add_content=ac, remove_content=rc, base_version=base_version_ctx)
+        pulp_ctx = repo_ctx.pulp_ctx
+        ac = pulp_ctx.resolve_hrefs(add_content) if add_content else None
+        rc = pulp_ctx.resolve_hrefs(remove_content) if remove_content else None
+        if add_content_from is not None:
+            ac = (ac or []) + add_content_from
+        if remove_content_from is not None:
+            rc = (rc or []) + remove_content_from
+        repo_ctx.modify(
+            add_content=ac, remove_content=rc, base_version=base_version_ctx, batch_size=batch_size
+        )
 
     command_decorators: dict[click.Command, list[t.Callable[[FC], FC]] | None] = {
         content_list: kwargs.pop("list_decorators", []),
@@ -0,0 +1,311 @@
+"""
+A cached index of the command tree.
+
+Importing all plugins and building their command trees is the most expensive part of starting
+the CLI.
+The index holds the names, short help, options and choices of all commands, as well as help pages
+that have been rendered before.
+It allows to serve shell completion and `--help` without importing any plugin.
+
+The index is keyed by the installed plugins, their versions and the modification times of their
+sources, so it is regenerated automatically whenever any of them changes.
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import time
+import typing as t
+from importlib.metadata import entry_points
+from pathlib import Path
+
+import click
+
+from pulp_cli.completion import EntityNameCompletion
+
+INDEX_VERSION = 2
+INDEX_KEY = f"{__name__}.index"
+# Set this environment variable to always build the command tree from the plugins.
+DISABLE_ENV = "PULP_CLI_NO_COMMAND_INDEX"
+ARGS_KEY = f"{__name__}.args"
+# Seconds after which unused indices are removed.
+INDEX_MAX_AGE = 7 * 24 * 3600
+
+
+def _newest_mtime(module_name: str) -> float:
+    try:
+        spec = importlib.util.find_spec(module_name)
+    except (ImportError, ValueError):
+        return 0.0
+    if spec is None:
+        return 0.0
+    locations = list(spec.submodule_search_locations or [])
+    if not locations and spec.origin:
+        return Path(spec.origin).stat().st_mtime
+    return max(
+        (path.stat().st_mtime for location in locations for path in Path(location).rglob("*.py")),
+        default=0.0,
+    )
+
+
+def index_key(enabled_plugins: list[str] | None) -> str:
+    """
+    Fingerprint of everything that affects the command tree.
+    """
+    plugins = [
+        (
+            entry_point.name,
+            entry_point.value,
+            entry_point.dist.version if entry_point.dist else None,
+            _newest_mtime(entry_point.module),
+        )
+        for entry_point in sorted(entry_points(group="pulp_cli.plugins"), key=lambda ep: ep.name)
+    ]
+    data = [
+        INDEX_VERSION,
+        plugins,
+        _newest_mtime(__package__ or "pulp_cli"),
+        sorted(enabled_plugins) if enabled_plugins is not None else None,
+        [os.environ.get(name) for name in ["LANGUAGE", "LC_ALL", "LC_MESSAGES", "LANG"]],
+    ]
+    return hashlib.sha256(json.dumps(data).encode()).hexdigest()[:16]
+
+
+def help_width(ctx: click.Context) -> int:
+    # Mirrors the width calculation of click.HelpFormatter.
+    if ctx.terminal_width is not None:
+        return ctx.terminal_width
+    return min(shutil.get_terminal_size().columns, ctx.max_content_width or 80)
+
+
+def _param_data(param: click.Parameter) -> dict[str, t.Any]:
+    data: dict[str, t.Any] = {
+        "name": param.name,
+        "opts": param.opts,
+        "secondary_opts": param.secondary_opts,
+        "argument": isinstance(param, click.Argument),
+        "nargs": param.nargs,
+        "multiple": param.multiple,
+    }
+    if isinstance(param, click.Option):
+        data.update(
+            flag=param.is_flag,
+            count=param.count,
+            help=param.help,
+        )
+    if isinstance(param.type, click.Choice):
+        data["choices"] = [str(choice) for choice in param.type.choices]
+    elif isinstance(param.type, (click.Path, click.File)):
+        data["path"] = True
+    shell_complete = getattr(param, "_custom_shell_complete", None)
+    if isinstance(shell_complete, EntityNameCompletion):
+        data["entity_names"] = shell_complete.to_dict()
+    return data
+
+
+def _command_data(command: click.Command, ctx: click.Context) -> dict[str, t.Any]:
+    data: dict[str, t.Any] = {
+        "short_help": command.get_short_help_str(),
+        "params": [
+            _param_data(param)
+            for param in command.get_params(ctx)
+            if not getattr(param, "hidden", False)
+        ],
+    }
+    if isinstance(command, click.Group):
+        data["commands"] = {}
+        # This resolves the commands like shell completion does.
+        for name in command.list_commands(ctx):
+            subcommand = command.get_command(ctx, name)
+            if subcommand is None or subcommand.hidden:
+                continue
+            sub_ctx = click.Context(subcommand, info_name=name, parent=ctx, resilient_parsing=True)
+            data["commands"][name] = _command_data(subcommand, sub_ctx)
+    return data
+
+
+def _stub_param(data: dict[str, t.Any]) -> click.Parameter:
+    param_type: t.Any = None
+    if "choices" in data:
+        param_type = click.Choice(data["choices"])
+    elif data.get("path"):
+        param_type = click.Path()
+    shell_complete = (
+        EntityNameCompletion.from_dict(data["entity_names"]) if "entity_names" in data else None
+    )
+    if data["argument"]:
+        return click.Argument(
+            [data["name"]],
+            type=param_type,
+            nargs=data["nargs"],
+            required=False,
+            shell_complete=shell_complete,
+        )
+    opts = list(data["opts"])
+    if data["secondary_opts"]:
+        opts[-1] = opts[-1] + "/" + "/".join(data["secondary_opts"])
+    return click.Option(
+        [data["name"], *opts],
+        type=param_type,
+        is_flag=data["flag"] or None,
+        count=data["count"],
+        multiple=data["multiple"],
+        help=data["help"],
+        shell_complete=shell_complete,
+    )
+
+
+def _stub_command(name: str, data: dict[str, t.Any]) -> click.Command:
+    params = [_stub_param(param) for param in data["params"]]
+    if "commands" in data:
+        return click.Group(
+            name,
+            commands=[
+                _stub_command(sub_name, sub_data) for sub_name, sub_data in data["commands"].items()
+            ],
+            params=params,
+            short_help=data["short_help"],
+        )
+    return click.Command(name, params=params, short_help=data["short_help"])
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}")
+    tmp_path.write_text(text)
+    tmp_path.replace(path)
+
+
+class CommandIndex:
+    """
+    The command index for one set of installed plugins.
+
+    It is stored as a directory holding the command tree and one file per help page.
+
+    Parameters:
+        path: Location of the cached index.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.tree: dict[str, t.Any] | None = None
+
+    @classmethod
+    def load(cls, enabled_plugins: list[str] | None) -> "CommandIndex":
+        """
+        Load the index matching the installed plugins from the cache directory.
+
+        An empty index is returned if there is none yet.
+        """
+        cache_home = Path(os.environ.get("XDG_CACHE_HOME") or "~/.cache").expanduser()
+        index = cls(cache_home / "pulp" / "command-index" / index_key(enabled_plugins))
+        try:
+            data = json.loads((index.path / "tree.json").read_text())
+        except (OSError, ValueError):
+            pass
+        else:
+            if data.get("version") == INDEX_VERSION:
+                index.tree = data["tree"]
+        return index
+
+    def update_tree(self, main: click.Group, ctx: click.Context) -> None:
+        """
+        Record the command tree of the fully loaded `main` group.
+        """
+        self.tree = _command_data(main, ctx)
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            _write_atomic(
+                self.path / "tree.json", json.dumps({"version": INDEX_VERSION, "tree": self.tree})
+            )
+            # Remove indices of plugin versions that have not been used for a while.
+            expired = time.time() - INDEX_MAX_AGE
+            for old_index in self.path.parent.iterdir():
+                if old_index != self.path and old_index.stat().st_mtime < expired:
+                    shutil.rmtree(old_index, ignore_errors=True)
+        except OSError:
+            # The index is an optimization only.
+            pass
+
+    def _help_path(self, key: str) -> Path:
+        return self.path / "help" / hashlib.sha256(key.encode()).hexdigest()[:32]
+
+    def _help_key(self, ctx: click.Context, args: list[str]) -> str | None:
+        # Identifies a help page by the command path and the values of choice options of
+        # subcommands, like the type of a repository, as they may affect the help page.
+        # Other option values are left out to not store any secrets.
+        if self.tree is None or "--help" not in args:
+            return None
+        parts = [str(help_width(ctx)), ctx.command_path]
+        node = self.tree
+        tokens = iter(args)
+        for token in tokens:
+            if token == "--help":
+                return " ".join(parts)
+            if token.startswith("-"):
+                opt, _sep, value = token.partition("=")
+                param = next(
+                    (
+                        param
+                        for param in node["params"]
+                        if opt in param["opts"] or opt in param["secondary_opts"]
+                    ),
+                    None,
+                )
+                if param is None:
+                    return None
+                if not (param.get("flag") or param.get("count") or _sep):
+                    value = next(tokens, "")
+                if node is not self.tree:
+                    parts.append(f"{opt}={value}" if "choices" in param else opt)
+                continue
+            if token not in node.get("commands", {}):
+                return None
+            parts.append(token)
+            node = node["commands"][token]
+        return None
+
+    def add_help(self, ctx: click.Context, help_text: str) -> None:
+        """
+        Remember a rendered help page.
+        """
+        root_ctx = ctx.find_root()
+        key = self._help_key(root_ctx, root_ctx.meta.get(ARGS_KEY, []))
+        if key is None:
+            return
+        help_path = self._help_path(key)
+        try:
+            help_path.parent.mkdir(parents=True, exist_ok=True)
+            _write_atomic(help_path, help_text)
+        except OSError:
+            pass
+
+    def help_page(self, ctx: click.Context) -> str | None:
+        """
+        Find a previously rendered help page requested on the command line.
+
+        Parameters:
+            ctx: The context of the main command.
+
+        Returns:
+            The help page or `None` if this is not a help request or the page is not known.
+        """
+        key = self._help_key(ctx, ctx.meta.get(ARGS_KEY, []))
+        if key is None:
+            return None
+        try:
+            return self._help_path(key).read_text()
+        except OSError:
+            return None
+
+    def mount_stubs(self, main: click.Group) -> None:
+        """
+        Add lightweight stand-ins for all commands not yet known to `main`.
+
+        They are good enough to serve shell completion, but cannot be invoked.
+        """
+        assert self.tree is not None
+        for name, data in self.tree.get("commands", {}).items():
+            if name not in main.commands:
+                main.add_command(_stub_command(name, data))
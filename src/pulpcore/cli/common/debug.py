@@ -6,6 +6,7 @@ from packaging.specifiers import SpecifierSet
 
 from pulp_glue.common.context import PluginRequirement
 from pulp_glue.common.i18n import get_translation
+from pulp_glue.common.tracing import load_trace, summarize_trace
 
 from pulp_cli.generic import (
     PulpCLIContext,
@@ -229,3 +230,31 @@ def schema_names(pulp_ctx: PulpCLIContext, /) -> None:
     Print a list of available schema component names.
     """
     pulp_ctx.output_result(list(pulp_ctx.api.api_spec["components"]["schemas"].keys()))
+
+
+@debug.group(name="trace")
+def trace_group() -> None:
+    pass
+
+
+@trace_group.command()
+@click.argument("trace_file", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--top", type=int, default=10, show_default=True, help=_("Number of slowest calls to show.")
+)
+@pass_pulp_context
+def summarize(pulp_ctx: PulpCLIContext, /, trace_file: str, top: int) -> None:
+    """
+    Summarize a trace recorded with `--trace-file`.
+
+    Shows call counts, durations and bytes transferred per operation and the slowest calls.
+    """
+    try:
+        records = load_trace(trace_file)
+    except (ValueError, KeyError, TypeError) as e:
+        raise click.ClickException(
+            _("Failed to read trace file {trace_file}: {error}").format(
+                trace_file=trace_file, error=e
+            )
+        )
+    pulp_ctx.output_result(summarize_trace(records, top=top))
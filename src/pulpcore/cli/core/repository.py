@@ -10,14 +10,18 @@ from pulp_glue.common.context import (
     PulpRepositoryVersionContext,
 )
 from pulp_glue.common.i18n import get_translation
+from pulp_glue.common.orchestration import SyncOrchestrator, select_repositories
 
 from pulp_cli.generic import (
     PulpCLIContext,
+    label_select_option,
     list_command,
+    mirror_option,
     name_filter_options,
     pass_pulp_context,
     pulp_group,
     pulp_option,
+    report_sync_runs,
     resource_option,
     version_command,
 )
@@ -141,3 +145,71 @@ def reclaim(
     PulpGenericRepositoryContext(pulp_ctx=pulp_ctx).reclaim(
         repo_hrefs=list(repositories), repo_versions_keeplist=list(keep_versions)
     )
+
+
+@repository.command("sync-all")
+@pulp_option(
+    "--type",
+    "types",
+    multiple=True,
+    metavar="<plugin>:<resource_type>",
+    help=_("Type of the repositories to sync. Can be specified multiple times. Defaults to all."),
+)
+@label_select_option
+@pulp_option(
+    "--name-pattern",
+    help=_("Glob pattern the names of the repositories to sync need to match."),
+)
+@pulp_option(
+    "--max-tasks",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help=_("Largest number of tasks to keep running at a time."),
+)
+@mirror_option
+@pulp_option("--publish", is_flag=True, help=_("Publish each synced repository version."))
+@pulp_option(
+    "--distribute",
+    is_flag=True,
+    help=_(
+        "Point the distribution named like each repository at its new publication."
+        " Implies '--publish'."
+    ),
+)
+@pass_pulp_context
+def sync_all(
+    pulp_ctx: PulpCLIContext,
+    /,
+    types: tuple[str, ...],
+    pulp_label_select: str | None,
+    name_pattern: str | None,
+    max_tasks: int,
+    mirror: bool | None,
+    publish: bool,
+    distribute: bool,
+) -> None:
+    """
+    Sync many repositories from their remotes.
+
+    At most '--max-tasks' tasks are kept running at a time.
+    Prints a summary of each repository and fails if any of them could not be synced.
+    Publishing and distributing are skipped where nothing changed.
+    """
+    repository_ctxs = select_repositories(
+        pulp_ctx,
+        types=types or None,
+        label_select=pulp_label_select,
+        name_pattern=name_pattern,
+    )
+    sync_body: dict[str, t.Any] = {}
+    if mirror is not None:
+        sync_body["mirror"] = mirror
+    orchestrator = SyncOrchestrator(
+        pulp_ctx,
+        max_in_flight=max_tasks,
+        sync_body=sync_body,
+        publish=publish,
+        distribute=distribute,
+    )
+    report_sync_runs(pulp_ctx, orchestrator.run(repository_ctxs))
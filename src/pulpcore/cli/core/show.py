@@ -1,3 +1,5 @@
+import typing as t
+
 import click
 
 from pulp_glue.common.i18n import get_translation
@@ -11,17 +13,33 @@ _ = translation.gettext
 @pulp_command(name="show")
 @click.option("--href", default=None, help=_("HREF of the resource"))
 @click.option("--prn", default=None, help=_("PRN of the resource"))
+@click.option(
+    "--prn-file",
+    type=click.File("r"),
+    default=None,
+    help=_("File with one PRN per line. The resources are looked up in batches per type."),
+)
 @pass_pulp_context
-def show(pulp_ctx: PulpCLIContext, /, href: str | None, prn: str | None) -> None:
+def show(
+    pulp_ctx: PulpCLIContext,
+    /,
+    href: str | None,
+    prn: str | None,
+    prn_file: t.IO[str] | None,
+) -> None:
     """Show any resource given its href or prn."""
-    if (href is None) == (prn is None):
-        raise click.UsageError(_("Either href or prn needs to be provided."))
+    if [href, prn, prn_file].count(None) != 2:
+        raise click.UsageError(_("Exactly one of href, prn or prn-file needs to be provided."))
     if href is not None:
         # Use a random read operation to call the href.
         # This is doomed to fail if we ever start validating responses.
-        entity = pulp_ctx.call("artifacts_read", parameters={"artifact_href": href})
-    else:
-        assert prn is not None
+        # It must not be one of the immutable ones, because the href may name any resource.
+        entity = pulp_ctx.call("tasks_read", parameters={"task_href": href})
+    elif prn is not None:
         entity_ctx = pulp_ctx.resolve_prn(prn)
         entity = entity_ctx.entity
+    else:
+        assert prn_file is not None
+        prns = [line.strip() for line in prn_file if line.strip()]
+        entity = [entity_ctx.entity for entity_ctx in pulp_ctx.resolve_prns(prns)]
     pulp_ctx.output_result(entity)
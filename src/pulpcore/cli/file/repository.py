@@ -29,6 +29,7 @@ from pulp_cli.generic import (
     name_option,
     option_group,
     pass_repository_context,
+    pipeline_command,
     pulp_group,
     pulp_labels_option,
     pulp_option,
@@ -167,6 +168,7 @@ repository.add_command(
     )
 )
 repository.add_command(role_command(decorators=lookup_options))
+repository.add_command(pipeline_command())
 
 
 @repository.command()
@@ -30,6 +30,7 @@ from pulp_cli.generic import (
     load_json_callback,
     name_option,
     pass_repository_context,
+    pipeline_command,
     pulp_group,
     pulp_labels_option,
     pulp_option,
@@ -63,6 +64,31 @@ remote_option = resource_option(
         "Remote used for synching in the form '[[<plugin>:]<resource_type>:]<name>' or by href."
     ),
 )
+optimize_option = pulp_option(
+    "--optimize/--no-optimize",
+    default=None,
+    help="Whether or not to optimize sync.",
+)
+skip_type_option = click.option(
+    "--skip-type",
+    "skip_types",
+    multiple=True,
+    type=click.Choice(SKIP_TYPES, case_sensitive=False),
+    help="Content type to skip during sync.",
+)
+sync_policy_option = pulp_option(
+    "--sync-policy",
+    "sync_policy",
+    type=click.Choice(SYNC_TYPES, case_sensitive=False),
+    help="""
+    Modifies how the sync is performed. 'mirror_complete' will clone the original metadata
+    and create an automatic publication from it, but comes with some limitations and does
+    not work for certain repositories. 'mirror_content_only' will change the repository
+    contents to match the remote but the metadata will be regenerated and will not be
+    bit-for-bit identical. 'additive' will retain the existing contents of the repository
+    and add the contents of the repository being synced.
+    """,
+)
 
 metadata_signing_service_option = resource_option(
     "--metadata-signing-service",
@@ -232,6 +258,9 @@ repository.add_command(
     )
 )
 repository.add_command(role_command(decorators=lookup_options))
+repository.add_command(
+    pipeline_command(decorators=[optimize_option, skip_type_option, sync_policy_option])
+)
 
 
 @repository.command()
@@ -247,31 +276,9 @@ repository.add_command(role_command(decorators=lookup_options))
     of 'additive'.
     """,
 )
-@pulp_option(
-    "--optimize/--no-optimize",
-    default=None,
-    help="Whether or not to optimize sync.",
-)
-@click.option(
-    "--skip-type",
-    "skip_types",
-    multiple=True,
-    type=click.Choice(SKIP_TYPES, case_sensitive=False),
-    help="Content type to skip during sync.",
-)
-@pulp_option(
-    "--sync-policy",
-    "sync_policy",
-    type=click.Choice(SYNC_TYPES, case_sensitive=False),
-    help="""
-    Modifies how the sync is performed. 'mirror_complete' will clone the original metadata
-    and create an automatic publication from it, but comes with some limitations and does
-    not work for certain repositories. 'mirror_content_only' will change the repository
-    contents to match the remote but the metadata will be regenerated and will not be
-    bit-for-bit identical. 'additive' will retain the existing contents of the repository
-    and add the contents of the repository being synced.
-    """,
-)
+@optimize_option
+@skip_type_option
+@sync_policy_option
 @pass_repository_context
 def sync(
     repository_ctx: PulpRepositoryContext,
@@ -9,6 +9,8 @@ import gnupg
 import pytest
 import tomli_w
 
+from pytest_pulp_cli.simulator import PulpSimulator
+
 if sys.version_info >= (3, 11):
     import tomllib
 else:
@@ -17,6 +19,9 @@ else:
 
 if t.TYPE_CHECKING:
     from _pytest._code.code import ExceptionInfo, TerminalRepr
+    from click.testing import Result
+
+    from pulp_glue.common.context import PulpContext
 
 
 def pytest_collect_file(
@@ -184,6 +189,86 @@ def pulp_cli_env(
         monkeypatch.setenv(key, value)
 
 
+@pytest.fixture(scope="session")
+def pulp_simulator_api_spec() -> pathlib.Path:
+    """
+    This fixture provides the path to the api spec driving the `pulp_simulator`.
+    It is taken from "PULP_API_SPEC" and tests using the simulator are skipped if that is not set.
+    Plugins can overwrite it to point to an `api.json` recorded from a Pulp instance.
+    """
+    if "PULP_API_SPEC" not in os.environ:
+        pytest.skip("No api spec for the Pulp API simulator configured in PULP_API_SPEC.")
+    return pathlib.Path(os.environ["PULP_API_SPEC"])
+
+
+@pytest.fixture(scope="session")
+def pulp_simulator_session(pulp_simulator_api_spec: pathlib.Path) -> t.Iterator[PulpSimulator]:
+    """
+    This fixture will start the Pulp API simulator once per session only.
+    Use `pulp_simulator` to get it with a clean state.
+    """
+    simulator = PulpSimulator(pulp_simulator_api_spec)
+    simulator.start()
+    yield simulator
+    simulator.stop()
+
+
+@pytest.fixture
+def pulp_simulator(pulp_simulator_session: PulpSimulator) -> PulpSimulator:
+    """
+    This fixture provides an in-process HTTP server simulating the Pulp API.
+    It keeps all entities in memory and is reset for each test.
+    """
+    pulp_simulator_session.reset()
+    return pulp_simulator_session
+
+
+@pytest.fixture
+def pulp_simulator_ctx(
+    pulp_simulator: PulpSimulator, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> "PulpContext":
+    """
+    This fixture provides a `PulpContext` talking to the `pulp_simulator`.
+    """
+    from pulp_glue.common.context import PulpContext
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    return PulpContext.from_config(
+        {"base_url": pulp_simulator.base_url, "username": "admin", "password": "password"}
+    )
+
+
+@pytest.fixture
+def pulp_simulator_cli(
+    pulp_simulator: PulpSimulator, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> t.Callable[..., "Result"]:
+    """
+    This fixture provides a function running the cli against the `pulp_simulator`.
+    Its arguments follow the options to connect to the simulator, and it returns the result of
+    `click.testing.CliRunner.invoke`.
+    Config and cache are kept in the tmp_dir of the test.
+    """
+    from click.testing import CliRunner
+
+    from pulp_cli import main
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    options = [
+        "--base-url",
+        pulp_simulator.base_url,
+        "--username",
+        "admin",
+        "--password",
+        "password",
+    ]
+
+    def _invoke(*args: str) -> "Result":
+        return CliRunner().invoke(main, [*options, *args])
+
+    return _invoke
+
+
 if "PULP_LOGGING" in os.environ:
 
     @pytest.fixture(scope="session")
@@ -0,0 +1,734 @@
+"""
+An in-process simulator for the subset of the Pulp API used by pulp-glue.
+
+The simulator is driven by an `api.json` as served by a real Pulp instance.
+Operations are dispatched along the paths and operation ids found there, and entities are kept in
+memory, shaped after the response schemas.
+Supported are listing (with pagination, field projections and simple filters), showing, creating,
+updating and deleting entities, chunked uploads, repository modifications and syncs producing new
+repository versions and tasks.
+Syncs add the content listed in `remote_content` for the remote used.
+Operations answered with `202` in the api spec are performed in a task that is reported to be
+running for `task_duration` seconds.
+"""
+
+import email.parser
+import email.policy
+import json
+import threading
+import time
+import typing as t
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, parse_qsl, urlencode, urlsplit
+
+_CONTROL_PARAMETERS = {"limit", "offset", "ordering", "fields", "exclude_fields"}
+# Model name suffixes of the typed entities in PRNs, e.g. "prn:file.filerepository:<pulp_id>".
+_PRN_MODELS = {
+    "content": "content",
+    "distributions": "distribution",
+    "publications": "publication",
+    "remotes": "remote",
+    "repositories": "repository",
+}
+
+
+class SimulatorError(Exception):
+    """An error to be reported to the client with a status code and a json body."""
+
+    def __init__(self, status: int, body: t.Any):
+        super().__init__(body)
+        self.status = status
+        self.body = body
+
+
+class _Route(t.NamedTuple):
+    template: str
+    href: str
+    detail: str | None
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+class PulpSimulator(ThreadingHTTPServer):
+    """
+    A threaded HTTP server simulating a Pulp instance.
+
+    Parameters:
+        api_spec: The api spec as bytes or the path of an `api.json` file.
+        api_root: The api root the spec was recorded with.
+        host: Interface to listen on.
+        port: Port to listen on. The default picks a free one.
+    """
+
+    daemon_threads = True
+    # Concurrent clients should not find the listen backlog full.
+    request_queue_size = 128
+
+    def __init__(
+        self,
+        api_spec: bytes | Path,
+        api_root: str = "/pulp/",
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        super().__init__((host, port), _SimulatorHandler)
+        self.api_spec_bytes = api_spec.read_bytes() if isinstance(api_spec, Path) else api_spec
+        self.api_spec: dict[str, t.Any] = json.loads(self.api_spec_bytes)
+        self.api_path = f"{api_root}api/v3/"
+        self.task_duration = 0.0
+        self.calls: Counter[str] = Counter()
+        self.remote_content: dict[str, set[str]] = {}
+        self._lock = threading.RLock()
+        self._thread: threading.Thread | None = None
+        self._entities: dict[str, dict[str, t.Any]] = {}
+        self._collections: dict[str, list[str]] = {}
+        self._version_content: dict[str, set[str]] = {}
+        self._version_changes: dict[str, tuple[set[str], set[str]]] = {}
+        self._task_finish: dict[str, float] = {}
+
+        paths: dict[str, dict[str, t.Any]] = self.api_spec["paths"]
+        self._operations = {
+            operation["operationId"]: (method, key)
+            for key, path_item in paths.items()
+            for method, operation in path_item.items()
+            if isinstance(operation, dict) and "operationId" in operation
+        }
+        self._list_paths = sorted(
+            (
+                key
+                for key, path_item in paths.items()
+                if key.startswith(self.api_path)
+                and path_item.get("get", {}).get("operationId", "").endswith("_list")
+            ),
+            key=len,
+            reverse=True,
+        )
+        self.tasks_path = self._operations["tasks_list"][1]
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def start(self) -> None:
+        """Start serving requests in a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and release the socket."""
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def reset(self) -> None:
+        """Forget all entities and statistics."""
+        with self._lock:
+            self.task_duration = 0.0
+            self.calls.clear()
+            self.remote_content.clear()
+            self._entities.clear()
+            self._collections.clear()
+            self._version_content.clear()
+            self._version_changes.clear()
+            self._task_finish.clear()
+
+    # Public helpers for tests
+
+    def get(self, href: str) -> dict[str, t.Any]:
+        """Return the stored representation of an entity."""
+        with self._lock:
+            return self._entities[href]
+
+    def populate(self, operation_id: str, count: int, **values: t.Any) -> list[str]:
+        """
+        Create entities directly in the store, bypassing tasks.
+
+        Parameters:
+            operation_id: The create (or list) operation of the collection to populate.
+            count: Number of entities to create.
+            values: Field values for the new entities. Strings are formatted with `index`.
+
+        Returns:
+            The hrefs of the new entities.
+        """
+        method, key = self._operations[operation_id]
+        route = self._route(key)
+        assert route is not None and route.detail is not None
+        schema = self._response_schema(self._operation(route.detail, "get"))
+        with self._lock:
+            return [
+                self._create(
+                    route,
+                    schema,
+                    {
+                        name: value.format(index=index) if isinstance(value, str) else value
+                        for name, value in values.items()
+                    },
+                )["pulp_href"]
+                for index in range(count)
+            ]
+
+    # Spec helpers
+
+    def _schema(self, schema: dict[str, t.Any]) -> dict[str, t.Any]:
+        while "$ref" in schema:
+            schema = self.api_spec["components"]["schemas"][schema["$ref"].split("/")[-1]]
+        if "allOf" in schema:
+            schema = self._schema(schema["allOf"][0])
+        return schema
+
+    def _operation(self, template: str, method: str) -> dict[str, t.Any]:
+        operation: dict[str, t.Any] | None = self.api_spec["paths"][template].get(method)
+        if operation is None:
+            raise SimulatorError(405, {"detail": f'Method "{method.upper()}" not allowed.'})
+        return operation
+
+    def _response_schema(self, operation: dict[str, t.Any]) -> dict[str, t.Any]:
+        for status in ("200", "201"):
+            if status in operation["responses"]:
+                return self._schema(
+                    operation["responses"][status]["content"]["application/json"]["schema"]
+                )
+        return {}
+
+    def _request_schema(self, operation: dict[str, t.Any]) -> dict[str, t.Any]:
+        if "requestBody" not in operation:
+            return {}
+        content = operation["requestBody"]["content"]
+        return self._schema(next(iter(content.values()))["schema"])
+
+    def _route(self, path: str) -> _Route | None:
+        for list_path in self._list_paths:
+            if path.startswith(list_path):
+                return self._route_in(list_path, list_path, path[len(list_path) :])
+        return None
+
+    def _route_in(self, template: str, href: str, rest: str) -> _Route | None:
+        list_id = self.api_spec["paths"][template]["get"]["operationId"]
+        detail = self._operations.get(list_id[: -len("_list")] + "_read", (None, None))[1]
+        if not rest:
+            return _Route(template, href, detail)
+        if detail is None:
+            return None
+        pulp_id, _, suffix = rest.partition("/")
+        href = f"{href}{pulp_id}/"
+        if not suffix:
+            return _Route(detail, href, detail)
+        segment, _, rest = suffix.partition("/")
+        nested = f"{detail}{segment}/"
+        nested_list = self.api_spec["paths"].get(nested, {}).get("get", {})
+        if nested_list.get("operationId", "").endswith("_list"):
+            # A nested collection, like the versions of a repository.
+            return self._route_in(nested, f"{href}{segment}/", rest)
+        if detail + suffix in self.api_spec["paths"]:
+            return _Route(detail + suffix, href, detail)
+        return None
+
+    # Entities
+
+    def _lookup(self, href: str) -> dict[str, t.Any]:
+        try:
+            return self._entities[href]
+        except KeyError:
+            raise SimulatorError(404, {"detail": "Not found."})
+
+    def _create(
+        self,
+        route: _Route,
+        schema: dict[str, t.Any],
+        values: dict[str, t.Any],
+        href: str | None = None,
+    ) -> dict[str, t.Any]:
+        properties: dict[str, t.Any] = schema.get("properties", {})
+        collection = self._collections.setdefault(route.href, [])
+        pulp_id = uuid.uuid4()
+        href = href or f"{route.href}{pulp_id}/"
+        entity: dict[str, t.Any] = {}
+        for name, prop in properties.items():
+            prop = self._schema(prop)
+            if prop.get("writeOnly"):
+                continue
+            if name in values:
+                entity[name] = values[name]
+            elif "default" in prop:
+                entity[name] = prop["default"]
+            elif prop.get("nullable"):
+                entity[name] = None
+            elif prop.get("type") == "array":
+                entity[name] = []
+            elif prop.get("type") == "object" or "properties" in prop:
+                entity[name] = {}
+            elif prop.get("type") == "boolean":
+                entity[name] = False
+            elif prop.get("type") == "integer":
+                entity[name] = 0
+            else:
+                entity[name] = ""
+        model = href[len(self.api_path) :].split("/")[:-2]
+        if len(model) == 3 and model[0] in _PRN_MODELS:
+            prn_model = f"{model[1]}.{model[1]}{_PRN_MODELS[model[0]]}"
+        else:
+            prn_model = ".".join(model[-2:])
+        entity.update(
+            {
+                "pulp_href": href,
+                "prn": f"prn:{prn_model}:{pulp_id}",
+                "pulp_created": _now(),
+                "pulp_last_updated": _now(),
+            }
+        )
+        self._entities[href] = entity
+        collection.append(href)
+        if "versions_href" in properties and route.detail is not None:
+            entity["versions_href"] = href + "versions/"
+            entity["latest_version_href"] = self._new_version(route.detail, entity, set(), None)
+        return entity
+
+    def _new_version(
+        self,
+        detail: str,
+        repository: dict[str, t.Any],
+        content: set[str],
+        base_version: str | None,
+    ) -> str:
+        versions_template = detail + "versions/"
+        versions_route = self._route_in(versions_template, repository["versions_href"], "")
+        assert versions_route is not None and versions_route.detail is not None
+        schema = self._response_schema(self._operation(versions_route.detail, "get"))
+        collection = self._collections.setdefault(repository["versions_href"], [])
+        number = len(collection) and self._entities[collection[-1]]["number"] + 1
+        previous = self._version_content.get(repository.get("latest_version_href") or "", set())
+        # Versions are addressed by number.
+        href = f"{repository['versions_href']}{number}/"
+        added, removed = content - previous, previous - content
+        version = self._create(
+            versions_route,
+            schema,
+            {
+                "number": number,
+                "repository": repository["pulp_href"],
+                "base_version": base_version,
+                "content_summary": {
+                    "added": _summary(added, "repository_version_added", href),
+                    "removed": _summary(removed, "repository_version_removed", href),
+                    "present": _summary(content, "repository_version", href),
+                },
+            },
+            href=href,
+        )
+        self._version_content[href] = content
+        self._version_changes[href] = (added, removed)
+        return t.cast(str, version["pulp_href"])
+
+    def _modify(self, detail: str, href: str, body: dict[str, t.Any]) -> str:
+        repository = self._lookup(href)
+        base_version = body.get("base_version")
+        content = set(self._version_content[base_version or repository["latest_version_href"]])
+        remove = body.get("remove_content_units") or []
+        if "*" in remove:
+            content.clear()
+        else:
+            content.difference_update(remove)
+        for content_href in body.get("add_content_units") or []:
+            self._lookup(content_href)
+            content.add(content_href)
+        version_href = self._new_version(detail, repository, content, base_version)
+        repository["latest_version_href"] = version_href
+        return version_href
+
+    def _sync(self, detail: str, href: str, remote: str, mirror: bool, publish: bool) -> list[str]:
+        repository = self._lookup(href)
+        previous = self._version_content[repository["latest_version_href"]]
+        content = set(self.remote_content.get(remote, set()))
+        if not mirror:
+            content |= previous
+        if content == previous:
+            # Like Pulp, a sync without changes does not create a new repository version.
+            return []
+        version_href = self._new_version(detail, repository, content, None)
+        repository["latest_version_href"] = version_href
+        if publish:
+            # Like the 'mirror_complete' sync policy of pulp_rpm, publishing the new version too.
+            repositories_path = href.rsplit("/", 2)[0] + "/"
+            route = self._route(repositories_path.replace("/repositories/", "/publications/", 1))
+            if route is not None and route.detail is not None:
+                schema = self._response_schema(self._operation(route.detail, "get"))
+                publication = self._create(
+                    route, schema, {"repository_version": version_href, "repository": href}
+                )
+                return [version_href, publication["pulp_href"]]
+        return [version_href]
+
+    def _delete(self, href: str) -> None:
+        entity = self._entities.pop(href)
+        for collection in self._collections.values():
+            if href in collection:
+                collection.remove(href)
+        if "versions_href" in entity:
+            for version_href in self._collections.pop(entity["versions_href"], []):
+                self._entities.pop(version_href, None)
+                self._version_content.pop(version_href, None)
+                self._version_changes.pop(version_href, None)
+
+    def _filter(self, hrefs: list[str], query: dict[str, list[str]]) -> list[dict[str, t.Any]]:
+        entities = [self._entities[href] for href in hrefs]
+        for name, values in query.items():
+            if name in _CONTROL_PARAMETERS:
+                continue
+            if name == "repository_version" and entities and name not in entities[0]:
+                # Content in a repository version, unlike publications of it.
+                content = self._version_content.get(values[0], set())
+                entities = [entity for entity in entities if entity["pulp_href"] in content]
+                continue
+            if name in {"repository_version_added", "repository_version_removed"}:
+                added, removed = self._version_changes.get(values[0], (set(), set()))
+                content = added if name == "repository_version_added" else removed
+                entities = [entity for entity in entities if entity["pulp_href"] in content]
+                continue
+            if name == "pulp_label_select":
+                entities = [
+                    entity
+                    for entity in entities
+                    if _label_select(entity.get("pulp_labels") or {}, values[0])
+                ]
+                continue
+            field, _, lookup = name.partition("__")
+            if not entities or field not in entities[0]:
+                continue
+            if lookup == "in":
+                choices = {item for value in values for item in value.split(",")}
+                entities = [entity for entity in entities if _str(entity[field]) in choices]
+            elif lookup == "contains":
+                entities = [entity for entity in entities if values[0] in _str(entity[field])]
+            elif lookup == "":
+                entities = [entity for entity in entities if _str(entity[field]) == values[0]]
+        return entities
+
+    # Tasks
+
+    def _task(self, name: str, action: t.Callable[[], list[str]]) -> dict[str, t.Any]:
+        route = self._route(self.tasks_path)
+        assert route is not None and route.detail is not None
+        schema = self._response_schema(self._operation(route.detail, "get"))
+        task = self._create(route, schema, {"name": name, "state": "running"})
+        task["started_at"] = _now()
+        try:
+            task["created_resources"] = action()
+        except SimulatorError as e:
+            task["state"] = "failed"
+            task["error"] = {"description": json.dumps(e.body)}
+        self._task_finish[task["pulp_href"]] = time.monotonic() + self.task_duration
+        return {"task": task["pulp_href"]}
+
+    def _refresh_task(self, href: str) -> None:
+        task = self._entities.get(href)
+        finish = self._task_finish.get(href)
+        if task is not None and finish is not None and time.monotonic() >= finish:
+            if task["state"] == "running":
+                task["state"] = "completed"
+            task["finished_at"] = _now()
+            del self._task_finish[href]
+
+    # Dispatching
+
+    def dispatch(
+        self, method: str, path: str, query: dict[str, list[str]], body: dict[str, t.Any]
+    ) -> tuple[int, t.Any]:
+        """Perform an api request and return the status code and the response body."""
+        route = self._route(path)
+        if route is None:
+            raise SimulatorError(404, {"detail": "Not found."})
+        operation = self._operation(route.template, method)
+        operation_id: str = operation["operationId"]
+        self.calls[operation_id] += 1
+        missing = [
+            name for name in self._request_schema(operation).get("required", []) if name not in body
+        ]
+        if missing and method != "patch":
+            raise SimulatorError(400, {name: ["This field is required."] for name in missing})
+        asynchronous = "202" in operation["responses"]
+
+        with self._lock:
+            if operation_id.endswith("_list"):
+                return 200, self._list(route, query)
+            if route.template != route.detail:
+                if operation_id.endswith("_create"):
+                    return self._create_operation(route, operation, body, asynchronous)
+                if operation_id.endswith("_modify"):
+                    assert route.detail is not None
+                    detail = route.detail
+                    return 202, self._task(
+                        operation_id, lambda: [self._modify(detail, route.href, body)]
+                    )
+                if operation_id.endswith("_sync"):
+                    assert route.detail is not None
+                    detail = route.detail
+                    remote = body.get("remote") or self._lookup(route.href).get("remote")
+                    if not remote:
+                        raise SimulatorError(400, {"remote": ["A remote must be specified."]})
+                    return 202, self._task(
+                        operation_id,
+                        lambda: self._sync(
+                            detail,
+                            route.href,
+                            remote,
+                            body.get("mirror", False),
+                            body.get("sync_policy") == "mirror_complete",
+                        ),
+                    )
+            elif method in ("get", "head"):
+                if route.href.startswith(self.tasks_path):
+                    self._refresh_task(route.href)
+                return 200, _project(self._lookup(route.href), query)
+            elif method in ("put", "patch"):
+                self._lookup(route.href)
+
+                def _update() -> list[str]:
+                    self._update(route, operation, body)
+                    return []
+
+                if asynchronous:
+                    return 202, self._task(operation_id, _update)
+                _update()
+            elif method == "delete":
+                self._lookup(route.href)
+
+                def _delete() -> list[str]:
+                    self._delete(route.href)
+                    return []
+
+                if asynchronous:
+                    return 202, self._task(operation_id, _delete)
+                _delete()
+                return 204, None
+            if asynchronous:
+                return 202, self._task(operation_id, list)
+            return 200, self._lookup(route.href)
+
+    def _list(self, route: _Route, query: dict[str, list[str]]) -> dict[str, t.Any]:
+        for href in self._collections.get(route.href, []):
+            if href.startswith(self.tasks_path):
+                self._refresh_task(href)
+        entities = self._filter(self._collections.get(route.href, []), query)
+        limit = int(query.get("limit", ["100"])[0])
+        offset = int(query.get("offset", ["0"])[0])
+        next_url = None
+        if offset + limit < len(entities):
+            next_query = {key: value[0] for key, value in query.items()}
+            next_query["offset"] = str(offset + limit)
+            next_url = f"{self.base_url}{route.href}?{urlencode(next_query)}"
+        previous_url = None
+        if offset > 0:
+            previous_query = {key: value[0] for key, value in query.items()}
+            previous_query["offset"] = str(max(offset - limit, 0))
+            previous_url = f"{self.base_url}{route.href}?{urlencode(previous_query)}"
+        return {
+            "count": len(entities),
+            "next": next_url,
+            "previous": previous_url,
+            "results": [_project(entity, query) for entity in entities[offset : offset + limit]],
+        }
+
+    def _create_operation(
+        self,
+        route: _Route,
+        operation: dict[str, t.Any],
+        body: dict[str, t.Any],
+        asynchronous: bool,
+    ) -> tuple[int, t.Any]:
+        if route.detail is None:
+            raise SimulatorError(405, {"detail": "Method not allowed."})
+        schema = self._response_schema(self._operation(route.detail, "get"))
+        values = {
+            name: value
+            for name, value in body.items()
+            if not self._schema(
+                self._request_schema(operation).get("properties", {}).get(name, {})
+            ).get("writeOnly")
+        }
+        if "name" in values and any(
+            self._entities[href].get("name") == values["name"]
+            for href in self._collections.get(route.href, [])
+        ):
+            raise SimulatorError(400, {"name": ["This field must be unique."]})
+        if not asynchronous:
+            return 201, self._create(route, schema, values)
+
+        def _create() -> list[str]:
+            entity = self._create(route, schema, values)
+            created_resources = [entity["pulp_href"]]
+            repository_href = body.get("repository")
+            if repository_href:
+                repository_route = self._route(repository_href)
+                assert repository_route is not None and repository_route.detail is not None
+                created_resources.insert(
+                    0,
+                    self._modify(
+                        repository_route.detail,
+                        repository_href,
+                        {"add_content_units": [entity["pulp_href"]]},
+                    ),
+                )
+            return created_resources
+
+        return 202, self._task(operation["operationId"], _create)
+
+    def _update(self, route: _Route, operation: dict[str, t.Any], body: dict[str, t.Any]) -> None:
+        entity = self._lookup(route.href)
+        properties = self._request_schema(operation).get("properties", {})
+        for name, value in body.items():
+            if name in entity and not self._schema(properties.get(name, {})).get("writeOnly"):
+                entity[name] = value
+        entity["pulp_last_updated"] = _now()
+
+    def parse_body(
+        self, method: str, path: str, content_type: str, data: bytes
+    ) -> dict[str, t.Any]:
+        """Decode a request body according to its content type and the operation's schema."""
+        if not data:
+            return {}
+        if content_type.startswith("application/json"):
+            return t.cast(dict[str, t.Any], json.loads(data))
+        if content_type.startswith("application/x-www-form-urlencoded"):
+            raw: dict[str, t.Any] = dict(parse_qsl(data.decode()))
+        elif content_type.startswith("multipart/form-data"):
+            message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+                b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + data
+            )
+            raw = {}
+            for part in message.iter_parts():
+                name = part.get_param("name", header="content-disposition")
+                payload = t.cast(bytes, part.get_payload(decode=True))
+                raw[str(name)] = payload if part.get_filename() else payload.decode()
+        else:
+            raise SimulatorError(415, {"detail": f'Unsupported media type "{content_type}".'})
+        route = self._route(path)
+        properties: dict[str, t.Any] = {}
+        if route is not None:
+            operation = self.api_spec["paths"][route.template].get(method, {})
+            properties = self._request_schema(operation).get("properties", {})
+        return {name: _decode(self._schema(properties.get(name, {})), v) for name, v in raw.items()}
+
+
+class _SimulatorHandler(BaseHTTPRequestHandler):
+    server: PulpSimulator
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: t.Any) -> None:
+        pass
+
+    def _send(self, status: int, data: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, method: str) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        data = self.rfile.read(length) if length else b""
+        url = urlsplit(self.path)
+        if url.path == f"{self.server.api_path}docs/api.json":
+            self._send(200, self.server.api_spec_bytes)
+            return
+        try:
+            body = self.server.parse_body(
+                method, url.path, self.headers.get("Content-Type", ""), data
+            )
+            status, result = self.server.dispatch(method, url.path, parse_qs(url.query), body)
+        except SimulatorError as e:
+            status, result = e.status, e.body
+        self._send(status, b"" if result is None else json.dumps(result).encode())
+
+    def do_GET(self) -> None:
+        self._handle("get")
+
+    def do_HEAD(self) -> None:
+        self._handle("head")
+
+    def do_POST(self) -> None:
+        self._handle("post")
+
+    def do_PUT(self) -> None:
+        self._handle("put")
+
+    def do_PATCH(self) -> None:
+        self._handle("patch")
+
+    def do_DELETE(self) -> None:
+        self._handle("delete")
+
+
+def _str(value: t.Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _label_select(labels: dict[str, t.Any], query: str) -> bool:
+    # Terms like "key", "!key", "key=value", "key!=value" and "key~substring", all need to match.
+    for term in query.split(","):
+        term = term.strip()
+        for operator in ("!=", "=", "~"):
+            key, found, value = term.partition(operator)
+            if found:
+                key = key.strip()
+                if operator == "!=":
+                    matches = labels.get(key) != value.strip()
+                elif operator == "=":
+                    matches = labels.get(key) == value.strip()
+                else:
+                    matches = value.strip() in (labels.get(key) or "")
+                break
+        else:
+            matches = (term[1:] not in labels) if term.startswith("!") else (term in labels)
+        if not matches:
+            return False
+    return True
+
+
+def _summary(content: set[str], filter_name: str, version_href: str) -> dict[str, t.Any]:
+    result: dict[str, t.Any] = {}
+    for href in content:
+        list_path = href.rstrip("/").rsplit("/", 1)[0] + "/"
+        # Like the pulp_type, e.g. "file.file" for "/pulp/api/v3/content/file/files/".
+        plugin, resource_type = list_path.rstrip("/").split("/")[-2:]
+        key = f"{plugin}.{resource_type.removesuffix('s')}"
+        result.setdefault(
+            key, {"count": 0, "href": f"{list_path}?{urlencode({filter_name: version_href})}"}
+        )
+        result[key]["count"] += 1
+    return result
+
+
+def _decode(schema: dict[str, t.Any], value: t.Any) -> t.Any:
+    if not isinstance(value, str):
+        return value
+    if schema.get("type") in ("array", "object"):
+        return json.loads(value)
+    if schema.get("type") == "integer":
+        return int(value)
+    if schema.get("type") == "boolean":
+        return value == "true"
+    return value
+
+
+def _project(entity: dict[str, t.Any], query: dict[str, list[str]]) -> dict[str, t.Any]:
+    fields = {field for value in query.get("fields", []) for field in value.split(",")}
+    exclude_fields = {
+        field for value in query.get("exclude_fields", []) for field in value.split(",")
+    }
+    return {
+        key: value
+        for key, value in entity.items()
+        if (not fields or key in fields) and key not in exclude_fields
+    }
@@ -1,3 +1,4 @@
+from pathlib import Path
 from urllib.parse import urljoin
 
 import pytest
@@ -28,3 +29,8 @@ def pulp_cli_vars(pulp_cli_vars: dict[str, str]) -> dict[str, str]:
         }
     )
     return result
+
+
+@pytest.fixture(scope="session")
+def pulp_simulator_api_spec() -> Path:
+    return Path(__file__).parent / "assets" / "api.json"
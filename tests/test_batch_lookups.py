@@ -0,0 +1,221 @@
+import json
+import typing as t
+from pathlib import Path
+from urllib.parse import quote
+
+import pytest
+from click.testing import Result
+
+from pulp_glue.common.context import PulpContext, PulpEntityContext
+from pulp_glue.common.exceptions import PulpEntityNotFound, PulpException
+from pulp_glue.file.context import (
+    PulpFileContentContext,
+    PulpFileRepositoryContext,
+)
+
+from pytest_pulp_cli.simulator import PulpSimulator
+
+
+def test_resolve_hrefs(pulp_simulator: PulpSimulator, pulp_simulator_ctx: PulpContext) -> None:
+    hrefs = pulp_simulator.populate(
+        "content_file_files_create", 250, relative_path="file_{index}", sha256="{index:064}"
+    )
+    pulp_simulator.populate("content_file_files_create", 2, relative_path="twin", sha256="0" * 64)
+    content_ctxs = [
+        PulpFileContentContext(
+            pulp_simulator_ctx, entity={"sha256": f"{index:064}", "relative_path": f"file_{index}"}
+        )
+        for index in reversed(range(250))
+    ]
+    content_ctxs.append(PulpFileContentContext(pulp_simulator_ctx, pulp_href=hrefs[0]))
+    assert pulp_simulator_ctx.resolve_hrefs(content_ctxs) == [*reversed(hrefs), hrefs[0]]
+    # One filtered list call per 100 units.
+    assert pulp_simulator.calls["content_file_files_list"] == 3
+    assert content_ctxs[0].pulp_href == hrefs[-1]
+    assert pulp_simulator.calls["content_file_files_list"] == 3
+
+    with pytest.raises(PulpException) as exc_info:
+        pulp_simulator_ctx.resolve_hrefs(
+            [
+                PulpFileContentContext(pulp_simulator_ctx, entity=unit)
+                for unit in [
+                    {"sha256": "1" * 64, "relative_path": "file_1"},
+                    {"sha256": "0" * 64, "relative_path": "twin"},
+                    {"sha256": "2" * 64, "relative_path": "missing"},
+                ]
+            ]
+        )
+    assert not isinstance(exc_info.value, PulpEntityNotFound)
+    assert str(exc_info.value).count("Could not find") == 2
+    assert str(exc_info.value).count("Multiple") == 1
+
+
+def test_load_entities(pulp_simulator: PulpSimulator, pulp_simulator_ctx: PulpContext) -> None:
+    hrefs = pulp_simulator.populate("repositories_file_file_create", 3, name="repository_{index}")
+    prn = pulp_simulator.get(hrefs[1])["prn"]
+    repository_ctxs = [
+        PulpFileRepositoryContext(pulp_simulator_ctx, entity={"name": "repository_0"}),
+        PulpFileRepositoryContext(pulp_simulator_ctx, entity={"prn__in": [prn]}),
+        PulpFileRepositoryContext(pulp_simulator_ctx, pulp_href=hrefs[2]),
+    ]
+    pulp_simulator_ctx.load_entities(repository_ctxs)
+    # One filtered list call per kind of lookup.
+    assert pulp_simulator.calls["repositories_file_file_list"] == 3
+    assert [repository_ctx.entity["name"] for repository_ctx in repository_ctxs] == [
+        "repository_0",
+        "repository_1",
+        "repository_2",
+    ]
+    assert repository_ctxs[0].entity["latest_version_href"] is not None
+    assert pulp_simulator.calls["repositories_file_file_list"] == 3
+    assert pulp_simulator.calls["repositories_file_file_read"] == 0
+
+
+def test_cli_multiple_resources(
+    pulp_simulator: PulpSimulator, pulp_simulator_cli: t.Callable[..., Result]
+) -> None:
+    pulp_simulator.populate("repositories_file_file_create", 3, name="repository_{index}")
+    args = ["--repository", "file:file:repository_0", "--repository", "file:file:repository_2"]
+    result = pulp_simulator_cli(
+        "repository",
+        "reclaim",
+        *args,
+        "--repository",
+        "file:file:missing_0",
+        "--repository",
+        "file:file:missing_1",
+    )
+    assert result.exit_code == 1
+    assert result.output.count("Could not find") == 2
+    assert pulp_simulator.calls["repositories_file_file_list"] == 1
+
+
+def test_resolve_prns(pulp_simulator: PulpSimulator, pulp_simulator_ctx: PulpContext) -> None:
+    hrefs = pulp_simulator.populate("repositories_file_file_create", 150, name="repository_{index}")
+    prns = [pulp_simulator.get(href)["prn"] for href in reversed(hrefs)]
+    repository_ctxs = pulp_simulator_ctx.resolve_prns(prns)
+    # One list call per batch of PRNs that fits into a URL.
+    batches = len(list(PulpFileRepositoryContext.lookup_batches(prns)))
+    assert 1 < batches < 150
+    assert pulp_simulator.calls["repositories_file_file_list"] == batches
+    assert [repository_ctx.entity["pulp_href"] for repository_ctx in repository_ctxs] == list(
+        reversed(hrefs)
+    )
+    assert pulp_simulator.calls["repositories_file_file_list"] == batches
+
+    with pytest.raises(PulpEntityNotFound):
+        pulp_simulator_ctx.resolve_prns([prns[0], prns[0].replace(prns[0][-8:], "0" * 8)])
+
+
+def test_find_many_with_commas(
+    pulp_simulator: PulpSimulator, pulp_simulator_ctx: PulpContext
+) -> None:
+    names = ["plain", "with,comma", "another,one"]
+    hrefs = [
+        pulp_simulator.populate("repositories_file_file_create", 1, name=name)[0] for name in names
+    ]
+    repository_ctx = PulpFileRepositoryContext(pulp_simulator_ctx)
+    matches = repository_ctx.find_many([{"name": name} for name in names])
+    assert [[entity["pulp_href"] for entity in entities] for entities in matches] == [
+        [href] for href in hrefs
+    ]
+    # The names with a comma are looked up on their own.
+    assert pulp_simulator.calls["repositories_file_file_list"] == 3
+
+
+def test_lookup_batches() -> None:
+    hrefs = [f"/pulp/api/v3/tasks/{index:036}/" for index in range(250)]
+    batches = list(PulpEntityContext.lookup_batches(hrefs))
+    assert [href for batch in batches for href in batch] == hrefs
+    assert all(len(batch) <= PulpEntityContext.BATCH_LOOKUP_SIZE for batch in batches)
+    assert all(
+        len(",".join(quote(href, safe="") for href in batch))
+        <= PulpEntityContext.BATCH_LOOKUP_LENGTH
+        for batch in batches
+    )
+    assert list(PulpEntityContext.lookup_batches(["a"] * 150)) == [["a"] * 100, ["a"] * 50]
+
+
+def test_cli_show_prn_file(
+    pulp_simulator: PulpSimulator, pulp_simulator_cli: t.Callable[..., Result], tmp_path: Path
+) -> None:
+    hrefs = pulp_simulator.populate("repositories_file_file_create", 3, name="repository_{index}")
+    prn_file = tmp_path / "prns.txt"
+    prn_file.write_text("".join(f"{pulp_simulator.get(href)['prn']}\n\n" for href in hrefs))
+    result = pulp_simulator_cli("show", "--prn-file", str(prn_file))
+    assert result.exit_code == 0, result.output
+    assert [entity["name"] for entity in json.loads(result.output)] == [
+        "repository_0",
+        "repository_1",
+        "repository_2",
+    ]
+    assert pulp_simulator.calls["repositories_file_file_list"] == 1
+
+
+def test_coalesce(pulp_simulator: PulpSimulator, pulp_simulator_ctx: PulpContext) -> None:
+    hrefs = pulp_simulator.populate("repositories_file_file_create", 5, name="repository_{index}")
+    with pulp_simulator_ctx.coalesce():
+        repository_ctxs = [
+            PulpFileRepositoryContext(pulp_simulator_ctx, pulp_href=href) for href in hrefs
+        ]
+        assert [repository_ctx.entity["name"] for repository_ctx in repository_ctxs] == [
+            f"repository_{index}" for index in range(5)
+        ]
+        assert pulp_simulator.calls["repositories_file_file_list"] == 1
+        assert pulp_simulator.calls["repositories_file_file_read"] == 0
+        # Modifying calls discard the remembered entities.
+        repository_ctxs[0].update(body={"description": "changed"})
+        repository_ctx = PulpFileRepositoryContext(pulp_simulator_ctx, pulp_href=hrefs[0])
+        assert repository_ctx.entity["description"] == "changed"
+    assert pulp_simulator_ctx._entity_loader is None
+
+
+def test_task_group_errors(pulp_simulator: PulpSimulator, pulp_simulator_ctx: PulpContext) -> None:
+    (repository_href,) = pulp_simulator.populate("repositories_file_file_create", 1, name="repo")
+    repository_ctx = PulpFileRepositoryContext(pulp_simulator_ctx, pulp_href=repository_href)
+    tasks = [
+        repository_ctx.call(
+            "modify",
+            parameters={repository_ctx.HREF: repository_href},
+            body={"add_content_units": ["/pulp/api/v3/content/file/files/missing/"]},
+            non_blocking=True,
+        )
+        for _index in range(3)
+    ]
+    assert all(task["state"] == "failed" for task in tasks)
+    task_group = {
+        "pulp_href": "/pulp/api/v3/task-groups/0/",
+        "waiting": 0,
+        "running": 0,
+        "canceling": 0,
+        "failed": 3,
+        "canceled": 0,
+        "tasks": [{"pulp_href": task["pulp_href"], "state": "failed"} for task in tasks],
+    }
+    with pytest.raises(PulpException, match="has failed/canceled tasks"):
+        pulp_simulator_ctx._task_group_finished(task_group)
+    assert pulp_simulator.calls["tasks_list"] == 1
+
+
+def test_cli_content_modify(
+    pulp_simulator: PulpSimulator, pulp_simulator_cli: t.Callable[..., Result], tmp_path: Path
+) -> None:
+    pulp_simulator.populate("repositories_file_file_create", 1, name="cli")
+    pulp_simulator.populate(
+        "content_file_files_create", 150, relative_path="file_{index}", sha256="{index:064}"
+    )
+    units = [{"sha256": f"{index:064}", "relative_path": f"file_{index}"} for index in range(150)]
+    (tmp_path / "units.json").write_text(json.dumps(units))
+    result = pulp_simulator_cli(
+        "file",
+        "repository",
+        "content",
+        "modify",
+        "--repository",
+        "cli",
+        "--add-content",
+        f"@{tmp_path / 'units.json'}",
+    )
+    assert result.exit_code == 0, result.output
+    assert pulp_simulator.calls["content_file_files_list"] == 2
+    assert pulp_simulator.calls["repositories_file_file_modify"] == 1
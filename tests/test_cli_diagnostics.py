@@ -0,0 +1,62 @@
+import json
+import typing as t
+from pathlib import Path
+
+import pytest
+from click.testing import Result
+
+from pytest_pulp_cli.simulator import PulpSimulator
+
+
+def test_cli_timings(
+    pulp_simulator: PulpSimulator, pulp_simulator_cli: t.Callable[..., Result]
+) -> None:
+    result = pulp_simulator_cli("--timings", "file", "repository", "list")
+    assert result.exit_code == 0, result.output
+    # Older versions of click mix stderr into the output.
+    spans = {line.split()[0] for line in result.output.splitlines() if line.startswith("  ")}
+    for name in ["load_api", "render_request", "send_request", "parse_response", "output_result"]:
+        assert name in spans
+
+
+def test_cli_trace_file(
+    pulp_simulator: PulpSimulator, pulp_simulator_cli: t.Callable[..., Result], tmp_path: Path
+) -> None:
+    pulp_simulator.populate("repositories_file_file_create", 3, name="repository_{index}")
+    trace_file = tmp_path / "trace.ndjson"
+    result = pulp_simulator_cli("--trace-file", str(trace_file), "file", "repository", "list")
+    assert result.exit_code == 0, result.output
+    records = [json.loads(line) for line in trace_file.read_text().splitlines()]
+    assert [record["operation_id"] for record in records] == ["repositories_file_file_list"]
+    assert records[0]["status"] == 200
+    assert records[0]["response_size"] > 0
+    assert set(records[0]["phases"]) >= {"render", "send", "parse", "stream"}
+
+    result = pulp_simulator_cli("debug", "trace", "summarize", str(trace_file))
+    assert result.exit_code == 0, result.output
+    summary = json.loads(result.output)
+    assert summary["requests"] == 1
+    assert summary["operations"][0]["operation_id"] == "repositories_file_file_list"
+
+
+def test_cli_record_and_replay(
+    pulp_simulator: PulpSimulator,
+    pulp_simulator_cli: t.Callable[..., Result],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    pulp_simulator.populate("repositories_file_file_create", 3, name="repository_{index}")
+    cassette = tmp_path / "cassette.json"
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "record"))
+    result = pulp_simulator_cli("--record", str(cassette), "file", "repository", "list")
+    assert result.exit_code == 0, result.output
+    recorded = result.output
+    calls = sum(pulp_simulator.calls.values())
+
+    # Start with an empty cache to replay the api spec download too.
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "replay"))
+    result = pulp_simulator_cli("--replay", str(cassette), "file", "repository", "list")
+    assert result.exit_code == 0, result.output
+    assert result.output == recorded
+    assert sum(pulp_simulator.calls.values()) == calls
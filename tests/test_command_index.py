@@ -0,0 +1,85 @@
+import typing as t
+from pathlib import Path
+
+import click
+import pytest
+from click.shell_completion import ShellComplete
+from click.testing import CliRunner
+
+from pulp_cli import load_plugins, main
+from pulp_cli.index import CommandIndex
+
+load_plugins()
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    monkeypatch.delenv("PULP_CLI_NO_COMMAND_INDEX", raising=False)
+    return tmp_path
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        pytest.param([], id="main"),
+        pytest.param(["file", "repository", "list"], id="command"),
+        pytest.param(["--format", "yaml", "file", "repository", "--type", "file"], id="options"),
+    ],
+)
+def test_help_is_served_from_index(args: list[str], monkeypatch: pytest.MonkeyPatch) -> None:
+    runner = CliRunner()
+    result = runner.invoke(main, args + ["--help"], catch_exceptions=False)
+    assert result.exit_code == 0
+    rendered = result.output
+
+    def _fail(*args: t.Any, **kwargs: t.Any) -> None:
+        pytest.fail("Plugins were loaded.")
+
+    monkeypatch.setattr("pulp_cli.load_plugins", _fail)
+    result = runner.invoke(main, args + ["--help"], catch_exceptions=False)
+    assert result.exit_code == 0
+    assert result.output == rendered
+
+
+def test_index_is_keyed_by_plugins(cache_home: Path) -> None:
+    runner = CliRunner()
+    runner.invoke(main, ["--help"], catch_exceptions=False)
+    assert CommandIndex.load(None).tree is not None
+    assert CommandIndex.load(["common", "core"]).tree is None
+
+
+@pytest.mark.parametrize(
+    "args,incomplete",
+    [
+        ([], "fi"),
+        (["file", "repository"], ""),
+        (["file", "repository", "list"], "--"),
+        (["--format"], ""),
+        (["file", "repository", "create", "--name", "test"], "--auto"),
+        (["file", "publication", "create", "--repository"], "fi"),
+    ],
+)
+def test_completion_from_stubs(
+    args: list[str], incomplete: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Do not refresh the cache of entity names.
+    monkeypatch.setattr("subprocess.Popen", lambda *args, **kwargs: None)
+    CliRunner().invoke(main, ["--help"], catch_exceptions=False)
+    index = CommandIndex.load(None)
+    assert index.tree is not None
+    stub_main = click.Group("pulp", params=main.params)
+    index.mount_stubs(stub_main)
+
+    def _completions(command: click.Command) -> list[tuple[str, str | None]]:
+        return [
+            (item.value, item.help)
+            for item in ShellComplete(command, {}, "pulp", "_PULP_COMPLETE").get_completions(
+                args, incomplete
+            )
+        ]
+
+    expected = _completions(main)
+    assert expected
+    assert _completions(stub_main) == expected
@@ -0,0 +1,123 @@
+import json
+import os
+import typing as t
+from pathlib import Path
+
+import pytest
+from click.shell_completion import ShellComplete
+from click.testing import CliRunner
+
+from pulp_glue.common.context import PulpRepositoryContext
+from pulp_glue.file.context import PulpFileRepositoryContext
+
+from pulp_cli import main
+from pulp_cli.completion import REFRESH_COMMAND, cache_path, context_path
+from pytest_pulp_cli.simulator import PulpSimulator
+
+
+@pytest.fixture
+def popen_calls(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> list[tuple[list[str], dict[str, str]]]:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    calls: list[tuple[list[str], dict[str, str]]] = []
+
+    def _popen(args: list[str], env: dict[str, str], **kwargs: t.Any) -> None:
+        calls.append((args, env))
+
+    monkeypatch.setattr("subprocess.Popen", _popen)
+    return calls
+
+
+@pytest.fixture
+def options(pulp_simulator: PulpSimulator) -> list[str]:
+    return [
+        "--base-url",
+        pulp_simulator.base_url,
+        "--username",
+        "admin",
+        "--password",
+        "password",
+    ]
+
+
+def _complete(args: list[str], incomplete: str) -> list[str]:
+    complete = ShellComplete(main, {}, "pulp", "_PULP_COMPLETE")
+    return [item.value for item in complete.get_completions(args, incomplete)]
+
+
+def test_refresh_and_complete_names(
+    pulp_simulator: PulpSimulator,
+    options: list[str],
+    popen_calls: list[tuple[list[str], dict[str, str]]],
+) -> None:
+    pulp_simulator.populate("repositories_file_file_create", 3, name="repository_{index}")
+    pulp_simulator.populate("repositories_file_file_create", 1, name="other")
+    args = [*options, "file", "publication", "create", "--repository"]
+
+    # Without a cache, nothing is offered, but a refresh is started in the background.
+    assert _complete(args, "rep") == []
+    assert len(popen_calls) == 1
+    refresh_args, env = popen_calls[0]
+    assert "password" not in refresh_args
+    assert not any(key.endswith("_COMPLETE") for key in env)
+    path = context_path(PulpFileRepositoryContext)
+    assert refresh_args[-3:] == [path, "--lookup-key", "name"]
+    # A running refresh is not started again.
+    assert _complete(args, "rep") == []
+    assert len(popen_calls) == 1
+
+    result = CliRunner().invoke(main, [*options, REFRESH_COMMAND, path])
+    assert result.exit_code == 0, result.output
+    target = cache_path(None, "default", path, "name")
+    assert not target.with_name(target.name + ".refresh").exists()
+    assert json.loads(target.read_text())["names"] == [
+        "other",
+        "repository_0",
+        "repository_1",
+        "repository_2",
+    ]
+    calls = sum(pulp_simulator.calls.values())
+    assert _complete(args, "rep") == ["repository_0", "repository_1", "repository_2"]
+    assert _complete(args, "file:file:rep") == [
+        "file:file:repository_0",
+        "file:file:repository_1",
+        "file:file:repository_2",
+    ]
+    assert sum(pulp_simulator.calls.values()) == calls
+    assert len(popen_calls) == 1
+
+    # Stale names are still offered while they are refreshed.
+    os.utime(target, (0, 0))
+    assert _complete(args, "oth") == ["other"]
+    assert len(popen_calls) == 2
+
+
+def test_complete_lookup_option(popen_calls: list[tuple[list[str], dict[str, str]]]) -> None:
+    args = ["--base-url", "http://pulp", "file", "repository", "show", "--repository"]
+    assert _complete(args, "") == []
+    refresh_args, _env = popen_calls[0]
+    assert refresh_args[-3:] == [context_path(PulpRepositoryContext), "--lookup-key", "name"]
+    assert refresh_args[3:5] == ["--base-url", "http://pulp"]
+    # Hrefs and PRNs are not completed.
+    assert _complete(args, "/pulp/") == []
+    assert _complete(args, "prn:") == []
+    assert len(popen_calls) == 1
+
+
+def test_complete_type_prefixes(
+    pulp_simulator: PulpSimulator,
+    options: list[str],
+    popen_calls: list[tuple[list[str], dict[str, str]]],
+) -> None:
+    pulp_simulator.populate("repositories_file_file_create", 2, name="repository_{index}")
+    result = CliRunner().invoke(
+        main, [*options, REFRESH_COMMAND, context_path(PulpFileRepositoryContext)]
+    )
+    assert result.exit_code == 0, result.output
+    args = [*options, "file", "publication", "create", "--repository"]
+    assert _complete(args, "") == ["repository_0", "repository_1", "file:file:"]
+    assert _complete(args, "fi") == ["file:file:"]
+    # Other servers do not share the cache.
+    assert _complete(["--base-url", "http://other", *args[2:]], "") == ["file:file:"]
@@ -0,0 +1,118 @@
+import asyncio
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+
+import pytest
+import requests
+
+from pulp_glue.common.context import AsyncPulpContext, PulpContext
+from pulp_glue.common.exceptions import PulpException
+from pulp_glue.common.transport import AIOHTTP_AVAILABLE, AiohttpTransport, ThreadedAsyncTransport
+from pulp_glue.file.context import PulpFileRepositoryContext
+
+from pytest_pulp_cli.simulator import PulpSimulator
+
+
+def test_shared_context_in_threads(pulp_simulator: PulpSimulator) -> None:
+    pulp_ctx = PulpContext.from_config(
+        {
+            "base_url": pulp_simulator.base_url,
+            "username": "admin",
+            "password": "password",
+            # One connection per thread.
+            "pool_size": 16,
+        }
+    )
+
+    def _lifecycle(index: int) -> int:
+        repository_ctx = PulpFileRepositoryContext(pulp_ctx)
+        repository = repository_ctx.create(body={"name": f"repository_{index}"})
+        repository_ctx = PulpFileRepositoryContext(pulp_ctx, entity={"name": f"repository_{index}"})
+        assert repository_ctx.pulp_href == repository["pulp_href"]
+        repository_ctx.update(body={"description": f"thread {index}"})
+        return id(pulp_ctx.api)
+
+    # The contexts are not loaded yet, so the threads race for the lazy setup as well.
+    with ThreadPoolExecutor(16) as executor:
+        apis = set(executor.map(_lifecycle, range(64)))
+    assert len(apis) == 1
+    repositories = list(PulpFileRepositoryContext(pulp_ctx).list_iterator())
+    assert sorted(repository["description"] for repository in repositories) == sorted(
+        f"thread {index}" for index in range(64)
+    )
+    pulp_ctx.api.close()
+
+
+@pytest.mark.parametrize("transport", ["aiohttp", "threaded"])
+def test_async_context(
+    pulp_simulator: PulpSimulator, monkeypatch: pytest.MonkeyPatch, transport: str
+) -> None:
+    if transport == "aiohttp":
+        if not AIOHTTP_AVAILABLE:
+            pytest.skip("aiohttp is not installed")
+    else:
+        monkeypatch.setattr("pulp_glue.common.openapi.AIOHTTP_AVAILABLE", False)
+    # Synchronous requests must not be sent from the event loop.
+    blocking: list[str] = []
+    request = requests.Session.request
+
+    def _request(session: requests.Session, method: str, url: str, **kwargs: t.Any) -> t.Any:
+        with suppress(RuntimeError):
+            asyncio.get_running_loop()
+            blocking.append(url)
+        return request(session, method, url, **kwargs)
+
+    monkeypatch.setattr(requests.Session, "request", _request)
+    pulp_ctx = AsyncPulpContext.from_config(
+        {"base_url": pulp_simulator.base_url, "username": "admin", "password": "password"}
+    )
+
+    async def _lifecycle(index: int) -> None:
+        repository_ctx = PulpFileRepositoryContext(pulp_ctx)
+        repository = await repository_ctx.acreate({"name": f"repository_{index}"})
+        assert repository["name"] == f"repository_{index}"
+        repository_ctx = PulpFileRepositoryContext(pulp_ctx, entity={"name": f"repository_{index}"})
+        updated = await repository_ctx.aupdate({"description": "async"})
+        assert updated["description"] == "async"
+        version_ctx = PulpFileRepositoryContext(
+            pulp_ctx, entity={"name": f"repository_{index}"}
+        ).get_version_context()
+        version_ctx.entity = {"number": None}
+        assert (await version_ctx.ashow())["number"] == 0
+        if index % 2:
+            await repository_ctx.adelete()
+
+    async def _run() -> list[str]:
+        await asyncio.gather(*(_lifecycle(index) for index in range(10)))
+        repository_ctx = PulpFileRepositoryContext(pulp_ctx)
+        names = sorted(
+            [repository["name"] async for repository in repository_ctx.alist_iterator(batch_size=2)]
+        )
+        repository_ctx = PulpFileRepositoryContext(pulp_ctx, entity={"name": "repository_0"})
+        task = await repository_ctx.acall(
+            "modify",
+            parameters={repository_ctx.HREF: await repository_ctx.apulp_href()},
+            body={"add_content_units": ["/pulp/api/v3/content/file/files/missing/"]},
+            non_blocking=True,
+        )
+        task_group = {
+            "pulp_href": "/pulp/api/v3/task-groups/0/",
+            "waiting": 0,
+            "running": 0,
+            "canceling": 0,
+            "failed": 1,
+            "canceled": 0,
+            "tasks": [{"pulp_href": task["pulp_href"], "state": "failed"}],
+        }
+        with pytest.raises(PulpException, match="has failed/canceled tasks"):
+            await pulp_ctx.await_for_task_group(task_group)
+        await pulp_ctx.aclose()
+        return names
+
+    assert asyncio.run(_run()) == [f"repository_{index}" for index in range(0, 10, 2)]
+    assert pulp_simulator.calls["repositories_file_file_delete"] == 5
+    assert pulp_simulator.calls["repositories_file_file_list"] >= 3
+    assert blocking == []
+    expected = AiohttpTransport if transport == "aiohttp" else ThreadedAsyncTransport
+    assert isinstance(pulp_ctx.async_api._async_transport, expected)
@@ -0,0 +1,99 @@
+import json
+import typing as t
+from pathlib import Path
+
+import pytest
+from click.testing import Result
+
+from pulp_glue.common.content_index import ContentIndex
+from pulp_glue.common.context import PulpContext
+from pulp_glue.common.exceptions import PulpException
+from pulp_glue.file.context import PulpFileRepositoryContext
+
+from pytest_pulp_cli.simulator import PulpSimulator
+
+
+def test_content_index(
+    pulp_simulator: PulpSimulator, pulp_simulator_ctx: PulpContext, tmp_path: Path
+) -> None:
+    content_hrefs = pulp_simulator.populate(
+        "content_file_files_create",
+        6,
+        relative_path="dir/file{index}",
+        sha256="{index:064}",
+    )
+    (repository_href,) = pulp_simulator.populate("repositories_file_file_create", 1, name="repo")
+    repository_ctx = PulpFileRepositoryContext(pulp_simulator_ctx, pulp_href=repository_href)
+    repository_ctx.modify(add_content=content_hrefs[:4])
+    with ContentIndex(tmp_path / "index.sqlite3") as content_index:
+        result = content_index.update(repository_ctx.get_version_context(1))
+        assert result["count"] == 4
+        assert pulp_simulator.calls["content_file_files_list"] == 1
+
+        repository_ctx.modify(add_content=content_hrefs[4:], remove_content=content_hrefs[:1])
+        repository_ctx.modify(remove_content=content_hrefs[1:2])
+        version_ctx = repository_ctx.get_version_context(3)
+        result = content_index.update(version_ctx)
+        assert result["base_version"] == repository_ctx.get_version_context(1).pulp_href
+        assert (result["added"], result["removed"], result["count"]) == (2, 2, 4)
+        # Only the changes of versions 2 and 3 were listed.
+        assert pulp_simulator.calls["content_file_files_list"] == 4
+
+        units = content_index.find(version_ctx, [("relative_path", "~", "dir/file[45]")])
+        assert [unit["pulp_href"] for unit in units] == sorted(content_hrefs[4:])
+        assert content_index.find(version_ctx, [("relative_path", "=", "dir/file0")]) == []
+        rows = content_index.query(
+            version_ctx, "SELECT COUNT(*) AS count FROM units WHERE content_type = 'file.file'"
+        )
+        assert rows == [{"count": 4}]
+        with pytest.raises(PulpException, match="Query failed"):
+            content_index.query(version_ctx, "DELETE FROM content_units")
+        # Units in several versions are stored once.
+        assert content_index.query(version_ctx, "SELECT COUNT(*) AS count FROM content_units") == [
+            {"count": 6}
+        ]
+        with pytest.raises(PulpException, match="is not indexed"):
+            content_index.find(repository_ctx.get_version_context(2))
+
+
+def test_cli_content_index(
+    pulp_simulator: PulpSimulator,
+    pulp_simulator_cli: t.Callable[..., Result],
+    pulp_simulator_ctx: PulpContext,
+    tmp_path: Path,
+) -> None:
+    content_hrefs = pulp_simulator.populate(
+        "content_file_files_create",
+        3,
+        relative_path="file{index}",
+        sha256="{index:064}",
+    )
+    (repository_href,) = pulp_simulator.populate("repositories_file_file_create", 1, name="repo")
+    args = ["file", "repository"]
+    repository_ctx = PulpFileRepositoryContext(pulp_simulator_ctx, pulp_href=repository_href)
+    repository_ctx.modify(add_content=content_hrefs)
+    result = pulp_simulator_cli(*args, "version", "index", "--repository", "repo")
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output)["count"] == 3
+    assert (tmp_path / "cache" / "pulp" / "content_index.sqlite3").exists()
+
+    result = pulp_simulator_cli(
+        *args, "version", "query", "--repository", "repo", "--filter", "relative_path=file1"
+    )
+    assert result.exit_code == 0, result.output
+    assert [unit["pulp_href"] for unit in json.loads(result.output)] == [content_hrefs[1]]
+    result = pulp_simulator_cli(
+        *args,
+        "version",
+        "query",
+        "--repository",
+        "repo",
+        "--sql",
+        "SELECT json_extract(data, '$.relative_path') AS path FROM units ORDER BY path",
+    )
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output) == [{"path": f"file{index}"} for index in range(3)]
+    result = pulp_simulator_cli(
+        *args, "version", "query", "--repository", "repo", "--filter", "relative_path"
+    )
+    assert result.exit_code != 0
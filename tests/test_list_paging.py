@@ -0,0 +1,44 @@
+import json
+import typing as t
+
+from click.testing import Result
+
+from pulp_glue.common.context import PulpContext
+from pulp_glue.common.paging import AdaptivePaging
+from pulp_glue.file.context import PulpFileRepositoryContext
+
+from pytest_pulp_cli.simulator import PulpSimulator
+
+
+def test_list_adaptive_paging(
+    pulp_simulator: PulpSimulator, pulp_simulator_ctx: PulpContext
+) -> None:
+    pulp_simulator.populate("repositories_file_file_create", 250, name="repository_{index}")
+    paging = AdaptivePaging(target_latency=60, min_size=10, max_size=80, initial_size=20)
+    repository_ctx = PulpFileRepositoryContext(pulp_simulator_ctx)
+    stats: dict[str, t.Any] = {}
+    assert len(list(repository_ctx.list_iterator(stats=stats, paging=paging))) == 250
+    # The simulator answers fast, so the pages grow up to the limit.
+    assert stats["page_sizes"] == [20, 40, 80, 80, 80]
+    assert paging.page_size("repositories_file_file_list") == 80
+
+    # The context's paging applies unless a batch size is given.
+    pulp_simulator_ctx.paging = paging
+    stats = {}
+    assert len(list(repository_ctx.list_iterator(stats=stats))) == 250
+    assert stats["page_sizes"] == [80, 80, 80, 80]
+    stats = {}
+    assert len(list(repository_ctx.list_iterator(batch_size=100, stats=stats))) == 250
+    assert stats["page_sizes"] == [100, 100, 100]
+
+
+def test_cli_page_latency(
+    pulp_simulator: PulpSimulator, pulp_simulator_cli: t.Callable[..., Result]
+) -> None:
+    pulp_simulator.populate("repositories_file_file_create", 45, name="repository_{index}")
+    result = pulp_simulator_cli(
+        "--page-latency", "5", "--max-page-size", "20", "file", "repository", "list", "--limit", "0"
+    )
+    assert result.exit_code == 0, result.output
+    assert len(json.loads(result.output)) == 45
+    assert pulp_simulator.calls["repositories_file_file_list"] == 3
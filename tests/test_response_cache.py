@@ -0,0 +1,25 @@
+import json
+import typing as t
+
+from click.testing import Result
+
+from pytest_pulp_cli.simulator import PulpSimulator
+
+
+def test_cli_response_cache(
+    pulp_simulator: PulpSimulator, pulp_simulator_cli: t.Callable[..., Result]
+) -> None:
+    (content_href,) = pulp_simulator.populate(
+        "content_file_files_create", 1, relative_path="file", sha256="0" * 64
+    )
+    (repository_href,) = pulp_simulator.populate("repositories_file_file_create", 1, name="repo")
+    args = ["--response-cache-size", "1MB"]
+    for _run in range(2):
+        result = pulp_simulator_cli(*args, "file", "content", "show", "--href", content_href)
+        assert result.exit_code == 0, result.output
+        assert json.loads(result.output)["relative_path"] == "file"
+        result = pulp_simulator_cli(*args, "show", "--href", repository_href)
+        assert result.exit_code == 0, result.output
+    # Only the mutable repository is read again.
+    assert pulp_simulator.calls["content_file_files_read"] == 1
+    assert pulp_simulator.calls["repositories_file_file_read"] == 2
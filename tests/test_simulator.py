@@ -0,0 +1,98 @@
+import json
+import typing as t
+from pathlib import Path
+
+import pytest
+from click.testing import Result
+
+from pulp_glue.common.context import PulpContext
+from pulp_glue.common.exceptions import PulpException, PulpNoWait
+from pulp_glue.file.context import (
+    PulpFileContentContext,
+    PulpFileRepositoryContext,
+)
+
+from pytest_pulp_cli.simulator import PulpSimulator
+
+
+def test_repository_lifecycle(
+    pulp_simulator: PulpSimulator, pulp_simulator_ctx: PulpContext
+) -> None:
+    repository_ctx = PulpFileRepositoryContext(pulp_simulator_ctx)
+    repository = repository_ctx.create(body={"name": "test"})
+    assert repository["latest_version_href"] == repository["versions_href"] + "0/"
+
+    repository_ctx = PulpFileRepositoryContext(pulp_simulator_ctx, entity={"name": "test"})
+    assert repository_ctx.pulp_href == repository["pulp_href"]
+    with pytest.raises(PulpException):
+        PulpFileRepositoryContext(pulp_simulator_ctx).create(body={"name": "test"})
+
+    repository_ctx.update(body={"description": "simulated"})
+    assert pulp_simulator.get(repository["pulp_href"])["description"] == "simulated"
+
+    repository_ctx.delete()
+    with pytest.raises(PulpException):
+        PulpFileRepositoryContext(pulp_simulator_ctx, entity={"name": "test"}).entity
+    assert pulp_simulator.calls["repositories_file_file_delete"] == 1
+
+
+def test_list_pagination_and_filters(
+    pulp_simulator: PulpSimulator, pulp_simulator_ctx: PulpContext
+) -> None:
+    pulp_simulator.populate("repositories_file_file_create", 250, name="repository_{index}")
+    repository_ctx = PulpFileRepositoryContext(pulp_simulator_ctx)
+    stats: dict[str, t.Any] = {}
+    assert len(list(repository_ctx.list_iterator(batch_size=100, stats=stats))) == 250
+    assert stats["count"] == 250
+    assert pulp_simulator.calls["repositories_file_file_list"] == 3
+
+    result = repository_ctx.list(
+        limit=10,
+        offset=0,
+        parameters={"name__contains": "_24", "fields": ["name"]},
+    )
+    assert result == [{"name": f"repository_24{index}"} for index in ["", *range(10)]][:10]
+
+
+def test_upload_and_modify(
+    pulp_simulator: PulpSimulator, pulp_simulator_ctx: PulpContext, tmp_path: Path
+) -> None:
+    pulp_simulator_ctx.chunk_size = 10
+    repository_ctx = PulpFileRepositoryContext(pulp_simulator_ctx)
+    repository_ctx.pulp_href = repository_ctx.create(body={"name": "test"})["pulp_href"]
+    upload_file = tmp_path / "test.txt"
+    upload_file.write_text("This file is uploaded in chunks.")
+
+    content_ctx = PulpFileContentContext(pulp_simulator_ctx, repository_ctx=repository_ctx)
+    content = content_ctx.create(
+        body={"file": upload_file, "relative_path": "test.txt", "repository": repository_ctx}
+    )
+    assert pulp_simulator.calls["uploads_update"] == 4
+    content_href = content["pulp_href"]
+    assert content_ctx.find(relative_path="test.txt")["pulp_href"] == content_href
+    assert repository_ctx.entity["latest_version_href"].endswith("/versions/1/")
+
+    repository_ctx.modify(remove_content=[content_href])
+    repository_ctx.pulp_href = repository_ctx.pulp_href
+    assert repository_ctx.entity["latest_version_href"].endswith("/versions/2/")
+    assert content_ctx.list(limit=10, offset=0, parameters={}) == []
+
+
+def test_task_duration(pulp_simulator: PulpSimulator, pulp_simulator_ctx: PulpContext) -> None:
+    pulp_simulator.task_duration = 10
+    (repository_href,) = pulp_simulator.populate("repositories_file_file_create", 1, name="repo")
+    pulp_simulator_ctx.background_tasks = True
+    repository_ctx = PulpFileRepositoryContext(pulp_simulator_ctx, pulp_href=repository_href)
+    with pytest.raises(PulpNoWait):
+        repository_ctx.modify(add_content=[])
+    tasks = pulp_simulator_ctx.call("tasks_list", parameters={"state": "running"})
+    assert tasks["count"] == 1
+
+
+def test_cli(pulp_simulator: PulpSimulator, pulp_simulator_cli: t.Callable[..., Result]) -> None:
+    args = ["--format", "json"]
+    result = pulp_simulator_cli(*args, "file", "repository", "create", "--name", "cli")
+    assert result.exit_code == 0, result.output
+    result = pulp_simulator_cli(*args, "file", "repository", "list")
+    assert result.exit_code == 0, result.output
+    assert [repository["name"] for repository in json.loads(result.output)] == ["cli"]
@@ -0,0 +1,172 @@
+import json
+import typing as t
+
+import pytest
+from click.testing import Result
+
+from pulp_glue.common.context import PulpContext
+from pulp_glue.common.exceptions import PulpEntityNotFound, PulpException
+from pulp_glue.common.orchestration import (
+    SyncOrchestrator,
+    select_repositories,
+    stage_statistics,
+)
+from pulp_glue.file.context import PulpFileDistributionContext
+
+from pytest_pulp_cli.simulator import PulpSimulator
+
+
+def test_sync_orchestrator(
+    pulp_simulator: PulpSimulator,
+    pulp_simulator_ctx: PulpContext,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    remote = "/pulp/api/v3/remotes/file/file/0199a8c4-0000-7000-8000-000000000000/"
+    content_hrefs = pulp_simulator.populate(
+        "content_file_files_create", 2, relative_path="file{index}", sha256="{index:064}"
+    )
+    pulp_simulator.remote_content[remote] = set(content_hrefs)
+    pulp_simulator.populate(
+        "repositories_file_file_create",
+        5,
+        name="mirror_{index}",
+        remote=remote,
+        pulp_labels={"env": "prod"},
+    )
+    pulp_simulator.populate("repositories_file_file_create", 1, name="mirror_local")
+    pulp_simulator.populate("repositories_file_file_create", 1, name="other", remote=remote)
+    pulp_simulator.populate(
+        "distributions_file_file_create", 1, name="mirror_1", base_path="mirror_1"
+    )
+
+    repository_ctxs = select_repositories(
+        pulp_simulator_ctx, types=["file:file"], name_pattern="mirror_*"
+    )
+    assert len(repository_ctxs) == 6
+    repository_ctxs = select_repositories(
+        pulp_simulator_ctx, types=["file:file"], label_select="env=prod"
+    )
+    assert len(repository_ctxs) == 5
+    with pytest.raises(PulpException, match="cannot be synced"):
+        select_repositories(pulp_simulator_ctx, types=["unknown:unknown"])
+
+    in_flight: list[int] = []
+    read_tasks = pulp_simulator_ctx.read_tasks
+
+    def _read_tasks(task_hrefs: t.Iterable[str], **kwargs: t.Any) -> t.Any:
+        task_hrefs = list(task_hrefs)
+        in_flight.append(len(task_hrefs))
+        return read_tasks(task_hrefs, **kwargs)
+
+    monkeypatch.setattr(pulp_simulator_ctx, "read_tasks", _read_tasks)
+    runs = SyncOrchestrator(
+        pulp_simulator_ctx, max_in_flight=2, distribute=True, poll_interval=0.01
+    ).run(select_repositories(pulp_simulator_ctx, name_pattern="mirror_*"))
+    summaries = {run.summary()["name"]: run.summary() for run in runs}
+    assert summaries["mirror_local"]["state"] == "skipped"
+    assert summaries["mirror_0"]["state"] == "completed"
+    assert list(summaries["mirror_0"]["stages"]) == ["sync", "publish"]
+    assert summaries["mirror_0"]["version"].endswith("/versions/1/")
+    assert summaries["mirror_0"]["changed"]
+    assert {name: stage["state"] for name, stage in summaries["mirror_1"]["stages"].items()} == {
+        "sync": "completed",
+        "publish": "completed",
+        "distribute": "completed",
+    }
+    distribution_ctx = PulpFileDistributionContext(pulp_simulator_ctx)
+    distribution_ctx.entity = {"name": "mirror_1"}
+    assert distribution_ctx.entity["publication"] == summaries["mirror_1"]["publication"]
+    assert max(in_flight) <= 2
+    assert pulp_simulator.calls["repositories_file_file_sync"] == 5
+    assert pulp_simulator.calls["publications_file_file_create"] == 5
+    # The tasks are polled in batches.
+    assert pulp_simulator.calls["tasks_list"] == len(in_flight) < 15
+    stats = stage_statistics(runs)
+    assert list(stats) == ["sync", "publish", "distribute"]
+    assert stats["sync"].completed == 5
+    assert stats["distribute"].completed == 1
+
+    # Without changes, the existing publications are kept.
+    pulp_simulator.calls.clear()
+    runs = SyncOrchestrator(pulp_simulator_ctx, distribute=True, poll_interval=0.01).run(
+        select_repositories(pulp_simulator_ctx, names=["mirror_0", "mirror_1"])
+    )
+    assert [run.changed for run in runs] == [False, False]
+    assert runs[1].publication_href == summaries["mirror_1"]["publication"]
+    stats = stage_statistics(runs)
+    assert (stats["sync"].completed, stats["publish"].skipped, stats["distribute"].skipped) == (
+        2,
+        2,
+        1,
+    )
+    assert pulp_simulator.calls["publications_file_file_create"] == 0
+    assert pulp_simulator.calls["distributions_file_file_partial_update"] == 0
+
+    # A publication created by the sync is distributed as it is.
+    pulp_simulator.remote_content[remote] |= set(
+        pulp_simulator.populate("content_file_files_create", 1, relative_path="new", sha256="2")
+    )
+    (run,) = SyncOrchestrator(
+        pulp_simulator_ctx,
+        sync_body={"sync_policy": "mirror_complete"},
+        distribute=True,
+        poll_interval=0.01,
+    ).run(select_repositories(pulp_simulator_ctx, names=["mirror_1"]))
+    assert run.changed
+    assert {name: stage.state for name, stage in run.stages.items()} == {
+        "sync": "completed",
+        "publish": "skipped",
+        "distribute": "completed",
+    }
+    assert pulp_simulator.get(run.publication_href or "")["repository_version"] == run.version_href
+    assert pulp_simulator.calls["publications_file_file_create"] == 0
+    with pytest.raises(PulpEntityNotFound, match="missing"):
+        select_repositories(pulp_simulator_ctx, names=["mirror_0", "missing"])
+
+
+def test_cli_sync_all(
+    pulp_simulator: PulpSimulator, pulp_simulator_cli: t.Callable[..., Result]
+) -> None:
+    remote = "/pulp/api/v3/remotes/file/file/0199a8c4-0000-7000-8000-000000000000/"
+    pulp_simulator.populate("repositories_file_file_create", 3, name="repo_{index}", remote=remote)
+    args = ["repository", "sync-all"]
+    result = pulp_simulator_cli(*args, "--type", "file:file", "--max-tasks", "2")
+    assert result.exit_code == 0, result.output
+    summary = json.loads(result.stdout)
+    assert [run["name"] for run in summary] == ["repo_0", "repo_1", "repo_2"]
+    assert {run["state"] for run in summary} == {"completed"}
+    # Syncing without changes does not create a repository version.
+    assert {run["changed"] for run in summary} == {False}
+    assert all(run["version"].endswith("/versions/0/") for run in summary)
+
+    pulp_simulator.populate("repositories_file_file_create", 1, name="repo_local")
+    result = pulp_simulator_cli(*args, "--name-pattern", "repo_local", "--publish")
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.stdout)[0]["state"] == "skipped"
+
+
+def test_cli_pipeline(
+    pulp_simulator: PulpSimulator, pulp_simulator_cli: t.Callable[..., Result]
+) -> None:
+    remote = "/pulp/api/v3/remotes/file/file/0199a8c4-0000-7000-8000-000000000000/"
+    pulp_simulator.remote_content[remote] = set(
+        pulp_simulator.populate("content_file_files_create", 1, relative_path="file", sha256="0")
+    )
+    pulp_simulator.populate("repositories_file_file_create", 2, name="repo_{index}", remote=remote)
+    pulp_simulator.populate(
+        "distributions_file_file_create", 2, name="repo_{index}", base_path="repo_{index}"
+    )
+    args = ["file", "repository", "pipeline", "--name", "repo_0", "--name", "repo_1"]
+    result = pulp_simulator_cli(*args)
+    assert result.exit_code == 0, result.output
+    summary = json.loads(result.stdout)
+    assert [list(run["stages"]) for run in summary] == [["sync", "publish", "distribute"]] * 2
+    assert "Stages:" in result.stderr
+
+    result = pulp_simulator_cli(*args)
+    assert result.exit_code == 0, result.output
+    summary = json.loads(result.stdout)
+    assert [run["stages"]["distribute"]["state"] for run in summary] == ["skipped"] * 2
+
+    result = pulp_simulator_cli(*args, "--name", "missing")
+    assert result.exit_code != 0